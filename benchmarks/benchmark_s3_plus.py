@@ -0,0 +1,175 @@
+"""
+Benchmarks for S3Plus bulk operations, run against moto's in-memory S3.
+
+moto answers requests in-process, so every call is CPU-bound Python. To model the
+round trip that dominates real S3 traffic, each request is delayed by a configurable
+simulated latency before it is handed to moto. Run with:
+
+    python benchmarks/benchmark_s3_plus.py
+"""
+import os
+import time
+import tempfile
+import boto3
+import boto3.s3.transfer
+import botocore
+import botocore.handlers
+import moto
+
+import boto_plus
+
+
+REGION = 'us-east-1'
+BUCKET = 'benchmark-bucket'
+
+
+def time_call(
+    function,
+    **kwargs,
+) -> float:
+    start = time.perf_counter()
+    function(**kwargs)
+    return time.perf_counter() - start
+
+
+def simulate_latency(
+    latency_ms: float,
+):
+    # registered as a builtin handler so sessions rebuilt inside worker processes pick it up too
+    def sleep(**kwargs):
+        time.sleep(latency_ms / 1000)
+
+    if latency_ms > 0:
+        botocore.handlers.BUILTIN_HANDLERS.append(('before-call.s3', sleep))
+
+
+def benchmark_copy_objects(
+    n_objects=500,
+    max_workers=16,
+    latency_ms=20,
+):
+    with moto.mock_aws():
+        s3 = boto3.client('s3', region_name=REGION)
+        s3.create_bucket(Bucket=BUCKET)
+        for i in range(n_objects):
+            s3.put_object(Bucket=BUCKET, Key=f'source/{i}.txt', Body=b'x' * 2048)
+
+        simulate_latency(latency_ms)
+
+        s3_plus = boto_plus.S3Plus(
+            boto_config=botocore.config.Config(region_name=REGION),
+            boto_session=boto3.session.Session(region_name=REGION),
+            max_workers=max_workers,
+        )
+
+        modes = {
+            'serial'  : {},
+            'process' : {'use_multiprocessing' : True},
+            'thread'  : {'use_threading' : True},
+        }
+
+        print(f'copy_objects -- {n_objects} x 2 KB objects, max_workers={max_workers}, latency={latency_ms} ms')
+        for mode, mode_kwargs in modes.items():
+            payloads = [
+                {
+                    'source_bucket' : BUCKET,
+                    'source_key'    : f'source/{i}.txt',
+                    'target_bucket' : BUCKET,
+                    'target_key'    : f'target-{mode}/{i}.txt',
+                }
+                for i in range(n_objects)
+            ]
+
+            metrics = boto_plus.helpers.TransferMetrics()
+            elapsed = time_call(
+                s3_plus.copy_objects,
+                payloads=payloads,
+                dryrun=False,
+                verbose=False,
+                metrics=metrics,
+                **mode_kwargs,
+            )
+
+            latency = metrics.get_summary()['operations']['copy_object']['latency']
+            print(f'  {mode:<8} {elapsed:8.3f} s   {n_objects / elapsed:10.1f} ops/s   p50 {latency["p50"] * 1000:6.1f} ms   p99 {latency["p99"] * 1000:6.1f} ms')
+
+
+def benchmark_transfer_config(
+    object_size_mib=64,
+):
+    mib = 1024 ** 2
+    settings = {
+        'boto3 default'        : boto3.s3.transfer.TransferConfig(),
+        '8 MiB x 20 threads'   : boto3.s3.transfer.TransferConfig(max_concurrency=20),
+        '16 MiB x 10 threads'  : boto3.s3.transfer.TransferConfig(multipart_chunksize=16 * mib),
+        '32 MiB x 20 threads'  : boto3.s3.transfer.TransferConfig(multipart_chunksize=32 * mib, max_concurrency=20, max_io_queue=1000),
+    }
+
+    with moto.mock_aws(), tempfile.TemporaryDirectory() as directory:
+        s3 = boto3.client('s3', region_name=REGION)
+        s3.create_bucket(Bucket=BUCKET)
+
+        s3_plus = boto_plus.S3Plus(
+            boto_config=botocore.config.Config(region_name=REGION),
+            boto_session=boto3.session.Session(region_name=REGION),
+        )
+
+        filepath = os.path.join(directory, 'object.bin')
+        with open(filepath, 'wb') as out_file:
+            out_file.write(os.urandom(object_size_mib * mib))
+
+        print(f'upload_object / download_object -- {object_size_mib} MiB object')
+        for name, transfer_config in settings.items():
+            upload_elapsed = time_call(
+                s3_plus.upload_object,
+                filepath=filepath,
+                bucket=BUCKET,
+                key='object.bin',
+                transfer_config=transfer_config,
+                dryrun=False,
+                verbose=False,
+            )
+
+            download_elapsed = time_call(
+                s3_plus.download_object,
+                bucket=BUCKET,
+                key='object.bin',
+                filepath=os.path.join(directory, 'downloaded.bin'),
+                transfer_config=transfer_config,
+                dryrun=False,
+                verbose=False,
+            )
+
+            print(f'  {name:<22} upload {object_size_mib / upload_elapsed:8.1f} MiB/s   download {object_size_mib / download_elapsed:8.1f} MiB/s')
+
+
+def benchmark_file_hashing(
+    n_files=2000,
+    file_size_kib=256,
+):
+    with tempfile.TemporaryDirectory() as directory:
+        filepaths = list()
+        for i in range(n_files):
+            filepath = os.path.join(directory, f'{i}.bin')
+            with open(filepath, 'wb') as out_file:
+                out_file.write(os.urandom(file_size_kib * 1024))
+            filepaths.append(filepath)
+
+        total_mib = n_files * file_size_kib / 1024
+
+        print(f'file hashing -- {n_files} x {file_size_kib} KiB files, {os.cpu_count()} cores')
+
+        elapsed = time_call(lambda: [boto_plus.helpers.get_local_file_hash(f, chunk_size=4096) for f in filepaths])
+        print(f'  {"serial, 4 KiB reads":<26} {total_mib / elapsed:8.1f} MiB/s')
+
+        elapsed = time_call(lambda: [boto_plus.helpers.get_local_file_hash(f) for f in filepaths])
+        print(f'  {"serial, 1 MiB reads":<26} {total_mib / elapsed:8.1f} MiB/s')
+
+        elapsed = time_call(boto_plus.helpers.get_local_file_hashes, filepaths=filepaths)
+        print(f'  {"get_local_file_hashes":<26} {total_mib / elapsed:8.1f} MiB/s')
+
+
+if __name__ == '__main__':
+    benchmark_copy_objects()
+    benchmark_transfer_config()
+    benchmark_file_hashing()
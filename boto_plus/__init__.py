@@ -9,6 +9,12 @@ from .dynamo_plus import (
 
 from .s3_plus import (
     S3Plus,
+    S3ObjectRecord,
+    S3ObjectVersionRecord,
+)
+
+from .async_s3_plus import (
+    AsyncS3Plus,
 )
 
 from .step_function_plus import (
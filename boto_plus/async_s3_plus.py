@@ -0,0 +1,515 @@
+import os
+import asyncio
+import functools
+import itertools
+import typing
+import threading
+import concurrent.futures
+
+from .s3_plus import (
+    S3Plus,
+    S3ObjectRecord,
+)
+
+
+class AsyncS3Plus:
+    """
+    asyncio facade over S3Plus. Every call runs the matching S3Plus method on a shared thread pool,
+    and at most `max_concurrency` calls run at once across the instance -- the rest wait without
+    occupying a thread. Cancelling a call that is still waiting stops it from ever running; a call
+    that is already running finishes in its thread and its result is discarded.
+    """
+
+    def __init__(
+        self,
+        boto_config,
+        boto_session=None,
+        max_concurrency=None,
+        metadata_cache_size=0,
+        metadata_cache_ttl=60,
+        transfer_config=None,
+        checksum_algorithm=None,
+        rate_limiter=None,
+    ):
+        if max_concurrency is not None:
+            self.__max_concurrency = max_concurrency
+        else:
+            self.__max_concurrency = min(64, 4 * ((os.cpu_count() or 1) + 4))
+
+        # one pooled connection per thread that may be running a call
+        self.__s3_plus = S3Plus(
+            boto_config=boto_config,
+            boto_session=boto_session,
+            max_workers=self.__max_concurrency,
+            metadata_cache_size=metadata_cache_size,
+            metadata_cache_ttl=metadata_cache_ttl,
+            transfer_config=transfer_config,
+            checksum_algorithm=checksum_algorithm,
+            rate_limiter=rate_limiter,
+        )
+
+        self.__executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.__max_concurrency,
+            thread_name_prefix='async-s3-plus',
+        )
+
+        # asyncio primitives belong to one event loop -- created on first use
+        self.__semaphore = None
+        self.__semaphore_loop = None
+
+
+    async def __aenter__(
+        self,
+    ):
+        return self
+
+
+    async def __aexit__(
+        self,
+        exc_type,
+        exc_value,
+        traceback,
+    ):
+        await self.close()
+
+
+    async def close(
+        self,
+    ):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.__executor.shutdown)
+
+
+    def get_s3_plus(
+        self,
+    ) -> S3Plus:
+        return self.__s3_plus
+
+
+    def get_max_concurrency(
+        self,
+    ) -> int:
+        return self.__max_concurrency
+
+
+    async def __run(
+        self,
+        function,
+        *args,
+        **kwargs,
+    ):
+        loop = asyncio.get_running_loop()
+
+        if self.__semaphore_loop is not loop:
+            self.__semaphore = asyncio.Semaphore(self.__max_concurrency)
+            self.__semaphore_loop = loop
+
+        async with self.__semaphore:
+            return await loop.run_in_executor(self.__executor, functools.partial(function, *args, **kwargs))
+
+
+    async def __gather(
+        self,
+        coroutines: typing.Iterable[typing.Awaitable],
+    ) -> list:
+        tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+
+        try:
+            return await asyncio.gather(*tasks)
+
+        except BaseException:
+            # the first failure (or cancellation) stops everything that has not started yet
+            for task in tasks:
+                task.cancel()
+            raise
+
+
+    ### list ###
+    async def list_objects(
+        self,
+        bucket: str,
+        prefix: str,
+        filter='',
+    ) -> list[str]:
+        keys = [
+            record.key
+            async for record in self.iter_objects(bucket=bucket, prefix=prefix, filter=filter)
+        ]
+
+        return keys
+
+
+    async def iter_objects(
+        self,
+        bucket: str,
+        prefix: str,
+        filter='',
+        start_after=None,
+        page_size=1000,
+    ) -> typing.AsyncIterator[S3ObjectRecord]:
+        records = self.__s3_plus.iter_objects(
+            bucket=bucket,
+            prefix=prefix,
+            filter=filter,
+            start_after=start_after,
+            page_size=page_size,
+        )
+
+        # each executor call pulls up to one page, so the event loop never waits on a request
+        while True:
+            chunk = await self.__run(list, itertools.islice(records, page_size))
+            if len(chunk) == 0:
+                break
+
+            for record in chunk:
+                yield record
+
+
+    ### head ###
+    async def does_object_exist(
+        self,
+        bucket: str,
+        key: str,
+    ) -> bool:
+        return await self.__run(self.__s3_plus.does_object_exist, bucket=bucket, key=key)
+
+
+    async def get_object_info(
+        self,
+        bucket: str,
+        key: str,
+    ) -> dict:
+        return await self.__run(self.__s3_plus.get_object_info, bucket=bucket, key=key)
+
+
+    async def get_object_metadata(
+        self,
+        bucket: str,
+        key: str,
+    ) -> dict:
+        return await self.__run(self.__s3_plus.get_object_metadata, bucket=bucket, key=key)
+
+
+    async def get_object_hash(
+        self,
+        bucket: str,
+        key: str,
+    ) -> str:
+        return await self.__run(self.__s3_plus.get_object_hash, bucket=bucket, key=key)
+
+
+    async def get_object_checksum(
+        self,
+        bucket: str,
+        key: str,
+    ) -> typing.Optional[dict]:
+        return await self.__run(self.__s3_plus.get_object_checksum, bucket=bucket, key=key)
+
+
+    ### read ###
+    async def read_object_range(
+        self,
+        bucket: str,
+        key: str,
+        start: int,
+        end=None,
+        max_retries=3,
+    ) -> bytes:
+        return await self.__run(
+            self.__s3_plus.read_object_range,
+            bucket=bucket,
+            key=key,
+            start=start,
+            end=end,
+            max_retries=max_retries,
+        )
+
+
+    async def iter_object_lines(
+        self,
+        bucket: str,
+        key: str,
+        encoding='utf-8',
+        keepends=False,
+        chunk_size=None,
+        read_ahead=0,
+        max_retries=3,
+        lines_per_call=1000,
+    ) -> typing.AsyncIterator[typing.Union[str, bytes]]:
+        lines = self.__s3_plus.iter_object_lines(
+            bucket=bucket,
+            key=key,
+            encoding=encoding,
+            keepends=keepends,
+            chunk_size=chunk_size,
+            read_ahead=read_ahead,
+            max_retries=max_retries,
+        )
+
+        # a cancelled consumer leaves its pull running on the executor -- the generator is closed
+        # there too, once that pull has finished, since a running generator cannot be closed
+        lock = threading.Lock()
+
+        def pull():
+            with lock:
+                return list(itertools.islice(lines, lines_per_call))
+
+        def close():
+            with lock:
+                lines.close()
+
+        # as in iter_objects, each executor call pulls a batch, so the event loop never waits on a read
+        try:
+            while True:
+                chunk = await self.__run(pull)
+                if len(chunk) == 0:
+                    break
+
+                for line in chunk:
+                    yield line
+
+        finally:
+            await self.__run(close)
+
+
+    ### download ###
+    async def download_object(
+        self,
+        bucket: str,
+        key: str,
+        filepath: str,
+        dryrun=True,
+        verbose=True,
+        **kwargs,
+    ):
+        await self.__run(
+            self.__s3_plus.download_object,
+            bucket=bucket,
+            key=key,
+            filepath=filepath,
+            dryrun=dryrun,
+            verbose=verbose,
+            **kwargs,
+        )
+
+
+    async def download_objects(
+        self,
+        payloads: list[dict],
+        dryrun=True,
+        verbose=True,
+    ):
+        await self.__gather(
+            self.download_object(**payload, dryrun=dryrun, verbose=verbose)
+            for payload in payloads
+        )
+
+
+    ### upload ###
+    async def upload_object(
+        self,
+        filepath: str,
+        bucket: str,
+        key: str,
+        dryrun=True,
+        verbose=True,
+        **kwargs,
+    ) -> str:
+        return await self.__run(
+            self.__s3_plus.upload_object,
+            filepath=filepath,
+            bucket=bucket,
+            key=key,
+            dryrun=dryrun,
+            verbose=verbose,
+            **kwargs,
+        )
+
+
+    async def upload_object_from_bytes(
+        self,
+        contents: bytes,
+        bucket: str,
+        key: str,
+        dryrun=True,
+        verbose=True,
+    ) -> str:
+        return await self.__run(
+            self.__s3_plus.upload_object_from_bytes,
+            contents=contents,
+            bucket=bucket,
+            key=key,
+            dryrun=dryrun,
+            verbose=verbose,
+        )
+
+
+    async def upload_objects(
+        self,
+        payloads: list[dict],
+        dryrun=True,
+        verbose=True,
+    ) -> list[str]:
+        uris = await self.__gather(
+            self.upload_object(**payload, dryrun=dryrun, verbose=verbose)
+            for payload in payloads
+        )
+
+        return uris
+
+
+    ### copy ###
+    async def copy_object(
+        self,
+        source_bucket: str,
+        source_key: str,
+        target_bucket: str,
+        target_key: str,
+        dryrun=True,
+        verbose=True,
+        **kwargs,
+    ) -> str:
+        return await self.__run(
+            self.__s3_plus.copy_object,
+            source_bucket=source_bucket,
+            source_key=source_key,
+            target_bucket=target_bucket,
+            target_key=target_key,
+            dryrun=dryrun,
+            verbose=verbose,
+            **kwargs,
+        )
+
+
+    async def copy_objects(
+        self,
+        payloads: list[dict],
+        dryrun=True,
+        verbose=True,
+    ) -> list[str]:
+        uris = await self.__gather(
+            self.copy_object(**payload, dryrun=dryrun, verbose=verbose)
+            for payload in payloads
+        )
+
+        return uris
+
+
+    ### move ###
+    async def move_object(
+        self,
+        source_bucket: str,
+        source_key: str,
+        target_bucket: str,
+        target_key: str,
+        dryrun=True,
+        verbose=True,
+        **kwargs,
+    ) -> str:
+        return await self.__run(
+            self.__s3_plus.move_object,
+            source_bucket=source_bucket,
+            source_key=source_key,
+            target_bucket=target_bucket,
+            target_key=target_key,
+            dryrun=dryrun,
+            verbose=verbose,
+            **kwargs,
+        )
+
+
+    async def move_objects(
+        self,
+        payloads: list[dict],
+        dryrun=True,
+        verbose=True,
+    ) -> list[str]:
+        uris = await self.__gather(
+            self.move_object(**payload, dryrun=dryrun, verbose=verbose)
+            for payload in payloads
+        )
+
+        return uris
+
+
+    ### delete ###
+    async def delete_object(
+        self,
+        bucket: str,
+        key: str,
+        version_id=None,
+        dryrun=True,
+        verbose=True,
+    ) -> str:
+        return await self.__run(
+            self.__s3_plus.delete_object,
+            bucket=bucket,
+            key=key,
+            version_id=version_id,
+            dryrun=dryrun,
+            verbose=verbose,
+        )
+
+
+    async def delete_objects(
+        self,
+        payloads: list[dict],
+        dryrun=True,
+        verbose=True,
+    ) -> list[str]:
+        uris = await self.__gather(
+            self.delete_object(**payload, dryrun=dryrun, verbose=verbose)
+            for payload in payloads
+        )
+
+        return uris
+
+
+    async def delete_objects_at_prefix(
+        self,
+        bucket: str,
+        prefix: str,
+        dryrun=True,
+        verbose=True,
+        max_retries=3,
+    ) -> dict:
+        # batched DeleteObjects already runs its batches concurrently -- one call is enough
+        return await self.__run(
+            self.__s3_plus.delete_objects_at_prefix,
+            bucket=bucket,
+            prefix=prefix,
+            dryrun=dryrun,
+            verbose=verbose,
+            use_batch_delete=True,
+            max_retries=max_retries,
+        )
+
+
+    ### sync ###
+    async def sync(
+        self,
+        source: str,
+        target: str,
+        dryrun=True,
+        verbose=True,
+        **kwargs,
+    ) -> list[str]:
+        # S3Plus.sync runs its transfers on its own pool of `max_concurrency` threads
+        return await self.__run(
+            self.__s3_plus.sync,
+            source=source,
+            target=target,
+            use_threading=True,
+            dryrun=dryrun,
+            verbose=verbose,
+            **kwargs,
+        )
+
+
+    async def plan_sync(
+        self,
+        source: str,
+        target: str,
+        **kwargs,
+    ) -> list[dict]:
+        return await self.__run(self.__s3_plus.plan_sync, source=source, target=target, **kwargs)
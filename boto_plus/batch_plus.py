@@ -2,6 +2,8 @@ import datetime as dt
 import boto3
 import botocore
 
+import boto_plus
+
 
 class BatchPlus:
 
@@ -10,10 +12,11 @@ class BatchPlus:
         boto_config,
         boto_session=None,
     ):
-        if boto_session is not None:
-            self.__batch_client = boto_session.client('batch', config=boto_config)
-        else:
-            self.__batch_client = boto3.client('batch', config=boto_config)
+        self.__batch_client = boto_plus.helpers.get_client_factory().get_client(
+            service_name='batch',
+            boto_config=boto_config,
+            boto_session=boto_session,
+        )
 
 
     def get_runtime_of_jobs(
@@ -3,6 +3,8 @@ import uuid
 import boto3
 import botocore
 
+import boto_plus
+
 
 class DynamoPlus:
 
@@ -11,10 +13,11 @@ class DynamoPlus:
         boto_config,
         boto_session=None,
     ):
-        if boto_session is not None:
-            self.__dynamo_resource = boto_session.resource('dynamodb', config=boto_config)
-        else:
-            self.__dynamo_resource = boto3.resource('dynamodb', config=boto_config)
+        self.__dynamo_resource = boto_plus.helpers.get_client_factory().get_resource(
+            service_name='dynamodb',
+            boto_config=boto_config,
+            boto_session=boto_session,
+        )
 
 
     def does_table_exist(
@@ -3,6 +3,13 @@ from .helpers import (
     convert_filepath_to_posix,
     convert_filepath_to_windows,
     get_local_file_hash,
+    get_local_file_hashes,
+    get_local_file_multipart_hash,
+    get_local_file_multipart_hashes,
+    get_multipart_part_size_candidates,
+    is_checksum_algorithm_available,
+    get_local_file_checksum,
+    get_local_file_checksums,
     get_contents_hash,
     create_textfile,
     get_textfile_content,
@@ -11,3 +18,33 @@ from .helpers import (
     is_posix_filepath,
     open_json,
 )
+
+from .client_factory import (
+    ClientFactory,
+    get_client_factory,
+)
+
+from .hash_index import (
+    LocalHashIndex,
+)
+
+from .lru_cache import (
+    LRUCache,
+)
+
+from .request_rate_limiter import (
+    RequestRateLimiter,
+)
+
+from .s3_object_reader import (
+    S3ObjectReader,
+)
+
+from .transfer_journal import (
+    TransferJournal,
+)
+
+from .transfer_metrics import (
+    TransferMetrics,
+    format_transfer_summary,
+)
@@ -0,0 +1,175 @@
+import os
+import threading
+import weakref
+import boto3
+import botocore
+
+
+class ClientFactory:
+    """
+    Thread-safe cache of boto3 clients, keyed on (session, service, region, config), so every
+    wrapper that talks to the same service shares one client and its pool of warm connections.
+    Clients are cached per session because they inherit its event handlers and credentials --
+    refreshable credentials are renewed by the client itself, without a new client. Wrappers
+    created without a session all share boto3's default one.
+
+    Each client's connection pool holds at least as many connections as the largest
+    `max_pool_connections` requested for it; a request for more rebuilds the cached client with a
+    larger pool. boto3 clients are thread-safe, resources are not -- `get_resource` returns a new
+    resource on every call, wrapping the shared client.
+    """
+
+    def __init__(
+        self,
+    ):
+        self.__lock = threading.Lock()
+
+        # session -> {key -> (client, pool size)}, dropped along with the session
+        self.__clients = weakref.WeakKeyDictionary()
+        self.__hits = 0
+        self.__misses = 0
+
+
+    def get_client(
+        self,
+        service_name: str,
+        boto_config,
+        boto_session=None,
+        max_pool_connections=None,
+        cache=True,
+    ):
+        if boto_session is None:
+            boto_session = self.__get_default_session()
+
+        pool_size = max(max_pool_connections or 0, boto_config.max_pool_connections or 10)
+
+        if not cache:
+            return self.__create_client(service_name, boto_config, boto_session, pool_size)
+
+        key = self.__get_key(service_name, boto_config, boto_session)
+
+        # sessions are not thread-safe either -- clients are also created under the lock
+        with self.__lock:
+            clients = self.__clients.setdefault(boto_session, dict())
+            entry = clients.get(key)
+
+            if entry is not None and entry[1] >= pool_size:
+                self.__hits += 1
+                return entry[0]
+
+            self.__misses += 1
+            client = self.__create_client(service_name, boto_config, boto_session, pool_size)
+            clients[key] = (client, pool_size)
+
+        return client
+
+
+    def get_resource(
+        self,
+        service_name: str,
+        boto_config,
+        boto_session=None,
+        max_pool_connections=None,
+        cache=True,
+    ):
+        if boto_session is None:
+            boto_session = self.__get_default_session()
+
+        client = self.get_client(
+            service_name=service_name,
+            boto_config=boto_config,
+            boto_session=boto_session,
+            max_pool_connections=max_pool_connections,
+            cache=cache,
+        )
+
+        # the resource's own client never sends a request -- swap in the shared one
+        with self.__lock:
+            resource = boto_session.resource(service_name, config=boto_config)
+        resource.meta.client = client
+
+        return resource
+
+
+    def clear(
+        self,
+    ):
+        with self.__lock:
+            self.__clients.clear()
+            self.__hits = 0
+            self.__misses = 0
+
+
+    def get_stats(
+        self,
+    ) -> dict:
+        with self.__lock:
+            stats = {
+                'clients' : sum(len(clients) for clients in self.__clients.values()),
+                'hits'    : self.__hits,
+                'misses'  : self.__misses,
+            }
+
+        return stats
+
+
+    def __get_default_session(
+        self,
+    ):
+        with self.__lock:
+            if boto3.DEFAULT_SESSION is None:
+                boto3.setup_default_session()
+
+            return boto3.DEFAULT_SESSION
+
+
+    def __create_client(
+        self,
+        service_name: str,
+        boto_config,
+        boto_session,
+        pool_size: int,
+    ):
+        config = boto_config.merge(botocore.config.Config(max_pool_connections=pool_size))
+        return boto_session.client(service_name, config=config)
+
+
+    def __get_key(
+        self,
+        service_name: str,
+        boto_config,
+        boto_session,
+    ) -> tuple:
+        # Config defines no equality -- compare every option except the pool size, which is handled separately
+        options = tuple(
+            (name, repr(getattr(boto_config, name, None)))
+            for name in sorted(botocore.config.Config.OPTION_DEFAULTS)
+            if name != 'max_pool_connections'
+        )
+
+        key = (
+            service_name,
+            boto_config.region_name or boto_session.region_name,
+            options,
+        )
+
+        return key
+
+
+_client_factory = ClientFactory()
+
+
+def get_client_factory(
+) -> ClientFactory:
+    """ Returns the process-wide ClientFactory. """
+    return _client_factory
+
+
+def _reset_client_factory(
+):
+    # pooled connections must not be shared with a forked child -- it starts with an empty cache
+    global _client_factory
+    _client_factory = ClientFactory()
+
+
+os.register_at_fork(after_in_child=_reset_client_factory)
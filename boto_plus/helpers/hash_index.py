@@ -0,0 +1,214 @@
+import os
+import sqlite3
+import threading
+import concurrent.futures
+
+from .helpers import get_local_file_hash
+
+
+class LocalHashIndex:
+    """
+    On-disk cache of local file hashes, stored in a SQLite file.
+
+    An entry is only trusted while the file's size, modification time (in nanoseconds) and
+    inode are unchanged -- any difference invalidates it and the file is rehashed. Entries for
+    files that no longer exist are dropped with `prune()`, and `rebuild()` discards the index.
+    """
+
+    # bump when the table layout or the hashing scheme changes -- older indexes are discarded
+    SCHEMA_VERSION = 1
+
+    def __init__(
+        self,
+        index_filepath: str,
+        commit_interval=1000,
+    ):
+        self.__index_filepath = index_filepath
+        self.__commit_interval = commit_interval
+        self.__open()
+
+
+    def __open(
+        self,
+    ):
+        directory = os.path.dirname(os.path.abspath(self.__index_filepath))
+        os.makedirs(directory, exist_ok=True)
+
+        self.__lock = threading.Lock()
+        self.__pending_writes = 0
+        self.__hits = 0
+        self.__misses = 0
+
+        self.__connection = sqlite3.connect(
+            self.__index_filepath,
+            timeout=30,
+            check_same_thread=False,
+        )
+        self.__connection.execute('PRAGMA journal_mode=WAL')
+        self.__connection.execute('PRAGMA synchronous=NORMAL')
+
+        schema_version = self.__connection.execute('PRAGMA user_version').fetchone()[0]
+        if schema_version != self.SCHEMA_VERSION:
+            self.__connection.execute('DROP TABLE IF EXISTS file_hashes')
+            self.__connection.execute(f'PRAGMA user_version={self.SCHEMA_VERSION}')
+
+        self.__connection.execute(
+            '''
+            CREATE TABLE IF NOT EXISTS file_hashes (
+                path     TEXT PRIMARY KEY,
+                size     INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                inode    INTEGER NOT NULL,
+                hash     TEXT NOT NULL
+            )
+            '''
+        )
+        self.__connection.commit()
+
+
+    def __getstate__(
+        self,
+    ) -> dict:
+        # sqlite connections cannot be pickled -- worker processes reopen the index file
+        return {
+            'index_filepath'  : self.__index_filepath,
+            'commit_interval' : self.__commit_interval,
+        }
+
+
+    def __setstate__(
+        self,
+        state: dict,
+    ):
+        self.__index_filepath = state['index_filepath']
+        self.__commit_interval = state['commit_interval']
+        self.__open()
+
+
+    def __enter__(
+        self,
+    ):
+        return self
+
+
+    def __exit__(
+        self,
+        exc_type,
+        exc_value,
+        traceback,
+    ):
+        self.close()
+
+
+    def get_index_filepath(
+        self,
+    ) -> str:
+        return self.__index_filepath
+
+
+    def get_file_hash(
+        self,
+        filepath: str,
+    ) -> str:
+        path = os.path.abspath(filepath)
+
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            raise RuntimeError(f'Provided file "{filepath}" does not exist.')
+
+        with self.__lock:
+            row = self.__connection.execute(
+                'SELECT size, mtime_ns, inode, hash FROM file_hashes WHERE path = ?',
+                (path,),
+            ).fetchone()
+
+        if row is not None and tuple(row[:3]) == (stat.st_size, stat.st_mtime_ns, stat.st_ino):
+            with self.__lock:
+                self.__hits += 1
+            return row[3]
+
+        file_hash = get_local_file_hash(path)
+
+        with self.__lock:
+            self.__misses += 1
+            self.__connection.execute(
+                'INSERT OR REPLACE INTO file_hashes (path, size, mtime_ns, inode, hash) VALUES (?, ?, ?, ?, ?)',
+                (path, stat.st_size, stat.st_mtime_ns, stat.st_ino, file_hash),
+            )
+
+            # committing every write would make the index slower than rehashing small files
+            self.__pending_writes += 1
+            if self.__pending_writes >= self.__commit_interval:
+                self.__connection.commit()
+                self.__pending_writes = 0
+
+        return file_hash
+
+
+    def get_file_hashes(
+        self,
+        filepaths: list[str],
+        max_workers=None,
+    ) -> dict:
+        if max_workers is None:
+            max_workers = min(32, (os.cpu_count() or 1) + 4)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            hashes = dict(zip(filepaths, executor.map(self.get_file_hash, filepaths)))
+
+        return hashes
+
+
+    def prune(
+        self,
+    ) -> int:
+        with self.__lock:
+            paths = [row[0] for row in self.__connection.execute('SELECT path FROM file_hashes')]
+            missing = [(path,) for path in paths if not os.path.isfile(path)]
+
+            self.__connection.executemany('DELETE FROM file_hashes WHERE path = ?', missing)
+            self.__connection.commit()
+            self.__pending_writes = 0
+
+        return len(missing)
+
+
+    def rebuild(
+        self,
+    ):
+        with self.__lock:
+            self.__connection.execute('DELETE FROM file_hashes')
+            self.__connection.commit()
+            self.__pending_writes = 0
+
+
+    def get_stats(
+        self,
+    ) -> dict:
+        with self.__lock:
+            n_entries = self.__connection.execute('SELECT COUNT(*) FROM file_hashes').fetchone()[0]
+
+            stats = {
+                'entries' : n_entries,
+                'hits'    : self.__hits,
+                'misses'  : self.__misses,
+            }
+
+        return stats
+
+
+    def flush(
+        self,
+    ):
+        with self.__lock:
+            self.__connection.commit()
+            self.__pending_writes = 0
+
+
+    def close(
+        self,
+    ):
+        with self.__lock:
+            self.__connection.commit()
+            self.__connection.close()
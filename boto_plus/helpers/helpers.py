@@ -1,6 +1,17 @@
 import os
 import json
+import math
+import mmap
+import zlib
+import base64
 import hashlib
+import concurrent.futures
+
+# CRC32C and CRC64NVME are only available through the optional awscrt package (botocore[crt])
+try:
+    from awscrt import checksums as crt_checksums
+except ImportError:
+    crt_checksums = None
 
 
 def get_filepaths_in_directory(
@@ -68,13 +79,27 @@ def convert_filepath_to_windows(
 
 def get_local_file_hash(
     filepath: str,
-    chunk_size=4096
+    chunk_size=1024 * 1024,
+    mmap_threshold=64 * 1024 * 1024,
 ) -> str:
     if os.path.isfile(filepath):
         hash_md5 = hashlib.md5()
         with open(filepath, 'rb') as file:
-            for chunk in iter(lambda: file.read(chunk_size), b''):
-                hash_md5.update(chunk)
+            file_size = os.fstat(file.fileno()).st_size
+
+            # large files are hashed straight from a read-only mapping -- one call, no copies, GIL released
+            if file_size >= mmap_threshold:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+                    hash_md5.update(mapping)
+
+            else:
+                buffer = bytearray(chunk_size)
+                view = memoryview(buffer)
+                while True:
+                    amount_read = file.readinto(buffer)
+                    if amount_read == 0:
+                        break
+                    hash_md5.update(view[:amount_read])
 
         local_file_hash = hash_md5.hexdigest()
 
@@ -84,6 +109,219 @@ def get_local_file_hash(
     return local_file_hash
 
 
+def get_local_file_hashes(
+    filepaths: list[str],
+    max_workers=None,
+) -> dict:
+    # hashlib releases the GIL while hashing, so threads scale across cores
+    if max_workers is None:
+        max_workers = min(32, (os.cpu_count() or 1) + 4)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        hashes = dict(zip(filepaths, executor.map(get_local_file_hash, filepaths)))
+
+    return hashes
+
+
+def get_local_file_multipart_hash(
+    filepath: str,
+    part_size=8 * 1024 * 1024,
+    max_workers=None,
+) -> str:
+    """
+    Hashes `filepath` in `part_size` parts, in parallel, and combines them the way S3 builds a
+    multipart ETag: the MD5 of the concatenated part MD5s, followed by "-<number of parts>".
+    """
+    if not os.path.isfile(filepath):
+        raise RuntimeError(f'Provided file "{filepath}" does not exist.')
+
+    if max_workers is None:
+        max_workers = min(32, (os.cpu_count() or 1) + 4)
+
+    file_size = os.path.getsize(filepath)
+    if file_size == 0:
+        return f'{hashlib.md5(hashlib.md5().digest()).hexdigest()}-1'
+
+    with open(filepath, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+            with memoryview(mapping) as view:
+                # memoryview slices are zero-copy, and hashlib releases the GIL while hashing them
+                def hash_part(start):
+                    with view[start:start + part_size] as part:
+                        return hashlib.md5(part).digest()
+
+                with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    part_digests = list(executor.map(hash_part, range(0, file_size, part_size)))
+
+    multipart_hash = hashlib.md5(b''.join(part_digests)).hexdigest()
+    return f'{multipart_hash}-{len(part_digests)}'
+
+
+def get_local_file_multipart_hashes(
+    filepath: str,
+    part_sizes: list[int],
+    chunk_size=1024 * 1024,
+) -> tuple[dict, str]:
+    """
+    Multipart ETags of `filepath` for each of `part_sizes`, and its plain MD5, from a single read
+    of the file -- for matching an ETag whose part size is unknown without rereading per guess.
+    """
+    if not os.path.isfile(filepath):
+        raise RuntimeError(f'Provided file "{filepath}" does not exist.')
+
+    hash_md5 = hashlib.md5()
+    part_hashes = {part_size : hashlib.md5() for part_size in part_sizes}
+    part_digests = {part_size : list() for part_size in part_sizes}
+
+    offset = 0
+    with open(filepath, 'rb') as file:
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        while True:
+            amount_read = file.readinto(buffer)
+            if amount_read == 0:
+                break
+
+            hash_md5.update(view[:amount_read])
+
+            # split the chunk wherever one of the candidate parts ends
+            for part_size in part_sizes:
+                position = 0
+                while position < amount_read:
+                    n_bytes = min(amount_read - position, part_size - (offset + position) % part_size)
+                    part_hashes[part_size].update(view[position:position + n_bytes])
+                    position += n_bytes
+
+                    if (offset + position) % part_size == 0:
+                        part_digests[part_size].append(part_hashes[part_size].digest())
+                        part_hashes[part_size] = hashlib.md5()
+
+            offset += amount_read
+
+    multipart_hashes = dict()
+    for part_size in part_sizes:
+        digests = part_digests[part_size]
+
+        # the last, shorter part -- or the only part of an empty file
+        if offset == 0 or offset % part_size != 0:
+            digests.append(part_hashes[part_size].digest())
+
+        multipart_hashes[part_size] = f'{hashlib.md5(b"".join(digests)).hexdigest()}-{len(digests)}'
+
+    return multipart_hashes, hash_md5.hexdigest()
+
+
+def get_multipart_part_size_candidates(
+    file_size: int,
+    n_parts: int,
+    preferred_part_sizes=None,
+) -> list[int]:
+    """
+    Part sizes that split a `file_size`-byte file into exactly `n_parts` parts -- the inputs a
+    multipart ETag "<md5>-<n_parts>" may have been built from. `preferred_part_sizes` come first,
+    then common tool defaults (doubled until they fit in 10,000 parts, as boto3 and the AWS CLI
+    do), then the smallest whole number of MiB that gives `n_parts` parts.
+    """
+    # one part holds the whole file, whatever the part size was
+    if n_parts == 1:
+        return [max(file_size, 1)]
+
+    mib = 1024 * 1024
+    common_part_sizes = [size * mib for size in (8, 5, 16, 15, 32, 64, 100, 128, 256, 512)]
+
+    candidates = list()
+    for part_size in (preferred_part_sizes or list()) + common_part_sizes:
+        while math.ceil(file_size / part_size) > 10000:
+            part_size *= 2
+        candidates.append(part_size)
+
+    candidates.append(math.ceil(file_size / n_parts / mib) * mib)
+
+    part_sizes = list()
+    for part_size in candidates:
+        if part_size not in part_sizes and math.ceil(file_size / part_size) == n_parts:
+            part_sizes.append(part_size)
+
+    return part_sizes
+
+
+def is_checksum_algorithm_available(
+    algorithm: str,
+) -> bool:
+    if algorithm in ('CRC32C', 'CRC64NVME'):
+        return crt_checksums is not None
+
+    return algorithm in ('CRC32', 'SHA1', 'SHA256')
+
+
+def get_local_file_checksum(
+    filepath: str,
+    algorithm='SHA256',
+    chunk_size=1024 * 1024,
+) -> str:
+    """
+    Computes the full-object checksum S3 stores for `ChecksumAlgorithm=<algorithm>` -- the
+    base64-encoded digest (or big-endian CRC) of the file contents.
+    """
+    if not os.path.isfile(filepath):
+        raise RuntimeError(f'Provided file "{filepath}" does not exist.')
+
+    if algorithm in ('SHA1', 'SHA256'):
+        hash_object = hashlib.new(algorithm.lower())
+        update = hash_object.update
+        digest = hash_object.digest
+
+    elif algorithm in ('CRC32', 'CRC32C', 'CRC64NVME'):
+        if algorithm == 'CRC32':
+            crc_function, n_bytes = zlib.crc32, 4
+
+        elif crt_checksums is None:
+            raise RuntimeError(f'Checksum algorithm "{algorithm}" requires the awscrt package (pip install "botocore[crt]").')
+
+        elif algorithm == 'CRC32C':
+            crc_function, n_bytes = crt_checksums.crc32c, 4
+
+        else:
+            crc_function, n_bytes = crt_checksums.crc64nvme, 8
+
+        crc = 0
+        def update(data):
+            nonlocal crc
+            crc = crc_function(data, crc)
+
+        def digest():
+            return crc.to_bytes(n_bytes, 'big')
+
+    else:
+        raise RuntimeError(f'Unsupported checksum algorithm "{algorithm}".')
+
+    with open(filepath, 'rb') as file:
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        while True:
+            amount_read = file.readinto(buffer)
+            if amount_read == 0:
+                break
+            update(view[:amount_read])
+
+    return base64.b64encode(digest()).decode('ascii')
+
+
+def get_local_file_checksums(
+    filepaths: list[str],
+    algorithm='SHA256',
+    max_workers=None,
+) -> dict:
+    if max_workers is None:
+        max_workers = min(32, (os.cpu_count() or 1) + 4)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        checksums = executor.map(lambda filepath: get_local_file_checksum(filepath, algorithm), filepaths)
+        checksums = dict(zip(filepaths, checksums))
+
+    return checksums
+
+
 def get_contents_hash(
     contents: bytes,
 ):
@@ -0,0 +1,118 @@
+import time
+import threading
+import collections
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache with an entry limit and a per-entry time-to-live.
+
+    `max_entries=0` disables caching; `ttl=None` keeps entries until they are evicted.
+    """
+
+    def __init__(
+        self,
+        max_entries=1024,
+        ttl=None,
+    ):
+        self.__max_entries = max_entries
+        self.__ttl = ttl
+        self.__initialize()
+
+
+    def __initialize(
+        self,
+    ):
+        self.__entries = collections.OrderedDict()
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+
+    def __getstate__(
+        self,
+    ) -> dict:
+        # locks cannot be pickled -- copies start empty
+        return {
+            'max_entries' : self.__max_entries,
+            'ttl'         : self.__ttl,
+        }
+
+
+    def __setstate__(
+        self,
+        state: dict,
+    ):
+        self.__max_entries = state['max_entries']
+        self.__ttl = state['ttl']
+        self.__initialize()
+
+
+    def get(
+        self,
+        key,
+        default=None,
+    ):
+        with self.__lock:
+            entry = self.__entries.get(key)
+
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self.__entries.move_to_end(key)
+                    self.__hits += 1
+                    return value
+
+                del self.__entries[key]
+
+            self.__misses += 1
+            return default
+
+
+    def put(
+        self,
+        key,
+        value,
+    ):
+        if self.__max_entries <= 0:
+            return
+
+        expires_at = time.monotonic() + self.__ttl if self.__ttl is not None else None
+
+        with self.__lock:
+            self.__entries[key] = (value, expires_at)
+            self.__entries.move_to_end(key)
+
+            while len(self.__entries) > self.__max_entries:
+                self.__entries.popitem(last=False)
+                self.__evictions += 1
+
+
+    def invalidate(
+        self,
+        key,
+    ):
+        with self.__lock:
+            self.__entries.pop(key, None)
+
+
+    def clear(
+        self,
+    ):
+        with self.__lock:
+            self.__entries.clear()
+
+
+    def get_stats(
+        self,
+    ) -> dict:
+        with self.__lock:
+            stats = {
+                'entries'   : len(self.__entries),
+                'hits'      : self.__hits,
+                'misses'    : self.__misses,
+                'evictions' : self.__evictions,
+            }
+
+        return stats
@@ -0,0 +1,172 @@
+import time
+import threading
+
+
+class RequestRateLimiter:
+    """
+    Thread-safe token buckets keyed on (bucket, partition prefix, read or write), pacing requests
+    to stay under S3's per-prefix limits (about 5,500 GET/HEAD/LIST and 3,500 PUT/COPY/POST/DELETE
+    requests per second).
+
+    The partition prefix of a key is its first `prefix_depth` "/"-separated parts. Each throttle
+    reported for a prefix lowers its rate by `slowdown_step` requests per second, down to
+    `min_rate`; the rate then recovers by `recovery_step` requests per second for every second
+    without a throttle, up to the configured limit.
+    """
+
+    def __init__(
+        self,
+        read_rate=5500,
+        write_rate=3500,
+        prefix_depth=1,
+        burst_seconds=1.0,
+        slowdown_step=500,
+        recovery_step=100,
+        min_rate=10,
+    ):
+        if read_rate <= 0 or write_rate <= 0 or min_rate <= 0:
+            raise RuntimeError('Provided "read_rate", "write_rate" and "min_rate" must be positive.')
+
+        self.__read_rate = read_rate
+        self.__write_rate = write_rate
+        self.__prefix_depth = prefix_depth
+        self.__burst_seconds = burst_seconds
+        self.__slowdown_step = slowdown_step
+        self.__recovery_step = recovery_step
+        self.__min_rate = min_rate
+        self.__initialize()
+
+
+    def __initialize(
+        self,
+    ):
+        self.__lock = threading.Lock()
+
+        # (bucket, prefix, is_write) -> {'rate', 'tokens', 'updated', 'throttled', 'throttles', 'wait_seconds'}
+        self.__buckets = dict()
+
+
+    def __getstate__(
+        self,
+    ) -> dict:
+        # locks cannot be pickled -- copies start with full buckets
+        state = self.__dict__.copy()
+        state.pop('_RequestRateLimiter__lock')
+        state.pop('_RequestRateLimiter__buckets')
+        return state
+
+
+    def __setstate__(
+        self,
+        state: dict,
+    ):
+        self.__dict__.update(state)
+        self.__initialize()
+
+
+    def get_partition_prefix(
+        self,
+        key: str,
+    ) -> str:
+        # "a/b/c.txt" -> "a/" at depth 1, "a/b/" at depth 2 or more; keys without a "/" map to ""
+        directories = key.split('/')[:-1][:self.__prefix_depth]
+        return ''.join(f'{directory}/' for directory in directories)
+
+
+    def acquire(
+        self,
+        bucket: str,
+        key: str,
+        is_write: bool,
+        n_requests=1,
+    ) -> float:
+        """ Blocks until `n_requests` may be sent to the partition holding `key`. Returns the seconds waited. """
+        with self.__lock:
+            state = self.__get_state(bucket, key, is_write)
+
+            # reserve the tokens now (possibly going into debt), then wait outside the lock
+            # until the debt has been paid back -- later callers queue behind earlier ones
+            state['tokens'] -= n_requests
+            wait = max(0.0, -state['tokens'] / state['rate'])
+            state['wait_seconds'] += wait
+
+        if wait > 0:
+            time.sleep(wait)
+
+        return wait
+
+
+    def record_throttle(
+        self,
+        bucket: str,
+        key: str,
+        is_write: bool,
+    ):
+        with self.__lock:
+            state = self.__get_state(bucket, key, is_write)
+            state['rate'] = max(self.__min_rate, state['rate'] - self.__slowdown_step)
+            state['tokens'] = min(state['tokens'], 0.0)
+            state['throttled'] = state['updated']
+            state['throttles'] += 1
+
+
+    def get_rate(
+        self,
+        bucket: str,
+        key: str,
+        is_write: bool,
+    ) -> float:
+        with self.__lock:
+            return self.__get_state(bucket, key, is_write)['rate']
+
+
+    def get_stats(
+        self,
+    ) -> dict:
+        with self.__lock:
+            stats = {
+                (bucket, prefix, 'write' if is_write else 'read') : {
+                    'rate'         : state['rate'],
+                    'throttles'    : state['throttles'],
+                    'wait_seconds' : state['wait_seconds'],
+                }
+                for (bucket, prefix, is_write), state in self.__buckets.items()
+            }
+
+        return stats
+
+
+    def __get_state(
+        self,
+        bucket: str,
+        key: str,
+        is_write: bool,
+    ) -> dict:
+        """ Returns the bucket state for `key`, refilled and recovered up to now. Must hold the lock. """
+        now = time.monotonic()
+        max_rate = self.__write_rate if is_write else self.__read_rate
+        state_key = (bucket, self.get_partition_prefix(key), is_write)
+
+        state = self.__buckets.get(state_key)
+        if state is None:
+            state = {
+                'rate'         : max_rate,
+                'tokens'       : max_rate * self.__burst_seconds,
+                'updated'      : now,
+                'throttled'    : None,
+                'throttles'    : 0,
+                'wait_seconds' : 0.0,
+            }
+            self.__buckets[state_key] = state
+            return state
+
+        elapsed = now - state['updated']
+
+        # additive recovery, only once the prefix has gone a full second without a throttle
+        if state['rate'] < max_rate and now - state['throttled'] >= 1.0:
+            state['rate'] = min(max_rate, state['rate'] + self.__recovery_step * elapsed)
+
+        state['tokens'] = min(state['rate'] * self.__burst_seconds, state['tokens'] + state['rate'] * elapsed)
+        state['updated'] = now
+
+        return state
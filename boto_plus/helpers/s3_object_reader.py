@@ -0,0 +1,307 @@
+import io
+import os
+import threading
+import concurrent.futures
+
+from .lru_cache import (
+    LRUCache,
+)
+
+
+class S3ObjectReader(io.RawIOBase):
+    """
+    Read-only, seekable file object over a remote object of known size, fetched in fixed-size
+    blocks through `read_range(start, end)` -- e.g. ranged GETs, see `S3Plus.open`.
+
+    Fetched blocks are kept in an LRU cache of `cache_blocks` blocks. A read spanning several
+    missing blocks fetches them concurrently. Once reads run back to back, the blocks after the
+    current one are prefetched, the window doubling with every sequential read up to `read_ahead`
+    blocks; a seek elsewhere drops the window again, so random access only fetches what it reads.
+    """
+
+    def __init__(
+        self,
+        read_range,
+        size: int,
+        name=None,
+        block_size=1024 * 1024,
+        cache_blocks=64,
+        read_ahead=4,
+        max_workers=4,
+    ):
+        super().__init__()
+
+        # set up first -- close() runs on garbage collection, even if the checks below raise
+        self.__cache = LRUCache(max_entries=cache_blocks)
+        self.__executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, max_workers))
+        self.__lock = threading.Lock()
+
+        # block number -> future, for demand fetches and prefetches not yet consumed
+        self.__in_flight = dict()
+
+        if block_size <= 0:
+            raise RuntimeError(f'Provided "block_size" must be positive. (Received {block_size})')
+
+        self.__read_range = read_range
+        self.__size = size
+        self.name = name
+        self.__block_size = block_size
+        self.__read_ahead = max(0, read_ahead)
+        self.__n_blocks = -(-size // block_size)
+
+        self.__position = 0
+        self.__last_read_end = None
+        self.__n_sequential = 0
+
+        self.__n_requests = 0
+        self.__n_bytes_fetched = 0
+        self.__n_block_hits = 0
+        self.__n_block_misses = 0
+        self.__n_prefetched = 0
+
+
+    def readable(
+        self,
+    ) -> bool:
+        return True
+
+
+    def seekable(
+        self,
+    ) -> bool:
+        return True
+
+
+    def get_size(
+        self,
+    ) -> int:
+        return self.__size
+
+
+    def tell(
+        self,
+    ) -> int:
+        self.__check_open()
+        return self.__position
+
+
+    def seek(
+        self,
+        offset: int,
+        whence=os.SEEK_SET,
+    ) -> int:
+        self.__check_open()
+
+        if whence == os.SEEK_SET:
+            position = offset
+        elif whence == os.SEEK_CUR:
+            position = self.__position + offset
+        elif whence == os.SEEK_END:
+            position = self.__size + offset
+        else:
+            raise ValueError(f'Invalid whence ({whence}).')
+
+        if position < 0:
+            raise ValueError(f'Negative seek position {position}.')
+
+        self.__position = position
+        return position
+
+
+    def read(
+        self,
+        size=-1,
+    ) -> bytes:
+        self.__check_open()
+
+        start = self.__position
+        end = self.__size if size is None or size < 0 else min(self.__size, start + size)
+
+        if start >= end:
+            return b''
+
+        first_block = start // self.__block_size
+        last_block = (end - 1) // self.__block_size
+
+        # a read that picks up where the last one stopped widens the read-ahead window
+        if start == self.__last_read_end:
+            self.__n_sequential += 1
+        else:
+            self.__n_sequential = 0
+            self.__cancel_prefetches(first_block, last_block)
+
+        blocks = self.__get_blocks(first_block, last_block)
+
+        if self.__n_sequential > 0 and self.__read_ahead > 0:
+            window = min(self.__read_ahead, 2 ** (self.__n_sequential - 1))
+            self.__prefetch(last_block + 1, min(self.__n_blocks, last_block + 1 + window))
+
+        offset = start - first_block * self.__block_size
+        contents = b''.join(blocks)[offset:offset + end - start]
+
+        self.__position = end
+        self.__last_read_end = end
+
+        return contents
+
+
+    def peek(
+        self,
+        size=0,
+    ) -> bytes:
+        """ Returns the rest of the current block without moving the position -- lets readline() scan whole blocks. """
+        self.__check_open()
+
+        if self.__position >= self.__size:
+            return b''
+
+        block_number = self.__position // self.__block_size
+        block = self.__get_blocks(block_number, block_number)[0]
+
+        return block[self.__position - block_number * self.__block_size:]
+
+
+    def readall(
+        self,
+    ) -> bytes:
+        return self.read(-1)
+
+
+    def readinto(
+        self,
+        buffer,
+    ) -> int:
+        contents = self.read(len(buffer))
+        buffer[:len(contents)] = contents
+        return len(contents)
+
+
+    def close(
+        self,
+    ):
+        if not self.closed:
+            with self.__lock:
+                for future in self.__in_flight.values():
+                    future.cancel()
+                self.__in_flight.clear()
+
+            self.__executor.shutdown(wait=False)
+            self.__cache.clear()
+
+        super().close()
+
+
+    def get_stats(
+        self,
+    ) -> dict:
+        with self.__lock:
+            stats = {
+                'requests'      : self.__n_requests,
+                'bytes_fetched' : self.__n_bytes_fetched,
+                'block_hits'    : self.__n_block_hits,
+                'block_misses'  : self.__n_block_misses,
+                'prefetched'    : self.__n_prefetched,
+            }
+
+        return stats
+
+
+    def __check_open(
+        self,
+    ):
+        if self.closed:
+            raise ValueError('I/O operation on closed file.')
+
+
+    def __fetch_block(
+        self,
+        block_number: int,
+    ) -> bytes:
+        start = block_number * self.__block_size
+        block = self.__read_range(start, min(start + self.__block_size, self.__size))
+
+        with self.__lock:
+            self.__n_requests += 1
+            self.__n_bytes_fetched += len(block)
+
+        return block
+
+
+    def __get_blocks(
+        self,
+        first_block: int,
+        last_block: int,
+    ) -> list[bytes]:
+        blocks = dict()
+
+        # start every missing block before waiting on any, so they are fetched concurrently
+        with self.__lock:
+            for block_number in range(first_block, last_block + 1):
+                block = self.__cache.get(block_number)
+
+                if block is not None:
+                    blocks[block_number] = block
+                    self.__n_block_hits += 1
+                    continue
+
+                self.__n_block_misses += 1
+                if block_number not in self.__in_flight:
+                    self.__in_flight[block_number] = self.__executor.submit(self.__fetch_block, block_number)
+
+        for block_number in range(first_block, last_block + 1):
+            if block_number in blocks:
+                continue
+
+            future = self.__in_flight[block_number]
+            try:
+                blocks[block_number] = future.result()
+
+            finally:
+                with self.__lock:
+                    self.__in_flight.pop(block_number, None)
+
+            self.__cache.put(block_number, blocks[block_number])
+
+        return [blocks[block_number] for block_number in range(first_block, last_block + 1)]
+
+
+    def __prefetch(
+        self,
+        first_block: int,
+        stop_block: int,
+    ):
+        with self.__lock:
+            self.__collect_prefetches()
+
+            for block_number in range(first_block, stop_block):
+                if block_number in self.__in_flight or self.__cache.get(block_number) is not None:
+                    continue
+
+                self.__in_flight[block_number] = self.__executor.submit(self.__fetch_block, block_number)
+                self.__n_prefetched += 1
+
+
+    def __cancel_prefetches(
+        self,
+        first_block: int,
+        last_block: int,
+    ):
+        """ Drops prefetches outside the blocks about to be read -- the read pattern changed. """
+        with self.__lock:
+            self.__collect_prefetches()
+
+            for block_number, future in list(self.__in_flight.items()):
+                if not first_block <= block_number <= last_block and future.cancel():
+                    del self.__in_flight[block_number]
+
+
+    def __collect_prefetches(
+        self,
+    ):
+        """ Moves finished prefetches into the cache, so in-flight blocks stay bounded. Must hold the lock. """
+        for block_number, future in list(self.__in_flight.items()):
+            if future.done():
+                del self.__in_flight[block_number]
+
+                if not future.cancelled() and future.exception() is None:
+                    self.__cache.put(block_number, future.result())
@@ -0,0 +1,186 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+
+class TransferJournal:
+    """
+    Append-only record of completed work items, kept in a local file, so a restarted bulk call can
+    skip what an earlier run already finished.
+
+    Each line holds a digest of an item's key and the item's result. Lines are buffered and written
+    (and fsync'ed, unless `fsync=False`) together at most every `flush_interval` seconds, so a crash
+    loses at most that much progress, and those items are simply done again. A line torn by a crash
+    is cut off when the journal is reopened.
+    """
+
+    HEADER = '# boto-plus transfer journal v1\n'
+
+    def __init__(
+        self,
+        journal_filepath: str,
+        flush_interval=1.0,
+        fsync=True,
+    ):
+        self.__journal_filepath = journal_filepath
+        self.__flush_interval = flush_interval
+        self.__fsync = fsync
+
+        self.__lock = threading.Lock()
+        self.__pending = list()
+        self.__last_flush_time = time.monotonic()
+
+        # digest -> result of every completed item
+        self.__completed = dict()
+        self.__n_skipped = 0
+
+        directory = os.path.dirname(os.path.abspath(journal_filepath))
+        os.makedirs(directory, exist_ok=True)
+
+        self.__load()
+        self.__file = open(journal_filepath, 'ab')
+
+        if self.__file.tell() == 0:
+            self.__file.write(self.HEADER.encode('utf-8'))
+            self.__file.flush()
+
+
+    def __load(
+        self,
+    ):
+        if not os.path.isfile(self.__journal_filepath):
+            return
+
+        with open(self.__journal_filepath, 'rb') as in_file:
+            contents = in_file.read()
+
+        header = self.HEADER.encode('utf-8')
+        if not contents.startswith(header) and not header.startswith(contents):
+            raise RuntimeError(f'Provided file "{self.__journal_filepath}" is not a transfer journal.')
+
+        # everything after the last intact line was torn by a crash -- drop it
+        valid_length = len(header) if contents.startswith(header) else 0
+        for line in contents[valid_length:].split(b'\n')[:-1]:
+            try:
+                digest, result = line.decode('utf-8').split('\t', 1)
+                self.__completed[digest] = json.loads(result)
+
+            except ValueError:
+                break
+
+            valid_length += len(line) + 1
+
+        if valid_length < len(contents):
+            with open(self.__journal_filepath, 'r+b') as out_file:
+                out_file.truncate(valid_length)
+
+
+    def __enter__(
+        self,
+    ):
+        return self
+
+
+    def __exit__(
+        self,
+        exc_type,
+        exc_value,
+        traceback,
+    ):
+        self.close()
+
+
+    def get_journal_filepath(
+        self,
+    ) -> str:
+        return self.__journal_filepath
+
+
+    def get_item_key(
+        self,
+        item,
+    ) -> str:
+        """ Digest identifying `item` -- any JSON-serializable value, e.g. a payload. """
+        encoded = json.dumps(item, sort_keys=True, default=repr).encode('utf-8')
+        return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+    def is_completed(
+        self,
+        item_key: str,
+    ) -> bool:
+        with self.__lock:
+            return item_key in self.__completed
+
+
+    def get_result(
+        self,
+        item_key: str,
+        default=None,
+    ):
+        with self.__lock:
+            if item_key in self.__completed:
+                self.__n_skipped += 1
+                return self.__completed[item_key]
+
+        return default
+
+
+    def record(
+        self,
+        item_key: str,
+        result=None,
+    ):
+        line = f'{item_key}\t{json.dumps(result, default=repr)}\n'
+
+        with self.__lock:
+            self.__completed[item_key] = result
+            self.__pending.append(line)
+
+            if time.monotonic() - self.__last_flush_time >= self.__flush_interval:
+                self.__flush()
+
+
+    def flush(
+        self,
+    ):
+        with self.__lock:
+            self.__flush()
+
+
+    def __flush(
+        self,
+    ):
+        """ Writes the pending lines in one go. Must hold the lock. """
+        if len(self.__pending) > 0:
+            self.__file.write(''.join(self.__pending).encode('utf-8'))
+            self.__file.flush()
+            if self.__fsync:
+                os.fsync(self.__file.fileno())
+            self.__pending = list()
+
+        self.__last_flush_time = time.monotonic()
+
+
+    def get_stats(
+        self,
+    ) -> dict:
+        with self.__lock:
+            stats = {
+                'completed' : len(self.__completed),
+                'skipped'   : self.__n_skipped,
+                'pending'   : len(self.__pending),
+            }
+
+        return stats
+
+
+    def close(
+        self,
+    ):
+        with self.__lock:
+            if not self.__file.closed:
+                self.__flush()
+                self.__file.close()
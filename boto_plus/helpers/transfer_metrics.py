@@ -0,0 +1,197 @@
+import time
+import bisect
+import threading
+import collections
+
+
+class TransferMetrics:
+    """
+    Thread-safe counters for bulk S3 operations: objects, bytes and failures per operation,
+    throughput since creation and over the last `window` seconds, and latency histograms.
+
+    `callback(summary)` is called with `get_summary()` at most every `callback_interval` seconds
+    while operations are recorded, and once more when a bulk call finishes.
+    """
+
+    # upper bounds (in seconds) of the latency histogram buckets
+    LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, float('inf'))
+
+    def __init__(
+        self,
+        callback=None,
+        callback_interval=1.0,
+        window=10.0,
+    ):
+        self.__callback = callback
+        self.__callback_interval = callback_interval
+        self.__window = window
+        self.__lock = threading.Lock()
+        self.reset()
+
+
+    def reset(
+        self,
+    ):
+        with self.__lock:
+            self.__start_time = time.monotonic()
+            self.__last_callback_time = self.__start_time
+            self.__operations = dict()
+
+            # [second, bytes, objects] per second with activity, oldest first
+            self.__recent = collections.deque()
+
+
+    def record(
+        self,
+        operation: str,
+        n_bytes=0,
+        latency=None,
+        success=True,
+        n_objects=1,
+    ):
+        now = time.monotonic()
+
+        with self.__lock:
+            stats = self.__operations.get(operation)
+            if stats is None:
+                stats = {
+                    'objects'       : 0,
+                    'bytes'         : 0,
+                    'failures'      : 0,
+                    'latency_count' : 0,
+                    'latency_total' : 0.0,
+                    'latency_max'   : 0.0,
+                    'histogram'     : [0] * len(self.LATENCY_BUCKETS),
+                }
+                self.__operations[operation] = stats
+
+            if success:
+                stats['objects'] += n_objects
+                stats['bytes'] += n_bytes
+            else:
+                stats['failures'] += n_objects
+
+            if latency is not None:
+                stats['latency_count'] += 1
+                stats['latency_total'] += latency
+                stats['latency_max'] = max(stats['latency_max'], latency)
+                stats['histogram'][bisect.bisect_left(self.LATENCY_BUCKETS, latency)] += 1
+
+            if success:
+                second = int(now)
+                if len(self.__recent) > 0 and self.__recent[-1][0] == second:
+                    self.__recent[-1][1] += n_bytes
+                    self.__recent[-1][2] += n_objects
+                else:
+                    self.__recent.append([second, n_bytes, n_objects])
+
+                self.__drop_old_seconds(now)
+
+            report = self.__callback is not None and now - self.__last_callback_time >= self.__callback_interval
+            if report:
+                self.__last_callback_time = now
+
+        # outside the lock, so the callback may read the metrics itself
+        if report:
+            self.__callback(self.get_summary())
+
+
+    def report(
+        self,
+    ):
+        if self.__callback is not None:
+            with self.__lock:
+                self.__last_callback_time = time.monotonic()
+            self.__callback(self.get_summary())
+
+
+    def __drop_old_seconds(
+        self,
+        now: float,
+    ):
+        while len(self.__recent) > 0 and self.__recent[0][0] < now - self.__window:
+            self.__recent.popleft()
+
+
+    def get_summary(
+        self,
+    ) -> dict:
+        mib = 1024 ** 2
+        now = time.monotonic()
+
+        with self.__lock:
+            self.__drop_old_seconds(now)
+
+            elapsed = max(now - self.__start_time, 1e-9)
+            window = max(min(self.__window, elapsed), 1e-9)
+            recent_bytes = sum(entry[1] for entry in self.__recent)
+            recent_objects = sum(entry[2] for entry in self.__recent)
+
+            operations = {
+                operation : self.__summarize_operation(stats)
+                for operation, stats in self.__operations.items()
+            }
+
+        n_objects = sum(stats['objects'] for stats in operations.values())
+        n_bytes = sum(stats['bytes'] for stats in operations.values())
+
+        summary = {
+            'elapsed_seconds'         : elapsed,
+            'objects'                 : n_objects,
+            'bytes'                   : n_bytes,
+            'failures'                : sum(stats['failures'] for stats in operations.values()),
+            'mib_per_second'          : n_bytes / mib / elapsed,
+            'ops_per_second'          : n_objects / elapsed,
+            'rolling_mib_per_second'  : recent_bytes / mib / window,
+            'rolling_ops_per_second'  : recent_objects / window,
+            'operations'              : operations,
+        }
+
+        return summary
+
+
+    def __summarize_operation(
+        self,
+        stats: dict,
+    ) -> dict:
+        n_latencies = stats['latency_count']
+
+        def percentile(fraction):
+            # upper bound of the bucket holding the requested rank, capped at the slowest call seen
+            if n_latencies == 0:
+                return None
+
+            rank = fraction * n_latencies
+            cumulative = 0
+            for bound, count in zip(self.LATENCY_BUCKETS, stats['histogram']):
+                cumulative += count
+                if cumulative >= rank:
+                    return min(bound, stats['latency_max'])
+
+        summary = {
+            'objects'   : stats['objects'],
+            'bytes'     : stats['bytes'],
+            'failures'  : stats['failures'],
+            'latency'   : {
+                'count' : n_latencies,
+                'mean'  : stats['latency_total'] / n_latencies if n_latencies > 0 else None,
+                'max'   : stats['latency_max'] if n_latencies > 0 else None,
+                'p50'   : percentile(0.50),
+                'p90'   : percentile(0.90),
+                'p99'   : percentile(0.99),
+            },
+            'histogram' : list(zip(self.LATENCY_BUCKETS, stats['histogram'])),
+        }
+
+        return summary
+
+
+def format_transfer_summary(
+    summary: dict,
+) -> str:
+    line = (
+        f'{summary["objects"]} objects, {summary["bytes"] / 1024 ** 2:.1f} MiB, {summary["failures"]} failures -- '
+        f'{summary["rolling_mib_per_second"]:.1f} MiB/s, {summary["rolling_ops_per_second"]:.1f} ops/s'
+    )
+
+    return line
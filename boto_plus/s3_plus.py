@@ -1,25 +1,251 @@
 import os
+import time
+import json
+import gzip
+import uuid
+import tarfile
+import typing
 import posixpath
+import heapq
+import collections
 import multiprocessing as mp
+import concurrent.futures
+import math
+import mmap
+import copy
+import pickle
+import hashlib
+import itertools
+import threading
 import boto3
+import boto3.s3.transfer
 import botocore
 
 import boto_plus
 
 
+# one listed object -- the fields list_objects_v2 returns for free, without a HEAD request
+S3ObjectRecord = collections.namedtuple(
+    'S3ObjectRecord',
+    ['key', 'size', 'etag', 'last_modified', 'storage_class'],
+)
+
+# one listed version or delete marker -- delete markers have no size
+S3ObjectVersionRecord = collections.namedtuple(
+    'S3ObjectVersionRecord',
+    ['key', 'version_id', 'is_latest', 'is_delete_marker', 'size', 'last_modified'],
+)
+
+
 class S3Plus:
 
     def __init__(
         self,
         boto_config,
         boto_session=None,
+        max_workers=None,
+        metadata_cache_size=0,
+        metadata_cache_ttl=60,
+        transfer_config=None,
+        checksum_algorithm=None,
+        rate_limiter=None,
     ):
-        if boto_session is not None:
-            self.__s3_resource = boto_session.resource('s3', config=boto_config)
+        if max_workers is not None:
+            self.__max_workers = max_workers
+        else:
+            self.__max_workers = min(32, (os.cpu_count() or 1) + 4)
+
+        # optional helpers.RequestRateLimiter pacing every request -- may be shared between instances
+        self.__rate_limiter = rate_limiter
+        self.__throttle_error_codes = {
+            'SlowDown',
+            'Throttling',
+            'ThrottlingException',
+            'RequestLimitExceeded',
+        }
+
+        self.__boto_config = boto_config
+        self.__boto_session = boto_session
+
+        # calls running concurrently may each grow the client's connection pool
+        self.__client_lock = threading.Lock()
+        self.__create_client()
+
+        # multipart settings for upload_file / download_file / copy, overridable per call
+        if transfer_config is not None:
+            self.__transfer_config = transfer_config
         else:
-            self.__s3_resource = boto3.resource('s3', config=boto_config)
+            self.__transfer_config = boto3.s3.transfer.TransferConfig()
+
+        # HEAD responses, keyed on (bucket, key) -- disabled unless metadata_cache_size > 0
+        self.__metadata_cache = boto_plus.helpers.LRUCache(
+            max_entries=metadata_cache_size,
+            ttl=metadata_cache_ttl,
+        )
 
         self.__s3_object_hash_field = 'x-amz-meta-object-hash'
+        self.__hash_index_filename = '.boto-plus-hash-index.sqlite'
+
+        # small-file packing -- tar shards under a prefix, plus an index of where each member's data starts
+        self.__pack_shard_size = 64 * 1024 ** 2
+        self.__pack_index_name = 'boto-plus-pack-index.json.gz'
+
+        # ranged and streaming reads are fetched in chunks of this size unless told otherwise
+        self.__read_chunk_size = 8 * 1024 ** 2
+
+        # native S3 checksums -- when set, every upload and copy asks S3 to store one
+        self.__checksum_algorithms = ('CRC32', 'CRC32C', 'CRC64NVME', 'SHA1', 'SHA256')
+        if checksum_algorithm is not None and checksum_algorithm not in self.__checksum_algorithms:
+            raise RuntimeError(f'Provided "checksum_algorithm" must be one of {self.__checksum_algorithms}. (Received "{checksum_algorithm}")')
+
+        if checksum_algorithm is not None and not boto_plus.helpers.is_checksum_algorithm_available(checksum_algorithm):
+            raise RuntimeError(f'Checksum algorithm "{checksum_algorithm}" requires the awscrt package (pip install "botocore[crt]").')
+
+        self.__checksum_algorithm = checksum_algorithm
+
+        # S3 multipart uploads are limited to 10,000 parts of at least 5 MiB (except the last)
+        self.__max_multipart_parts = 10000
+        self.__min_multipart_part_size = 5 * 1024 ** 2
+        self.__max_multipart_part_size = 5 * 1024 ** 3
+
+        # adaptive downloads aim for this many parts per concurrent worker -- enough to balance the
+        # workers, without one GET per default-sized chunk of a large object
+        self.__download_parts_per_worker = 4
+
+        # DeleteObjects accepts at most 1000 keys per request
+        self.__delete_batch_size = 1000
+        self.__retryable_error_codes = {
+            'InternalError',
+            'ServiceUnavailable',
+            'SlowDown',
+            'RequestTimeout',
+        }
+
+
+    def __create_client(
+        self,
+        max_pool_connections=None,
+    ):
+        # shared process-wide with a connection pool for every worker thread -- unless this
+        # instance's rate limiter hooks into the client's events, which would affect every user
+        self.__s3_client = boto_plus.helpers.get_client_factory().get_client(
+            service_name='s3',
+            boto_config=self.__boto_config,
+            boto_session=self.__boto_session,
+            max_pool_connections=max(self.__max_workers, max_pool_connections or 0),
+            cache=self.__rate_limiter is None,
+        )
+
+        if self.__rate_limiter is not None:
+            # every request made through the client -- including managed transfers -- waits for a token
+            events = self.__s3_client.meta.events
+            events.register('before-parameter-build.s3', self.__pace_request)
+            events.register('needs-retry.s3', self.__pace_retry)
+
+
+    def __reserve_connections(
+        self,
+        n_workers: int,
+    ):
+        """
+        Grows the client's pool for a call running more worker threads than this instance's `max_workers`.
+        The pool only grows -- threads still holding the previous client keep using it until they finish.
+        """
+        with self.__client_lock:
+            if n_workers > self.__s3_client.meta.config.max_pool_connections:
+                self.__create_client(max_pool_connections=n_workers)
+
+
+    def __pace_request(
+        self,
+        params: dict,
+        model,
+        context: dict,
+        **kwargs,
+    ):
+        bucket = params.get('Bucket')
+        if bucket is None:
+            return
+
+        n_requests = 1
+        if model.name == 'DeleteObjects':
+            # S3 counts every key of a DeleteObjects request against the prefix
+            objects = params.get('Delete', dict()).get('Objects', list())
+            key = objects[0]['Key'] if len(objects) > 0 else ''
+            n_requests = max(1, len(objects))
+
+        elif model.name.startswith('List'):
+            key = params.get('Prefix', '')
+
+        else:
+            key = params.get('Key', '')
+
+        is_write = not model.name.startswith(('Get', 'Head', 'List'))
+
+        context['boto_plus_rate_limit'] = (bucket, key, is_write)
+        self.__rate_limiter.acquire(bucket=bucket, key=key, is_write=is_write, n_requests=n_requests)
+
+
+    def __pace_retry(
+        self,
+        request_dict: dict,
+        response=None,
+        **kwargs,
+    ):
+        # botocore retries throttled requests itself -- slow the prefix down and pace the retry too
+        rate_limit = request_dict.get('context', dict()).get('boto_plus_rate_limit')
+        if response is None or rate_limit is None:
+            return None
+
+        code = response[1].get('Error', dict()).get('Code')
+        if code in self.__throttle_error_codes:
+            bucket, key, is_write = rate_limit
+            self.__rate_limiter.record_throttle(bucket=bucket, key=key, is_write=is_write)
+            self.__rate_limiter.acquire(bucket=bucket, key=key, is_write=is_write)
+
+        # never decide on the retry -- that is left to botocore's own handler
+        return None
+
+
+    def __getstate__(
+        self,
+    ) -> dict:
+        # boto3 sessions and clients cannot be pickled -- worker processes rebuild them
+        state = self.__dict__.copy()
+        state.pop('_S3Plus__s3_client')
+        state.pop('_S3Plus__client_lock')
+
+        # unset TransferConfig fields hold a sentinel object that does not survive pickling -- pin their values
+        transfer_config = copy.copy(self.__transfer_config)
+        for name in vars(self.__transfer_config):
+            setattr(transfer_config, name, getattr(self.__transfer_config, name))
+        state['_S3Plus__transfer_config'] = transfer_config
+
+        if self.__boto_session is not None:
+            credentials = self.__boto_session.get_credentials()
+            state['_S3Plus__boto_session'] = None
+            state['_S3Plus__session_kwargs'] = {
+                'aws_access_key_id'     : credentials.access_key if credentials is not None else None,
+                'aws_secret_access_key' : credentials.secret_key if credentials is not None else None,
+                'aws_session_token'     : credentials.token if credentials is not None else None,
+                'region_name'           : self.__boto_session.region_name,
+            }
+
+        return state
+
+
+    def __setstate__(
+        self,
+        state: dict,
+    ):
+        session_kwargs = state.pop('_S3Plus__session_kwargs', None)
+        self.__dict__.update(state)
+
+        if session_kwargs is not None:
+            self.__boto_session = boto3.session.Session(**session_kwargs)
+
+        self.__client_lock = threading.Lock()
+        self.__create_client()
 
 
     ### list ###
@@ -29,29 +255,182 @@ class S3Plus:
         prefix: str,
         filter=''
     ) -> list[str]:
-        items  = list()
+        items = [
+            record.key
+            for record in self.iter_objects(bucket=bucket, prefix=prefix, filter=filter)
+        ]
+
+        return items
+
+
+    def iter_objects(
+        self,
+        bucket: str,
+        prefix: str,
+        filter='',
+        start_after=None,
+        page_size=1000,
+    ) -> typing.Iterator[S3ObjectRecord]:
         kwargs = {
-            'Bucket': bucket,
-            'Prefix': prefix
+            'Bucket'  : bucket,
+            'Prefix'  : prefix,
+            'MaxKeys' : page_size,
         }
 
+        if start_after is not None:
+            kwargs['StartAfter'] = start_after
+
         while True:
-            objects = self.__s3_resource.meta.client.list_objects_v2(**kwargs)
-            if 'Contents' not in objects:
-                return items
+            objects = self.__s3_client.list_objects_v2(**kwargs)
 
-            for obj in objects['Contents']:
-                key = obj['Key']
-                if filter in key:
-                    items.append(key)
+            for obj in objects.get('Contents', list()):
+                if filter in obj['Key']:
+                    yield self.__create_object_record(obj)
 
-            try:
-                kwargs['ContinuationToken'] = objects['NextContinuationToken']
+            if 'NextContinuationToken' not in objects:
+                break
+
+            kwargs['ContinuationToken'] = objects['NextContinuationToken']
+
+
+    def __create_object_record(
+        self,
+        obj: dict,
+    ) -> S3ObjectRecord:
+        record = S3ObjectRecord(
+            key=obj['Key'],
+            size=obj['Size'],
+            etag=obj['ETag'].strip('"'),
+            last_modified=obj['LastModified'],
+            storage_class=obj.get('StorageClass', 'STANDARD'),
+        )
+
+        return record
+
+
+    def list_objects_parallel(
+        self,
+        bucket: str,
+        prefix: str,
+        filter='',
+        delimiter='/',
+        depth=1,
+        split_points=None,
+        max_workers=None,
+        sort=False,
+        include_metadata=False,
+    ) -> list:
+        """
+        Lists `prefix` as independent partitions on a thread pool. Partitions are either the
+        sub-prefixes found with `delimiter` (expanded `depth` levels deep) or, when `split_points`
+        is provided, the key ranges between consecutive split points.
+        """
+        if max_workers is None:
+            max_workers = self.__max_workers
+
+        records = list()
+        if split_points is not None:
+            bounds = sorted(set(split_points))
+            partitions = [
+                {'prefix' : prefix, 'start_after' : start_after, 'end_key' : end_key}
+                for start_after, end_key in zip([None] + bounds, bounds + [None])
+            ]
+
+        else:
+            partition_prefixes = [prefix]
+            for _ in range(depth):
+                next_prefixes = list()
+                for partition_prefix in partition_prefixes:
+                    contents, common_prefixes = self.__list_level(bucket, partition_prefix, delimiter)
+                    records.extend(record for record in contents if filter in record.key)
+                    next_prefixes.extend(common_prefixes)
+
+                partition_prefixes = next_prefixes
+
+            partitions = [
+                {'prefix' : partition_prefix, 'start_after' : None, 'end_key' : None}
+                for partition_prefix in partition_prefixes
+            ]
+
+        self.__reserve_connections(max_workers)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(
+                    self.__list_partition,
+                    bucket,
+                    partition['prefix'],
+                    filter,
+                    partition['start_after'],
+                    partition['end_key'],
+                )
+                for partition in partitions
+            ]
+
+            partition_records = [future.result() for future in futures]
+
+        if sort:
+            # every partition is already in key order, so a k-way merge is enough
+            records.sort(key=lambda record: record.key)
+            partition_records.append(records)
+            records = list(heapq.merge(*partition_records, key=lambda record: record.key))
+
+        else:
+            for partition in partition_records:
+                records.extend(partition)
+
+        if include_metadata:
+            return records
+
+        return [record.key for record in records]
+
+
+    def __list_level(
+        self,
+        bucket: str,
+        prefix: str,
+        delimiter: str,
+    ) -> tuple:
+        contents = list()
+        common_prefixes = list()
+        kwargs = {
+            'Bucket'    : bucket,
+            'Prefix'    : prefix,
+            'Delimiter' : delimiter,
+        }
+
+        while True:
+            objects = self.__s3_client.list_objects_v2(**kwargs)
+
+            for obj in objects.get('Contents', list()):
+                contents.append(self.__create_object_record(obj))
 
-            except KeyError:
+            common_prefixes.extend(p['Prefix'] for p in objects.get('CommonPrefixes', list()))
+
+            if 'NextContinuationToken' not in objects:
                 break
 
-        return items
+            kwargs['ContinuationToken'] = objects['NextContinuationToken']
+
+        return contents, common_prefixes
+
+
+    def __list_partition(
+        self,
+        bucket: str,
+        prefix: str,
+        filter: str,
+        start_after=None,
+        end_key=None,
+    ) -> list[S3ObjectRecord]:
+        records = list()
+        for record in self.iter_objects(bucket=bucket, prefix=prefix, start_after=start_after):
+            if end_key is not None and record.key > end_key:
+                break
+
+            if filter in record.key:
+                records.append(record)
+
+        return records
 
 
     def list_all_versions_of_object(
@@ -59,13 +438,59 @@ class S3Plus:
         bucket: str,
         key: str,
     ) -> list[str]:
-        versions = list()
-        for version in self.__s3_resource.Bucket(bucket).object_versions.filter(Prefix=key):
-            versions.append(version.id)
+        versions = [
+            record.version_id
+            for record in self.iter_object_versions(bucket=bucket, prefix=key)
+            if record.key == key
+        ]
 
         return versions
 
 
+    def iter_object_versions(
+        self,
+        bucket: str,
+        prefix: str,
+        page_size=1000,
+    ) -> typing.Iterator[S3ObjectVersionRecord]:
+        kwargs = {
+            'Bucket'  : bucket,
+            'Prefix'  : prefix,
+            'MaxKeys' : page_size,
+        }
+
+        while True:
+            response = self.__s3_client.list_object_versions(**kwargs)
+
+            # versions and delete markers come back in separate lists, each sorted by key
+            versions = (self.__create_version_record(v, False) for v in response.get('Versions', list()))
+            markers  = (self.__create_version_record(m, True) for m in response.get('DeleteMarkers', list()))
+            yield from heapq.merge(versions, markers, key=lambda record: record.key)
+
+            if not response.get('IsTruncated', False):
+                break
+
+            kwargs['KeyMarker'] = response['NextKeyMarker']
+            kwargs['VersionIdMarker'] = response['NextVersionIdMarker']
+
+
+    def __create_version_record(
+        self,
+        version: dict,
+        is_delete_marker: bool,
+    ) -> S3ObjectVersionRecord:
+        record = S3ObjectVersionRecord(
+            key=version['Key'],
+            version_id=version['VersionId'],
+            is_latest=version['IsLatest'],
+            is_delete_marker=is_delete_marker,
+            size=version.get('Size'),
+            last_modified=version['LastModified'],
+        )
+
+        return record
+
+
     ### copy ###
     def copy_object(
         self,
@@ -75,49 +500,265 @@ class S3Plus:
         target_key: str,
         dryrun=True,
         verbose=True,
+        use_multipart_copy=False,
+        part_size=None,
+        max_concurrency=None,
+        skip_identical=False,
+        progress_callback=None,
     ) -> str:
+        prefix = '(dryrun)' if dryrun else ''
+        source_uri = f's3://{source_bucket}/{source_key}'
+        target_uri = f's3://{target_bucket}/{target_key}'
+
+        if skip_identical and self.__is_copy_identical(source_bucket, source_key, target_bucket, target_key):
+            if verbose:
+                print(f'{prefix} Skipping {source_uri} -- {target_uri} is identical.')
+
+            return target_uri
+
         if verbose:
-            prefix = '(dryrun)' if dryrun else ''
-            source_uri = f's3://{source_bucket}/{source_key}'
-            target_uri = f's3://{target_bucket}/{target_key}'
             print(f'{prefix} Copying {source_uri} to {target_uri}...')
 
         if not dryrun:
-            copy_source = {
-                'Bucket' : source_bucket,
-                'Key'    : source_key,
-            }
+            if use_multipart_copy:
+                self.__copy_object_multipart(
+                    source_bucket=source_bucket,
+                    source_key=source_key,
+                    target_bucket=target_bucket,
+                    target_key=target_key,
+                    part_size=part_size,
+                    max_concurrency=max_concurrency,
+                    progress_callback=progress_callback,
+                )
+
+            else:
+                copy_source = {
+                    'Bucket' : source_bucket,
+                    'Key'    : source_key,
+                }
+
+                self.__s3_client.copy(
+                    CopySource=copy_source, 
+                    Bucket=target_bucket, 
+                    Key=target_key,
+                    ExtraArgs=self.__build_checksum_args(),
+                    Callback=progress_callback,
+                    Config=self.__transfer_config,
+                )
+
+            self.__invalidate_metadata(target_bucket, target_key)
+
+        return target_uri
+
+
+    def __is_copy_identical(
+        self,
+        source_bucket: str,
+        source_key: str,
+        target_bucket: str,
+        target_key: str,
+    ) -> bool:
+        if (source_bucket, source_key) == (target_bucket, target_key):
+            return True
+
+        source_info = self.__head_object(bucket=source_bucket, key=source_key)
+        target_info = self.__head_object(bucket=target_bucket, key=target_key)
+
+        if source_info is None or target_info is None:
+            return False
+
+        return self.__are_objects_equal(
+            source_bucket,
+            self.__create_object_record_from_info(source_key, source_info),
+            target_bucket,
+            self.__create_object_record_from_info(target_key, target_info),
+        )
+
+
+    def __create_object_record_from_info(
+        self,
+        key: str,
+        info: dict,
+    ) -> S3ObjectRecord:
+        record = S3ObjectRecord(
+            key=key,
+            size=info['size'],
+            etag=info['etag'],
+            last_modified=info['last_modified'],
+            storage_class=info['storage_class'],
+        )
+
+        return record
+
+
+    def __copy_object_multipart(
+        self,
+        source_bucket: str,
+        source_key: str,
+        target_bucket: str,
+        target_key: str,
+        part_size=None,
+        max_concurrency=None,
+        progress_callback=None,
+    ):
+        """
+        Server-side copy through UploadPartCopy: parts are copied concurrently inside S3, so no object
+        data passes through this machine. Every part is pinned to the source ETag, and the source's
+        metadata (including x-amz-meta-object-hash) and content headers are carried over.
+        """
+        source_info = self.__head_object(bucket=source_bucket, key=source_key)
+        if source_info is None:
+            raise RuntimeError(f'Provided S3 object "s3://{source_bucket}/{source_key}" does not exist.')
+
+        object_size = source_info['size']
+
+        if part_size is None:
+            part_size = self.get_transfer_config(object_size=object_size).multipart_chunksize
+
+        elif not self.__min_multipart_part_size <= part_size <= self.__max_multipart_part_size:
+            raise RuntimeError(f'Provided "part_size" ({part_size}) must be between {self.__min_multipart_part_size} and {self.__max_multipart_part_size} bytes.')
+
+        if math.ceil(object_size / part_size) > self.__max_multipart_parts:
+            raise RuntimeError(f'Copying "s3://{source_bucket}/{source_key}" would take more than {self.__max_multipart_parts} parts -- increase "part_size".')
+
+        if max_concurrency is None:
+            max_concurrency = self.__transfer_config.max_concurrency
+
+        upload_args = {'Metadata' : source_info['metadata']}
+
+        content_fields = {
+            'content_type'        : 'ContentType',
+            'cache_control'       : 'CacheControl',
+            'content_disposition' : 'ContentDisposition',
+            'content_encoding'    : 'ContentEncoding',
+            'content_language'    : 'ContentLanguage',
+        }
+        for field, argument in content_fields.items():
+            if source_info[field] is not None:
+                upload_args[argument] = source_info[field]
+
+        if source_info['storage_class'] != 'STANDARD':
+            upload_args['StorageClass'] = source_info['storage_class']
+
+        upload_args.update(self.__build_checksum_args())
+
+        self.__reserve_connections(max_concurrency)
+        client = self.__s3_client
+        upload_id = client.create_multipart_upload(Bucket=target_bucket, Key=target_key, **upload_args)['UploadId']
+
+        part_ranges = [
+            (start, min(start + part_size, object_size) - 1)
+            for start in range(0, object_size, part_size)
+        ]
+
+        try:
+            # an empty object has no byte range to copy, but still needs one (empty) part
+            if len(part_ranges) == 0:
+                response = client.upload_part(Bucket=target_bucket, Key=target_key, UploadId=upload_id, PartNumber=1, Body=b'')
+                completed_parts = [{'PartNumber' : 1, 'ETag' : response['ETag']}]
 
-            self.__s3_resource.meta.client.copy(
-                CopySource=copy_source, 
-                Bucket=target_bucket, 
+            else:
+                with concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+                    futures = [
+                        executor.submit(
+                            self.__upload_part_copy,
+                            source_bucket,
+                            source_key,
+                            source_info['etag'],
+                            target_bucket,
+                            target_key,
+                            upload_id,
+                            part_number,
+                            part_range,
+                            progress_callback,
+                        )
+                        for part_number, part_range in enumerate(part_ranges, start=1)
+                    ]
+
+                    try:
+                        completed_parts = [future.result() for future in futures]
+
+                    except BaseException:
+                        for future in futures:
+                            future.cancel()
+                        raise
+
+            client.complete_multipart_upload(
+                Bucket=target_bucket,
                 Key=target_key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts' : completed_parts},
             )
 
-        uri = f's3://{target_bucket}/{target_key}'
-        return uri
+        except BaseException:
+            client.abort_multipart_upload(Bucket=target_bucket, Key=target_key, UploadId=upload_id)
+            raise
+
+
+    def __upload_part_copy(
+        self,
+        source_bucket: str,
+        source_key: str,
+        source_etag: str,
+        target_bucket: str,
+        target_key: str,
+        upload_id: str,
+        part_number: int,
+        part_range: tuple,
+        progress_callback=None,
+    ) -> dict:
+        start, end = part_range
+
+        response = self.__s3_client.upload_part_copy(
+            Bucket=target_bucket,
+            Key=target_key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            CopySource={
+                'Bucket' : source_bucket,
+                'Key'    : source_key,
+            },
+            CopySourceRange=f'bytes={start}-{end}',
+            # fails the part if the source is overwritten mid-copy
+            CopySourceIfMatch=f'"{source_etag}"',
+        )
+
+        completed_part = {
+            'PartNumber' : part_number,
+            'ETag'       : response['CopyPartResult']['ETag'],
+        }
+
+        if self.__checksum_algorithm is not None:
+            checksum = response['CopyPartResult'].get(f'Checksum{self.__checksum_algorithm}')
+            if checksum is not None:
+                completed_part[f'Checksum{self.__checksum_algorithm}'] = checksum
+
+        if progress_callback is not None:
+            progress_callback(end - start + 1)
+
+        return completed_part
 
 
     def copy_objects(
         self,
         payloads: list[dict],
         use_multiprocessing=False,
+        use_threading=False,
+        max_workers=None,
         dryrun=True,
         verbose=True,
+        metrics=None,
+        journal=None,
     ) -> list[str]:
-        if use_multiprocessing:
-            for p in payloads:
-                p['dryrun']  = dryrun
-                p['verbose'] = verbose
-
-            with mp.Pool() as pool:
-                uris = pool.map(self.__copy_object_mp_unpack, payloads)
-
-        else:
-            uris = list()
-            for payload in payloads:
-                s3_uri = self.copy_object(**payload, dryrun=dryrun, verbose=verbose)
-                uris.append(s3_uri)
+        uris = self.__map_payloads(
+            function=self.__copy_object_mp_unpack,
+            payloads=[{**p, 'dryrun' : dryrun, 'verbose' : verbose} for p in payloads],
+            use_multiprocessing=use_multiprocessing,
+            use_threading=use_threading,
+            max_workers=max_workers,
+            metrics=metrics,
+            journal=journal,
+        )
 
         return uris
 
@@ -127,22 +768,22 @@ class S3Plus:
         self,
         payloads: list[dict],
         use_multiprocessing=False,
+        use_threading=False,
+        max_workers=None,
         dryrun=True,
         verbose=True,
+        metrics=None,
+        journal=None,
     ) -> list[str]:
-        if use_multiprocessing:
-            for p in payloads:
-                p['dryrun']  = dryrun
-                p['verbose'] = verbose
-
-            with mp.Pool() as pool:
-                uris = pool.map(self.__move_object_mp_unpack, payloads)
-
-        else:
-            uris = list()
-            for payload in payloads:
-                s3_uri = self.move_object(**payload, dryrun=dryrun, verbose=verbose)
-                uris.append(s3_uri)
+        uris = self.__map_payloads(
+            function=self.__move_object_mp_unpack,
+            payloads=[{**p, 'dryrun' : dryrun, 'verbose' : verbose} for p in payloads],
+            use_multiprocessing=use_multiprocessing,
+            use_threading=use_threading,
+            max_workers=max_workers,
+            metrics=metrics,
+            journal=journal,
+        )
 
         return uris
 
@@ -155,7 +796,15 @@ class S3Plus:
         target_key: str,
         dryrun=True,
         verbose=True,
+        use_multipart_copy=False,
+        part_size=None,
+        max_concurrency=None,
+        skip_identical=False,
+        progress_callback=None,
     ) -> str:
+        if (source_bucket, source_key) == (target_bucket, target_key):
+            raise RuntimeError(f'Cannot move "s3://{source_bucket}/{source_key}" onto itself.')
+
         self.copy_object(
             source_bucket=source_bucket,
             source_key=source_key,
@@ -163,6 +812,11 @@ class S3Plus:
             target_key=target_key,
             dryrun=dryrun,
             verbose=verbose,
+            use_multipart_copy=use_multipart_copy,
+            part_size=part_size,
+            max_concurrency=max_concurrency,
+            skip_identical=skip_identical,
+            progress_callback=progress_callback,
         )
 
         self.delete_object(
@@ -194,17 +848,19 @@ class S3Plus:
 
         if not dryrun:
             if version_id is not None:
-                self.__s3_resource.meta.client.delete_object(
+                self.__s3_client.delete_object(
                     Bucket=bucket,
                     Key=key,
                     VersionId=version_id,
                 )
             else:
-                self.__s3_resource.meta.client.delete_object(
+                self.__s3_client.delete_object(
                     Bucket=bucket,
                     Key=key,
                 )
 
+            self.__invalidate_metadata(bucket, key)
+
         uri = f's3://{bucket}/{key}'
         return uri
 
@@ -215,20 +871,50 @@ class S3Plus:
         dryrun=True,
         verbose=True,
         use_multiprocessing=False,
-    ) -> list[str]:
-        if use_multiprocessing:
-            for p in payloads:
-                p['dryrun']  = dryrun
-                p['verbose'] = verbose
+        use_threading=False,
+        max_workers=None,
+        use_batch_delete=False,
+        max_retries=3,
+        metrics=None,
+    ) -> typing.Union[list[str], dict]:
+        if use_batch_delete:
+            objects_by_bucket = dict()
+            for payload in payloads:
+                obj = {'Key' : payload['key']}
+                if payload.get('version_id') is not None:
+                    obj['VersionId'] = payload['version_id']
 
-            with mp.Pool() as pool:
-                uris = pool.map(self.__delete_object_mp_unpack, payloads)
+                objects_by_bucket.setdefault(payload['bucket'], list()).append(obj)
 
-        else:
-            uris = list()
-            for payload in payloads:
-                s3_uri = self.delete_object(**payload, verbose=verbose, dryrun=dryrun)
-                uris.append(s3_uri)
+            result = {
+                'deleted' : list(),
+                'failed'  : list(),
+            }
+
+            for bucket, objects in objects_by_bucket.items():
+                bucket_result = self.__delete_objects_in_batches(
+                    bucket=bucket,
+                    objects=objects,
+                    max_workers=max_workers,
+                    max_retries=max_retries,
+                    metrics=metrics,
+                    dryrun=dryrun,
+                    verbose=verbose,
+                )
+
+                result['deleted'].extend(bucket_result['deleted'])
+                result['failed'].extend(bucket_result['failed'])
+
+            return result
+
+        uris = self.__map_payloads(
+            function=self.__delete_object_mp_unpack,
+            payloads=[{**p, 'dryrun' : dryrun, 'verbose' : verbose} for p in payloads],
+            use_multiprocessing=use_multiprocessing,
+            use_threading=use_threading,
+            max_workers=max_workers,
+            metrics=metrics,
+        )
 
         return uris
 
@@ -240,55 +926,310 @@ class S3Plus:
         dryrun=True,
         verbose=True,
         use_multiprocessing=False,
-    ) -> list[str]:
-        if use_multiprocessing:
-            payloads = [
-                {
-                    'bucket'  : bucket,
-                    'key'     : key,
-                    'dryrun'  : dryrun,
-                    'verbose' : verbose,
-                }
-                for key in self.list_objects(bucket=bucket, prefix=prefix)
-            ]
+        use_threading=False,
+        max_workers=None,
+        use_batch_delete=False,
+        max_retries=3,
+        metrics=None,
+    ) -> typing.Union[list[str], dict]:
+        if use_batch_delete:
+            result = self.__delete_objects_in_batches(
+                bucket=bucket,
+                objects=({'Key' : record.key} for record in self.iter_objects(bucket=bucket, prefix=prefix)),
+                max_workers=max_workers,
+                max_retries=max_retries,
+                metrics=metrics,
+                dryrun=dryrun,
+                verbose=verbose,
+            )
 
-            with mp.Pool() as pool:
-                uris = pool.map(self.__delete_object_mp_unpack, payloads)
+            return result
 
-        else:
-            uris = list()
-            for key in self.list_objects(bucket=bucket, prefix=prefix):
-                s3_uri = self.delete_object(
-                    bucket=bucket,
-                    key=key,
-                    dryrun=dryrun,
-                    verbose=verbose,
-                )
-                uris.append(s3_uri)
+        payloads = [
+            {
+                'bucket'  : bucket,
+                'key'     : key,
+                'dryrun'  : dryrun,
+                'verbose' : verbose,
+            }
+            for key in self.list_objects(bucket=bucket, prefix=prefix)
+        ]
+
+        uris = self.__map_payloads(
+            function=self.__delete_object_mp_unpack,
+            payloads=payloads,
+            use_multiprocessing=use_multiprocessing,
+            use_threading=use_threading,
+            max_workers=max_workers,
+            metrics=metrics,
+        )
 
         return uris
 
 
-    def delete_all_versions_of_object(
+    def __delete_objects_in_batches(
         self,
         bucket: str,
-        key: str,
+        objects: typing.Iterable[dict],
+        max_workers=None,
+        max_retries=3,
+        metrics=None,
         dryrun=True,
         verbose=True,
-    ) -> list[str]:
-        versions = self.list_all_versions_of_object(bucket=bucket, key=key)
-        for version in versions:
-            versions.append(version)
+    ) -> dict:
+        """
+        Deletes `objects` (records of "Key" and optional "VersionId", e.g. streamed from a listing)
+        with DeleteObjects requests of up to 1000 keys, sent in parallel. At most `max_workers`
+        batches are taken from `objects` ahead of the deletes, so memory stays bounded.
+        """
+        result = {
+            'deleted' : list(),
+            'failed'  : list(),
+        }
 
-            self.delete_object(
-                bucket=bucket,
-                key=key,
-                version_id=version,
-                verbose=verbose,
-                dryrun=dryrun,
+        def iter_objects():
+            prefix = '(dryrun)' if dryrun else ''
+            for obj in objects:
+                if verbose:
+                    if 'VersionId' in obj:
+                        print(f'{prefix} Deleting version "{obj["VersionId"]}" of object "s3://{bucket}/{obj["Key"]}"...')
+                    else:
+                        print(f'{prefix} Deleting s3://{bucket}/{obj["Key"]}...')
+
+                yield obj
+
+        stream = iter_objects()
+        batches = iter(lambda: list(itertools.islice(stream, self.__delete_batch_size)), list())
+
+        if dryrun:
+            for batch in batches:
+                result['deleted'].extend(f's3://{bucket}/{obj["Key"]}' for obj in batch)
+
+            return result
+
+        if max_workers is None:
+            max_workers = self.__max_workers
+
+        lock = threading.Lock()
+        in_flight = threading.BoundedSemaphore(max_workers)
+        errors = list()
+
+        def collect(future):
+            try:
+                deleted, failed, latency = future.result()
+                with lock:
+                    result['deleted'].extend(f's3://{bucket}/{obj["Key"]}' for obj in deleted)
+                    result['failed'].extend(failed)
+
+                if metrics is not None:
+                    metrics.record(operation='delete_objects', latency=latency, n_objects=len(deleted))
+                    if len(failed) > 0:
+                        metrics.record(operation='delete_objects', success=False, n_objects=len(failed))
+
+            except Exception as exception:
+                errors.append(exception)
+
+            finally:
+                in_flight.release()
+
+        self.__reserve_connections(max_workers)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for batch in batches:
+                in_flight.acquire()
+                if len(errors) > 0:
+                    in_flight.release()
+                    break
+
+                future = executor.submit(self.__delete_batch, bucket, batch, max_retries)
+                future.add_done_callback(collect)
+
+        if metrics is not None:
+            metrics.report()
+
+        if len(errors) > 0:
+            raise errors[0]
+
+        return result
+
+
+    def __delete_batch(
+        self,
+        bucket: str,
+        batch: list[dict],
+        max_retries: int,
+    ) -> tuple:
+        deleted = list()
+        failed  = list()
+        pending = batch
+        start   = time.perf_counter()
+
+        for attempt in range(max_retries + 1):
+            response = self.__s3_client.delete_objects(
+                Bucket=bucket,
+                Delete={
+                    'Objects' : pending,
+                    'Quiet'   : True,
+                },
             )
 
-        return versions
+            # in quiet mode only the keys that could not be deleted are reported
+            errors = {(e['Key'], e.get('VersionId')) : e for e in response.get('Errors', list())}
+
+            if self.__rate_limiter is not None and any(e['Code'] in self.__throttle_error_codes for e in errors.values()):
+                self.__rate_limiter.record_throttle(bucket=bucket, key=pending[0]['Key'], is_write=True)
+
+            retry = list()
+            for obj in pending:
+                error = errors.get((obj['Key'], obj.get('VersionId')))
+                if error is None:
+                    error = errors.get((obj['Key'], None))
+
+                if error is None:
+                    self.__invalidate_metadata(bucket, obj['Key'])
+                    deleted.append(obj)
+
+                elif error['Code'] in self.__retryable_error_codes and attempt < max_retries:
+                    retry.append(obj)
+
+                else:
+                    failed.append({
+                        'uri'        : f's3://{bucket}/{obj["Key"]}',
+                        'version_id' : obj.get('VersionId'),
+                        'code'       : error['Code'],
+                        'message'    : error.get('Message', ''),
+                    })
+
+            if len(retry) == 0:
+                break
+
+            pending = retry
+            time.sleep(0.1 * 2 ** attempt)
+
+        return deleted, failed, time.perf_counter() - start
+
+
+    def delete_all_versions_of_object(
+        self,
+        bucket: str,
+        key: str,
+        dryrun=True,
+        verbose=True,
+        max_workers=None,
+        max_retries=3,
+    ) -> dict:
+        result = self.__delete_all_versions(
+            bucket=bucket,
+            prefix=key,
+            key=key,
+            max_workers=max_workers,
+            max_retries=max_retries,
+            dryrun=dryrun,
+            verbose=verbose,
+        )
+
+        return result
+
+
+    def delete_all_versions_of_all_objects_at_prefix(
+        self,
+        bucket: str,
+        prefix: str,
+        dryrun=True,
+        verbose=True,
+        max_workers=None,
+        max_retries=3,
+    ) -> dict:
+        result = self.__delete_all_versions(
+            bucket=bucket,
+            prefix=prefix,
+            max_workers=max_workers,
+            max_retries=max_retries,
+            dryrun=dryrun,
+            verbose=verbose,
+        )
+
+        return result
+
+
+    def __delete_all_versions(
+        self,
+        bucket: str,
+        prefix: str,
+        key=None,
+        max_workers=None,
+        max_retries=3,
+        dryrun=True,
+        verbose=True,
+    ) -> dict:
+        """
+        Streams every version and delete marker under `prefix` (only those of `key`, if provided)
+        into DeleteObjects batches of up to 1000. At most `max_workers` batches are listed ahead of
+        the deletes, so memory stays bounded. Returns the number of deleted versions per key, and
+        the versions that could not be deleted.
+        """
+        if max_workers is None:
+            max_workers = self.__max_workers
+
+        versions = self.iter_object_versions(bucket=bucket, prefix=prefix)
+        if key is not None:
+            versions = (record for record in versions if record.key == key)
+
+        def iter_objects():
+            print_prefix = '(dryrun)' if dryrun else ''
+            for record in versions:
+                if verbose:
+                    print(f'{print_prefix} Deleting version "{record.version_id}" of object "s3://{bucket}/{record.key}"...')
+
+                yield {'Key' : record.key, 'VersionId' : record.version_id}
+
+        objects = iter_objects()
+        batches = iter(lambda: list(itertools.islice(objects, self.__delete_batch_size)), list())
+
+        result = {
+            'deleted' : dict(),
+            'failed'  : list(),
+        }
+
+        if dryrun:
+            for batch in batches:
+                for obj in batch:
+                    result['deleted'][obj['Key']] = result['deleted'].get(obj['Key'], 0) + 1
+
+            return result
+
+        lock = threading.Lock()
+        in_flight = threading.BoundedSemaphore(max_workers)
+        errors = list()
+
+        def collect(future):
+            try:
+                deleted, failed, _ = future.result()
+                with lock:
+                    for obj in deleted:
+                        result['deleted'][obj['Key']] = result['deleted'].get(obj['Key'], 0) + 1
+                    result['failed'].extend(failed)
+
+            except Exception as exception:
+                errors.append(exception)
+
+            finally:
+                in_flight.release()
+
+        self.__reserve_connections(max_workers)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for batch in batches:
+                in_flight.acquire()
+                if len(errors) > 0:
+                    in_flight.release()
+                    break
+
+                future = executor.submit(self.__delete_batch, bucket, batch, max_retries)
+                future.add_done_callback(collect)
+
+        if len(errors) > 0:
+            raise errors[0]
+
+        return result
 
 
     ### upload ###
@@ -296,22 +1237,42 @@ class S3Plus:
         self,
         payloads: list[dict],
         use_multiprocessing=False,
+        use_threading=False,
+        max_workers=None,
         dryrun=True,
         verbose=True,
+        metrics=None,
+        journal=None,
+        pack_to=None,
+        shard_size=None,
     ) -> list[str]:
-        if use_multiprocessing:
-            for p in payloads:
-                p['dryrun']  = dryrun
-                p['verbose'] = verbose
+        if pack_to is not None:
+            # packed members are named by their payload's key -- see pack_objects
+            pack_bucket, _ = self.get_bucket_and_key_from_uri(pack_to)
+            if any(p['bucket'] != pack_bucket for p in payloads):
+                raise RuntimeError(f'Every payload must target the bucket of "pack_to" ("{pack_bucket}") when packing.')
+
+            uris = self.pack_objects(
+                payloads=[{'filepath' : p['filepath'], 'name' : p['key']} for p in payloads],
+                target=pack_to,
+                shard_size=shard_size,
+                max_workers=max_workers,
+                dryrun=dryrun,
+                verbose=verbose,
+                metrics=metrics,
+            )
 
-            with mp.Pool() as pool:
-                uris = pool.map(self.__upload_object_mp_unpack, payloads)
+            return uris
 
-        else:
-            uris = list()
-            for payload in payloads:
-                s3_uri = self.upload_object(**payload, verbose=verbose, dryrun=dryrun)
-                uris.append(s3_uri)
+        uris = self.__map_payloads(
+            function=self.__upload_object_mp_unpack,
+            payloads=[{**p, 'dryrun' : dryrun, 'verbose' : verbose} for p in payloads],
+            use_multiprocessing=use_multiprocessing,
+            use_threading=use_threading,
+            max_workers=max_workers,
+            metrics=metrics,
+            journal=journal,
+        )
 
         return uris
 
@@ -325,46 +1286,120 @@ class S3Plus:
         kms_key=None,
         dryrun=True,
         verbose=True,
+        hash_index=None,
+        transfer_config=None,
+        adaptive_part_size=False,
+        hash_while_uploading=False,
     ) -> str:
-        filepath_hash = boto_plus.helpers.get_local_file_hash(filepath)
+        target_uri = f's3://{bucket}/{key}'
 
-        hash_args = {
-            'Metadata' : {
-                self.__s3_object_hash_field : filepath_hash,
-            }
-        }
+        if hash_while_uploading:
+            if verbose:
+                prefix = '(dryrun)' if dryrun else ''
+                print(f'{prefix} Uploading "{filepath}" to "{target_uri}"...')
 
-        if extra_args is not None:
-            all_args = {**hash_args, **extra_args}
+            if not dryrun:
+                self.__upload_object_hashing_while_uploading(
+                    filepath=filepath,
+                    bucket=bucket,
+                    key=key,
+                    extra_args=extra_args,
+                    kms_key=kms_key,
+                    transfer_config=transfer_config,
+                    adaptive_part_size=adaptive_part_size,
+                )
 
-        else:
-            all_args = hash_args
+            return target_uri
 
-        if kms_key is not None:
-            kms_args = {
-                'ServerSideEncryption' : 'aws:kms',
-                'SSEKMSKeyId'          : kms_key,
-            }
+        uri = self.__upload_file(
+            filepath=filepath,
+            bucket=bucket,
+            key=key,
+            filepath_hash=self.__get_local_file_hash(filepath, hash_index),
+            extra_args=extra_args,
+            kms_key=kms_key,
+            dryrun=dryrun,
+            verbose=verbose,
+            transfer_config=transfer_config,
+            adaptive_part_size=adaptive_part_size,
+        )
 
-            all_args = {**all_args, **kms_args}
+        return uri
 
+
+    def __upload_file(
+        self,
+        filepath: str,
+        bucket: str,
+        key: str,
+        filepath_hash: str,
+        extra_args=None,
+        kms_key=None,
+        dryrun=True,
+        verbose=True,
+        transfer_config=None,
+        adaptive_part_size=False,
+    ) -> str:
+        """ Uploads `filepath` with its already computed hash. """
         target_uri = f's3://{bucket}/{key}'
+        all_args = self.__build_upload_args(filepath_hash, extra_args, kms_key)
 
         if verbose:
             prefix = '(dryrun)' if dryrun else ''
             print(f'{prefix} Uploading "{filepath}" to "{target_uri}"...')
 
         if not dryrun:
-            self.__s3_resource.meta.client.upload_file(
+            object_size = os.path.getsize(filepath) if adaptive_part_size else None
+
+            self.__s3_client.upload_file(
                 Filename=filepath,
                 Bucket=bucket,
                 Key=key,
                 ExtraArgs=all_args,
+                Config=self.get_transfer_config(object_size=object_size, transfer_config=transfer_config),
             )
 
+            self.__invalidate_metadata(bucket, key)
+
         return target_uri
 
 
+    def __upload_object_hashing_while_uploading(
+        self,
+        filepath: str,
+        bucket: str,
+        key: str,
+        extra_args=None,
+        kms_key=None,
+        transfer_config=None,
+        adaptive_part_size=False,
+    ):
+        """
+        Reads `filepath` once: every part is hashed as it is read and then uploaded, and the
+        resulting x-amz-meta-object-hash is written when the upload completes.
+        """
+        if not os.path.isfile(filepath):
+            raise RuntimeError(f'Provided file "{filepath}" does not exist.')
+
+        config = self.get_transfer_config(
+            object_size=os.path.getsize(filepath) if adaptive_part_size else None,
+            transfer_config=transfer_config,
+        )
+
+        with open(filepath, 'rb') as in_file:
+            self.upload_stream(
+                source=in_file,
+                bucket=bucket,
+                key=key,
+                part_size=max(config.multipart_chunksize, self.__min_multipart_part_size),
+                max_in_flight=config.max_concurrency,
+                extra_args=extra_args,
+                kms_key=kms_key,
+                dryrun=False,
+                verbose=False,
+            )
+
+
     def upload_object_from_bytes(
         self,
         contents: bytes,
@@ -387,309 +1422,1822 @@ class S3Plus:
             print(f'{prefix} Uploading provided bytes to "{target_uri}"...')
 
         if not dryrun:
-            self.__s3_resource.meta.client.put_object(
+            self.__s3_client.put_object(
                 Body=contents,
                 Bucket=bucket,
                 Key=key,
                 Metadata=metadata,
+                **self.__build_checksum_args(),
             )
 
+            self.__invalidate_metadata(bucket, key)
+
         return target_uri
 
 
-    ### download ###
-    def download_object(
+    def upload_stream(
         self,
+        source,
         bucket: str,
         key: str,
-        filepath: str,
+        part_size=None,
+        max_in_flight=None,
+        extra_args=None,
+        kms_key=None,
         dryrun=True,
         verbose=True,
-    ):
-        directory = os.path.dirname(filepath)
-        os.makedirs(directory, exist_ok=True)
+        write_hash=True,
+    ) -> str:
+        """
+        Uploads `source` -- an iterator of bytes (or str) chunks, or a readable binary file object --
+        as a multipart upload, hashing it as it is read. At most `max_in_flight` parts of
+        `part_size` bytes are held in memory. Streams shorter than one part are sent with one PUT.
+        The hash of a multipart stream is only known at the end, so it is written with a server-side
+        copy of the object onto itself -- `write_hash=False` skips that copy.
+        """
+        target_uri = f's3://{bucket}/{key}'
 
         if verbose:
             prefix = '(dryrun)' if dryrun else ''
-            source_uri = f's3://{bucket}/{key}'
-            print(f'{prefix} Downloading "{source_uri}" to "{filepath}"...')
+            print(f'{prefix} Uploading stream to "{target_uri}"...')
 
-        if not dryrun:
-            self.__s3_resource.meta.client.download_file(
+        if dryrun:
+            return target_uri
+
+        if part_size is None:
+            part_size = max(self.__transfer_config.multipart_chunksize, self.__min_multipart_part_size)
+
+        elif part_size < self.__min_multipart_part_size:
+            raise RuntimeError(f'Provided "part_size" ({part_size}) is below the S3 minimum of {self.__min_multipart_part_size} bytes.')
+
+        if max_in_flight is None:
+            max_in_flight = self.__transfer_config.max_concurrency
+
+        hash_md5 = hashlib.md5()
+        parts = self.__iter_stream_parts(source, part_size)
+
+        first_part  = next(parts, b'')
+        second_part = next(parts, None)
+
+        if second_part is None:
+            hash_md5.update(first_part)
+            self.__s3_client.put_object(
+                Body=first_part,
                 Bucket=bucket,
                 Key=key,
-                Filename=filepath,
+                **self.__build_upload_args(hash_md5.hexdigest(), extra_args, kms_key),
+            )
+
+        else:
+            self.__upload_multipart_stream(
+                parts=itertools.chain([first_part, second_part], parts),
+                hash_md5=hash_md5,
+                bucket=bucket,
+                key=key,
+                max_in_flight=max_in_flight,
+                extra_args=extra_args,
+                kms_key=kms_key,
+                write_hash=write_hash,
+            )
+
+        self.__invalidate_metadata(bucket, key)
+
+        return target_uri
+
+
+    def __upload_multipart_stream(
+        self,
+        parts: typing.Iterator[bytes],
+        hash_md5,
+        bucket: str,
+        key: str,
+        max_in_flight: int,
+        extra_args=None,
+        kms_key=None,
+        write_hash=True,
+    ):
+        client = self.__s3_client
+
+        # the hash is only known once the last part has been read, so it is written afterwards
+        upload_args = self.__build_upload_args(None, extra_args, kms_key)
+        upload_id = client.create_multipart_upload(Bucket=bucket, Key=key, **upload_args)['UploadId']
+
+        in_flight = threading.BoundedSemaphore(max_in_flight)
+        errors = list()
+
+        def release(future):
+            if future.exception() is not None:
+                errors.append(future.exception())
+            in_flight.release()
+
+        try:
+            self.__reserve_connections(max_in_flight)
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+                futures = list()
+                for part_number, part in enumerate(parts, start=1):
+                    if part_number > self.__max_multipart_parts:
+                        raise RuntimeError(f'Stream for "s3://{bucket}/{key}" exceeds {self.__max_multipart_parts} parts -- increase "part_size".')
+
+                    hash_md5.update(part)
+
+                    in_flight.acquire()
+                    if len(errors) > 0:
+                        in_flight.release()
+                        break
+
+                    future = executor.submit(
+                        self.__upload_part,
+                        bucket,
+                        key,
+                        upload_id,
+                        part_number,
+                        part,
+                        upload_args.get('ChecksumAlgorithm'),
+                    )
+                    future.add_done_callback(release)
+                    futures.append(future)
+
+                completed_parts = [future.result() for future in futures]
+
+            response = client.complete_multipart_upload(
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts' : completed_parts},
+            )
+
+        except BaseException:
+            client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+            raise
+
+        if not write_hash:
+            return
+
+        # in versioned buckets the copy adds a second version -- the one uploaded above, without the hash, stays noncurrent
+        try:
+            self.__replace_object_metadata(
+                bucket=bucket,
+                key=key,
+                upload_args=self.__build_upload_args(hash_md5.hexdigest(), extra_args, kms_key),
             )
 
+        except Exception as exception:
+            # an object without its hash would break later hash checks and syncs -- remove the uploaded version
+            delete_args = {'VersionId' : response['VersionId']} if response.get('VersionId') is not None else dict()
+            try:
+                client.delete_object(Bucket=bucket, Key=key, **delete_args)
+
+            except Exception:
+                raise RuntimeError(f'Uploaded "s3://{bucket}/{key}" but could not write its hash, nor delete it -- the object is left without "{self.__s3_object_hash_field}".') from exception
+
+            raise RuntimeError(f'Uploaded "s3://{bucket}/{key}" but could not write its hash -- the object was deleted.') from exception
+
+
+    def __upload_part(
+        self,
+        bucket: str,
+        key: str,
+        upload_id: str,
+        part_number: int,
+        part: bytes,
+        checksum_algorithm=None,
+    ) -> dict:
+        checksum_args = {'ChecksumAlgorithm' : checksum_algorithm} if checksum_algorithm is not None else dict()
+
+        response = self.__s3_client.upload_part(
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=part,
+            **checksum_args,
+        )
+
+        completed_part = {
+            'PartNumber' : part_number,
+            'ETag'       : response['ETag'],
+        }
+
+        # CompleteMultipartUpload needs every part's checksum when the upload was created with one
+        if checksum_algorithm is not None:
+            completed_part[f'Checksum{checksum_algorithm}'] = response[f'Checksum{checksum_algorithm}']
+
+        return completed_part
+
+
+    def __iter_stream_parts(
+        self,
+        source,
+        part_size: int,
+    ) -> typing.Iterator[bytes]:
+        if hasattr(source, 'read'):
+            while True:
+                # pipes and sockets return short reads -- fill the part before yielding it
+                part = bytearray()
+                while len(part) < part_size:
+                    chunk = source.read(part_size - len(part))
+                    if not chunk:
+                        break
+                    part += chunk.encode() if isinstance(chunk, str) else chunk
+
+                if len(part) == 0:
+                    break
+
+                yield bytes(part)
+
+                if len(part) < part_size:
+                    break
+
+        else:
+            buffer = bytearray()
+            for chunk in source:
+                buffer += chunk.encode() if isinstance(chunk, str) else chunk
+
+                while len(buffer) >= part_size:
+                    yield bytes(buffer[:part_size])
+                    del buffer[:part_size]
+
+            if len(buffer) > 0:
+                yield bytes(buffer)
+
+
+    def __build_upload_args(
+        self,
+        object_hash=None,
+        extra_args=None,
+        kms_key=None,
+    ) -> dict:
+        if object_hash is not None:
+            hash_args = {
+                'Metadata' : {
+                    self.__s3_object_hash_field : object_hash,
+                }
+            }
+
+        else:
+            hash_args = dict()
+
+        hash_args = {**hash_args, **self.__build_checksum_args()}
+
+        if extra_args is not None:
+            all_args = {**hash_args, **extra_args}
+
+            # the caller's metadata is kept alongside the hash, not in place of it (a hash given there still wins)
+            if object_hash is not None and 'Metadata' in extra_args:
+                all_args['Metadata'] = {**hash_args['Metadata'], **extra_args['Metadata']}
+
+        else:
+            all_args = hash_args
+
+        if kms_key is not None:
+            kms_args = {
+                'ServerSideEncryption' : 'aws:kms',
+                'SSEKMSKeyId'          : kms_key,
+            }
+
+            all_args = {**all_args, **kms_args}
+
+        return all_args
+
+
+    def __build_checksum_args(
+        self,
+    ) -> dict:
+        if self.__checksum_algorithm is None:
+            return dict()
+
+        return {'ChecksumAlgorithm' : self.__checksum_algorithm}
+
+
+    def __replace_object_metadata(
+        self,
+        bucket: str,
+        key: str,
+        upload_args: dict,
+    ):
+        # a server-side copy onto itself is the only way to change an existing object's metadata
+        self.__s3_client.copy(
+            CopySource={
+                'Bucket' : bucket,
+                'Key'    : key,
+            },
+            Bucket=bucket,
+            Key=key,
+            ExtraArgs={**upload_args, 'MetadataDirective' : 'REPLACE'},
+            Config=self.__transfer_config,
+        )
+
+
+    ### pack ###
+    def pack_objects(
+        self,
+        payloads: list[dict],
+        target: str,
+        shard_size=None,
+        max_workers=None,
+        dryrun=True,
+        verbose=True,
+        metrics=None,
+    ) -> list[str]:
+        """
+        Packs local files ("filepath") into tar shards of about `shard_size` bytes under the S3 prefix
+        `target`, as members called "name", then writes an index of where each member's data starts.
+        Members already in the index are replaced. Returns the URIs of the new shards and the index.
+        """
+        bucket, prefix = self.get_bucket_and_key_from_uri(target)
+
+        if shard_size is None:
+            shard_size = self.__pack_shard_size
+
+        # group the files in order, each taking its header (longer for long names), data and padding to 512 bytes,
+        # with every shard starting from the two blocks that end the archive
+        shards = list()
+        shard_bytes = 0
+        for payload in payloads:
+            stat = os.stat(payload['filepath'])
+            header = self.__build_packed_tarinfo(payload['name'], stat).tobuf(format=tarfile.PAX_FORMAT)
+            member_bytes = len(header) + stat.st_size + -stat.st_size % tarfile.BLOCKSIZE
+
+            if len(shards) == 0 or shard_bytes + member_bytes > shard_size:
+                shards.append(list())
+                shard_bytes = 2 * tarfile.BLOCKSIZE
+
+            shards[-1].append(payload)
+            shard_bytes += member_bytes
+
+        # shards are never overwritten -- a new run only adds shards, and the index points at the latest copies
+        run_id = uuid.uuid4().hex[:12]
+        shard_names = [f'shard-{run_id}-{i:05d}.tar' for i in range(len(shards))]
+        index_key = posixpath.join(prefix, self.__pack_index_name)
+
+        uris = [f's3://{bucket}/{posixpath.join(prefix, name)}' for name in shard_names]
+        uris.append(f's3://{bucket}/{index_key}')
+
+        if verbose:
+            log_prefix = '(dryrun)' if dryrun else ''
+            for shard_name, members in zip(shard_names, shards):
+                print(f'{log_prefix} Packing {len(members)} files into "s3://{bucket}/{posixpath.join(prefix, shard_name)}"...')
+
+        if dryrun:
+            return uris
+
+        index = self.get_packed_index(bucket=bucket, prefix=prefix)
+
+        if max_workers is None:
+            max_workers = self.__max_workers
+
+        self.__reserve_connections(max_workers)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self.__upload_packed_shard, members, bucket, posixpath.join(prefix, shard_name), metrics)
+                for shard_name, members in zip(shard_names, shards)
+            ]
+
+            # the index is only written once every shard is in place -- a failed run leaves it untouched
+            entries = [future.result() for future in futures]
+
+        for shard_name, (shard_bytes, members) in zip(shard_names, entries):
+            shard_number = len(index['shards'])
+            index['shards'].append([shard_name, shard_bytes])
+
+            for name, (offset, size, member_hash) in members.items():
+                index['members'][name] = [shard_number, offset, size, member_hash]
+
+        self.upload_object_from_bytes(
+            contents=gzip.compress(json.dumps(index, separators=(',', ':')).encode('utf-8')),
+            bucket=bucket,
+            key=index_key,
+            dryrun=False,
+            verbose=False,
+        )
+
+        if metrics is not None:
+            metrics.report()
+
+        return uris
+
+
+    def __upload_packed_shard(
+        self,
+        members: list[dict],
+        bucket: str,
+        key: str,
+        metrics=None,
+    ) -> tuple:
+        """ Streams `members` into one tar object. Returns its size and each member's (data offset, size, MD5). """
+        entries = dict()
+        shard_bytes = 0
+        start = time.perf_counter()
+
+        def iter_tar():
+            nonlocal shard_bytes
+            offset = 0
+
+            for payload in members:
+                filepath = payload['filepath']
+                tarinfo = self.__build_packed_tarinfo(payload['name'], os.stat(filepath))
+
+                header = tarinfo.tobuf(format=tarfile.PAX_FORMAT)
+                yield header
+                offset += len(header)
+
+                hash_md5 = hashlib.md5()
+                size = 0
+                with open(filepath, 'rb') as in_file:
+                    while True:
+                        chunk = in_file.read(1024 * 1024)
+                        if not chunk:
+                            break
+                        hash_md5.update(chunk)
+                        size += len(chunk)
+                        yield chunk
+
+                if size != tarinfo.size:
+                    raise RuntimeError(f'File "{filepath}" changed while it was being packed.')
+
+                entries[payload['name']] = (offset, size, hash_md5.hexdigest())
+
+                padding = -size % tarfile.BLOCKSIZE
+                yield b'\0' * padding
+                offset += size + padding
+
+            # end-of-archive marker -- two empty blocks
+            yield b'\0' * (2 * tarfile.BLOCKSIZE)
+            shard_bytes = offset + 2 * tarfile.BLOCKSIZE
+
+        # at most two parts per shard in memory -- shards are uploaded side by side. The index holds
+        # every member's MD5, so shards skip the copy onto themselves that would write their own hash
+        self.upload_stream(
+            source=iter_tar(),
+            bucket=bucket,
+            key=key,
+            max_in_flight=2,
+            dryrun=False,
+            verbose=False,
+            write_hash=False,
+        )
+
+        if metrics is not None:
+            metrics.record(
+                operation='upload_packed_shard',
+                n_bytes=shard_bytes,
+                latency=time.perf_counter() - start,
+                n_objects=len(entries),
+            )
+
+        return shard_bytes, entries
+
+
+    def __build_packed_tarinfo(
+        self,
+        name: str,
+        stat: os.stat_result,
+    ) -> tarfile.TarInfo:
+        tarinfo = tarfile.TarInfo(name=name)
+        tarinfo.size = stat.st_size
+        tarinfo.mtime = int(stat.st_mtime)
+        tarinfo.mode = 0o644
+
+        return tarinfo
+
+
+    def get_packed_index(
+        self,
+        bucket: str,
+        prefix: str,
+    ) -> dict:
+        """ Returns the index of the packed objects under `prefix` -- empty if nothing was packed there. """
+        try:
+            response = self.__s3_client.get_object(
+                Bucket=bucket,
+                Key=posixpath.join(prefix, self.__pack_index_name),
+            )
+
+        except botocore.exceptions.ClientError as exception:
+            if exception.response['Error']['Code'] in ('NoSuchKey', '404'):
+                return {'version' : 1, 'shards' : list(), 'members' : dict()}
+            raise exception
+
+        return json.loads(gzip.decompress(response['Body'].read()))
+
+
+    def list_packed_objects(
+        self,
+        bucket: str,
+        prefix: str,
+    ) -> list[str]:
+        return sorted(self.get_packed_index(bucket=bucket, prefix=prefix)['members'])
+
+
+    def read_packed_object(
+        self,
+        bucket: str,
+        prefix: str,
+        name: str,
+        index=None,
+    ) -> bytes:
+        """ Reads one packed member with a ranged GET. Pass `index` to avoid fetching it on every call. """
+        if index is None:
+            index = self.get_packed_index(bucket=bucket, prefix=prefix)
+
+        entry = index['members'].get(name)
+        if entry is None:
+            raise RuntimeError(f'Packed object "{name}" not found in "s3://{bucket}/{prefix}".')
+
+        shard_number, offset, size, member_hash = entry
+        shard_key = posixpath.join(prefix, index['shards'][shard_number][0])
+
+        if size == 0:
+            contents = b''
+        else:
+            contents = self.__s3_client.get_object(
+                Bucket=bucket,
+                Key=shard_key,
+                Range=f'bytes={offset}-{offset + size - 1}',
+            )['Body'].read()
+
+        if hashlib.md5(contents).hexdigest() != member_hash:
+            raise RuntimeError(f'Packed object "{name}" in "s3://{bucket}/{shard_key}" does not match its hash.')
+
+        return contents
+
+
+    def download_packed_objects(
+        self,
+        bucket: str,
+        prefix: str,
+        target_directory: str,
+        names=None,
+        index=None,
+        max_workers=None,
+        max_gap=1024 ** 2,
+        dryrun=True,
+        verbose=True,
+        metrics=None,
+    ) -> list[str]:
+        """
+        Extracts packed members (all of them, unless `names` is given) into `target_directory`.
+        Members of a shard that lie less than `max_gap` bytes apart are streamed from one ranged
+        GET, skipping what lies between them -- unpacking a whole shard takes a single request.
+        Returns the filepaths written, in the order of `names`.
+        """
+        if index is None:
+            index = self.get_packed_index(bucket=bucket, prefix=prefix)
+
+        if names is None:
+            names = sorted(index['members'])
+
+        target_root = os.path.abspath(target_directory)
+        members_by_shard = dict()
+        filepaths = list()
+
+        for name in names:
+            entry = index['members'].get(name)
+            if entry is None:
+                raise RuntimeError(f'Packed object "{name}" not found in "s3://{bucket}/{prefix}".')
+
+            filepath = os.path.join(target_directory, *name.split('/'))
+            if not os.path.abspath(filepath).startswith(target_root + os.sep):
+                raise RuntimeError(f'Packed object "{name}" would be extracted outside of "{target_directory}".')
+
+            members_by_shard.setdefault(entry[0], list()).append((filepath, entry))
+            filepaths.append(filepath)
+
+        if verbose:
+            log_prefix = '(dryrun)' if dryrun else ''
+            for name, filepath in zip(names, filepaths):
+                print(f'{log_prefix} Extracting "{name}" from "s3://{bucket}/{prefix}" to "{filepath}"...')
+
+        if dryrun:
+            return filepaths
+
+        tasks = list()
+        for shard_number, members in members_by_shard.items():
+            shard_key = posixpath.join(prefix, index['shards'][shard_number][0])
+
+            # coalesce neighbouring members into runs, each read with one request
+            members = sorted(members, key=lambda member: member[1][1])
+            run = [members[0]]
+            run_end = members[0][1][1] + members[0][1][2]
+            for member in members[1:]:
+                if member[1][1] - run_end >= max_gap:
+                    tasks.append((shard_key, run))
+                    run = list()
+
+                run.append(member)
+                run_end = max(run_end, member[1][1] + member[1][2])
+
+            tasks.append((shard_key, run))
+
+        if max_workers is None:
+            max_workers = self.__max_workers
+
+        self.__reserve_connections(max_workers)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self.__download_packed_members, bucket, shard_key, members, metrics)
+                for shard_key, members in tasks
+            ]
+
+            for future in concurrent.futures.as_completed(futures):
+                future.result()
+
+        if metrics is not None:
+            metrics.report()
+
+        return filepaths
+
+
+    def __download_packed_members(
+        self,
+        bucket: str,
+        shard_key: str,
+        members: list[tuple],
+        metrics=None,
+    ):
+        """ Writes `members` -- (filepath, index entry) pairs from one shard -- with one GET spanning all of them. """
+        members = sorted(members, key=lambda member: member[1][1])
+        first_offset = members[0][1][1]
+        last_offset = max(entry[1] + entry[2] for _, entry in members)
+        start = time.perf_counter()
+
+        if last_offset > first_offset:
+            body = self.__s3_client.get_object(
+                Bucket=bucket,
+                Key=shard_key,
+                Range=f'bytes={first_offset}-{last_offset - 1}',
+            )['Body']
+
+        position = first_offset
+        for filepath, (_, offset, size, member_hash) in members:
+            # skip over the headers and members that were not asked for
+            while position < offset:
+                skipped = body.read(min(offset - position, 1024 * 1024))
+                if not skipped:
+                    raise RuntimeError(f'Shard "s3://{bucket}/{shard_key}" ended early.')
+                position += len(skipped)
+
+            os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+
+            hash_md5 = hashlib.md5()
+            remaining = size
+            with open(filepath, 'wb') as out_file:
+                while remaining > 0:
+                    chunk = body.read(min(remaining, 1024 * 1024))
+                    if not chunk:
+                        raise RuntimeError(f'Shard "s3://{bucket}/{shard_key}" ended early.')
+                    hash_md5.update(chunk)
+                    out_file.write(chunk)
+                    remaining -= len(chunk)
+
+            position += size
+
+            if hash_md5.hexdigest() != member_hash:
+                raise RuntimeError(f'Packed object "{filepath}" from "s3://{bucket}/{shard_key}" does not match its hash.')
+
+        if metrics is not None:
+            metrics.record(
+                operation='download_packed_members',
+                n_bytes=last_offset - first_offset,
+                latency=time.perf_counter() - start,
+                n_objects=len(members),
+            )
+
+
+    ### download ###
+    def download_object(
+        self,
+        bucket: str,
+        key: str,
+        filepath: str,
+        dryrun=True,
+        verbose=True,
+        transfer_config=None,
+        adaptive_part_size=False,
+        use_ranged_get=False,
+        max_retries=3,
+        verify_hash=True,
+    ):
+        directory = os.path.dirname(filepath)
+        os.makedirs(directory, exist_ok=True)
+
+        if verbose:
+            prefix = '(dryrun)' if dryrun else ''
+            source_uri = f's3://{bucket}/{key}'
+            print(f'{prefix} Downloading "{source_uri}" to "{filepath}"...')
+
+        if not dryrun and use_ranged_get:
+            self.__download_object_ranged(
+                bucket=bucket,
+                key=key,
+                filepath=filepath,
+                transfer_config=transfer_config,
+                adaptive_part_size=adaptive_part_size,
+                max_retries=max_retries,
+                verify_hash=verify_hash,
+            )
+
+        elif not dryrun:
+            object_size = self.get_object_size(bucket=bucket, key=key) if adaptive_part_size else None
+
+            self.__s3_client.download_file(
+                Bucket=bucket,
+                Key=key,
+                Filename=filepath,
+                Config=self.__get_download_transfer_config(object_size=object_size, transfer_config=transfer_config),
+            )
+
+
+    def __get_download_transfer_config(
+        self,
+        object_size=None,
+        transfer_config=None,
+    ) -> boto3.s3.transfer.TransferConfig:
+        """ Downloads have no part limit -- parts grow with the object, toward a few per concurrent worker. """
+        config = self.get_transfer_config(transfer_config=transfer_config)
+
+        if object_size is None:
+            return config
+
+        return self.get_transfer_config(
+            object_size=object_size,
+            transfer_config=config,
+            target_parts=config.max_concurrency * self.__download_parts_per_worker,
+        )
+
+
+    def __download_object_ranged(
+        self,
+        bucket: str,
+        key: str,
+        filepath: str,
+        transfer_config=None,
+        adaptive_part_size=False,
+        max_retries=3,
+        verify_hash=True,
+    ):
+        """
+        Preallocates `filepath`, maps it into memory and fills it from concurrent ranged GETs that
+        read straight into the mapping. Every range is pinned to the object's ETag, so a change
+        mid-download fails instead of mixing versions. A dropped range is retried from its last
+        byte; a range that fails for good stops the others, and the partial file is removed.
+        """
+        info = self.get_object_info(bucket=bucket, key=key)
+        object_size = info['size']
+
+        config = self.__get_download_transfer_config(
+            object_size=object_size if adaptive_part_size else None,
+            transfer_config=transfer_config,
+        )
+        part_size = config.multipart_chunksize
+
+        try:
+            with open(filepath, 'wb+') as out_file:
+                out_file.truncate(object_size)
+
+                # zero-length files cannot be memory-mapped
+                if object_size == 0:
+                    return
+
+                with mmap.mmap(out_file.fileno(), object_size) as mapping:
+                    with memoryview(mapping) as view:
+                        ranges = [
+                            (start, min(start + part_size, object_size) - 1)
+                            for start in range(0, object_size, part_size)
+                        ]
+
+                        stop = threading.Event()
+
+                        self.__reserve_connections(config.max_concurrency)
+                        with concurrent.futures.ThreadPoolExecutor(max_workers=config.max_concurrency) as executor:
+                            futures = [
+                                executor.submit(self.__download_range, bucket, key, info['etag'], view, start, end, max_retries, stop)
+                                for start, end in ranges
+                            ]
+
+                            try:
+                                for future in concurrent.futures.as_completed(futures):
+                                    future.result()
+
+                            except BaseException:
+                                # the download has failed -- do not fetch the rest before saying so
+                                stop.set()
+                                for future in futures:
+                                    future.cancel()
+                                raise
+
+                    expected_hash = info['metadata'].get(self.__s3_object_hash_field)
+                    if verify_hash and expected_hash is not None:
+                        actual_hash = hashlib.md5(mapping).hexdigest()
+                        if actual_hash != expected_hash:
+                            raise RuntimeError(f'Downloaded "{filepath}" has hash "{actual_hash}", but "s3://{bucket}/{key}" is stored with hash "{expected_hash}".')
+
+                    mapping.flush()
+
+        except BaseException:
+            # never leave a partially-written file behind
+            if os.path.isfile(filepath):
+                os.remove(filepath)
+            raise
+
+
+    def __download_range(
+        self,
+        bucket: str,
+        key: str,
+        etag: str,
+        view: memoryview,
+        start: int,
+        end: int,
+        max_retries: int,
+        stop=None,
+    ) -> int:
+        offset = start
+
+        for attempt in range(max_retries + 1):
+            if stop is not None and stop.is_set():
+                return offset - start
+
+            try:
+                response = self.__s3_client.get_object(
+                    Bucket=bucket,
+                    Key=key,
+                    Range=f'bytes={offset}-{end}',
+                    IfMatch=f'"{etag}"',
+                )
+
+                body = response['Body']
+                while offset <= end:
+                    # another range failed -- give up on this one
+                    if stop is not None and stop.is_set():
+                        body.close()
+                        return offset - start
+
+                    # read in pieces of at most 1 MiB, so a stop is noticed soon -- each released right away,
+                    # since a slice kept alive by a traceback would keep the mapping from closing
+                    with view[offset:min(end + 1, offset + 1024 ** 2)] as window:
+                        amount_read = body.readinto(window)
+
+                    if amount_read == 0:
+                        raise RuntimeError(f'Range "bytes={offset}-{end}" of "s3://{bucket}/{key}" ended early.')
+
+                    offset += amount_read
+
+                return end - start + 1
+
+            except botocore.exceptions.ClientError as exception:
+                if exception.response['Error']['Code'] in ('PreconditionFailed', '412'):
+                    self.__invalidate_metadata(bucket, key)
+                    raise RuntimeError(f'"s3://{bucket}/{key}" changed while it was being downloaded.')
+
+                if attempt == max_retries:
+                    raise exception
+
+            except (botocore.exceptions.BotoCoreError, RuntimeError) as exception:
+                # connection dropped mid-range -- retry from the last byte written
+                if attempt == max_retries:
+                    raise exception
+
+            time.sleep(0.1 * 2 ** attempt)
+
+
+    def download_objects(
+        self,
+        payloads: list[dict],
+        use_multiprocessing=False,
+        use_threading=False,
+        max_workers=None,
+        dryrun=True,
+        verbose=True,
+        metrics=None,
+        journal=None,
+    ):
+        self.__map_payloads(
+            function=self.__download_object_mp_unpack,
+            payloads=[{**p, 'dryrun' : dryrun, 'verbose' : verbose} for p in payloads],
+            use_multiprocessing=use_multiprocessing,
+            use_threading=use_threading,
+            max_workers=max_workers,
+            metrics=metrics,
+            journal=journal,
+        )
+
+
+    ### read ###
+    def read_object_range(
+        self,
+        bucket: str,
+        key: str,
+        start: int,
+        end=None,
+        max_retries=3,
+    ) -> bytes:
+        """
+        Returns bytes `start` up to (not including) `end` of the object, or up to its end when `end`
+        is None, from a single ranged GET. Ranges past the end of the object are cut short.
+        """
+        contents = b''.join(self.__iter_range(
+            bucket=bucket,
+            key=key,
+            start=start,
+            end=end,
+            chunk_size=self.__read_chunk_size,
+            max_retries=max_retries,
+        ))
+
+        return contents
+
+
+    def iter_object_chunks(
+        self,
+        bucket: str,
+        key: str,
+        chunk_size=None,
+        start=0,
+        end=None,
+        read_ahead=0,
+        max_retries=3,
+    ) -> typing.Iterator[bytes]:
+        """
+        Yields the object (or bytes `start` to `end`) in chunks of `chunk_size` bytes. By default one
+        GET is streamed, holding a single chunk at a time. With `read_ahead` > 0, each chunk is its
+        own ranged GET, and up to `read_ahead` chunks beyond the current one are fetched concurrently
+        -- at most `read_ahead + 1` chunks are held. Either way the reads are pinned to the object's
+        ETag, so a change mid-read raises instead of mixing versions.
+        """
+        if chunk_size is None:
+            chunk_size = self.__read_chunk_size
+
+        if read_ahead <= 0:
+            yield from self.__iter_range(
+                bucket=bucket,
+                key=key,
+                start=start,
+                end=end,
+                chunk_size=chunk_size,
+                max_retries=max_retries,
+            )
+            return
+
+        info = self.get_object_info(bucket=bucket, key=key)
+        end = info['size'] if end is None else min(end, info['size'])
+        etag = f'"{info["etag"]}"'
+
+        def read_chunk(chunk_start):
+            chunk = b''.join(self.__iter_range(
+                bucket=bucket,
+                key=key,
+                start=chunk_start,
+                end=min(chunk_start + chunk_size, end),
+                chunk_size=chunk_size,
+                etag=etag,
+                max_retries=max_retries,
+            ))
+
+            return chunk
+
+        chunk_starts = iter(range(start, end, chunk_size))
+        pending = collections.deque()
+
+        self.__reserve_connections(read_ahead)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=read_ahead) as executor:
+            try:
+                for chunk_start in itertools.islice(chunk_starts, read_ahead + 1):
+                    pending.append(executor.submit(read_chunk, chunk_start))
+
+                while len(pending) > 0:
+                    chunk = pending.popleft().result()
+
+                    for chunk_start in itertools.islice(chunk_starts, 1):
+                        pending.append(executor.submit(read_chunk, chunk_start))
+
+                    yield chunk
+
+            finally:
+                # a consumer that stops early should not wait for chunks it will never read
+                for future in pending:
+                    future.cancel()
+
+
+    def iter_object_lines(
+        self,
+        bucket: str,
+        key: str,
+        encoding='utf-8',
+        keepends=False,
+        chunk_size=None,
+        read_ahead=0,
+        max_retries=3,
+    ) -> typing.Iterator[typing.Union[str, bytes]]:
+        """
+        Yields the object's lines, split on "\\n" (a trailing "\\r" is removed too, unless `keepends`).
+        Lines are decoded with `encoding`, or yielded as bytes when it is None. Only the current
+        chunk and one partial line are buffered -- see iter_object_chunks for `read_ahead`.
+        """
+        chunks = self.iter_object_chunks(
+            bucket=bucket,
+            key=key,
+            chunk_size=chunk_size,
+            read_ahead=read_ahead,
+            max_retries=max_retries,
+        )
+
+        remainder = b''
+        for chunk in chunks:
+            lines = (remainder + chunk).split(b'\n')
+            remainder = lines.pop()
+
+            for line in lines:
+                if keepends:
+                    line += b'\n'
+                elif line.endswith(b'\r'):
+                    line = line[:-1]
+
+                yield line.decode(encoding) if encoding is not None else line
+
+        if len(remainder) > 0:
+            if not keepends and remainder.endswith(b'\r'):
+                remainder = remainder[:-1]
+
+            yield remainder.decode(encoding) if encoding is not None else remainder
+
+
+    def open(
+        self,
+        bucket: str,
+        key: str,
+        block_size=1024 * 1024,
+        cache_blocks=64,
+        read_ahead=4,
+        max_workers=4,
+        max_retries=3,
+    ) -> 'boto_plus.helpers.S3ObjectReader':
+        """
+        Opens the object as a read-only, seekable binary file (see helpers.S3ObjectReader) backed by
+        ranged GETs of `block_size` bytes, for libraries that need seek() and read() -- zipfile,
+        tarfile, columnar formats. Only the blocks that are read are fetched; sequential reads
+        prefetch up to `read_ahead` blocks. Reads are pinned to the object's current ETag.
+        """
+        info = self.get_object_info(bucket=bucket, key=key)
+        etag = f'"{info["etag"]}"'
+        self.__reserve_connections(max_workers)
+
+        def read_range(start, end):
+            contents = b''.join(self.__iter_range(
+                bucket=bucket,
+                key=key,
+                start=start,
+                end=end,
+                chunk_size=block_size,
+                etag=etag,
+                max_retries=max_retries,
+            ))
+
+            return contents
+
+        reader = boto_plus.helpers.S3ObjectReader(
+            read_range=read_range,
+            size=info['size'],
+            name=f's3://{bucket}/{key}',
+            block_size=block_size,
+            cache_blocks=cache_blocks,
+            read_ahead=read_ahead,
+            max_workers=max_workers,
+        )
+
+        return reader
+
+
+    def __iter_range(
+        self,
+        bucket: str,
+        key: str,
+        start: int,
+        end=None,
+        chunk_size=None,
+        etag=None,
+        max_retries=3,
+    ) -> typing.Iterator[bytes]:
+        """
+        Streams bytes `start` to `end` (exclusive; None reads to the end) from one GET, in chunks.
+        A dropped connection is resumed from the last byte received, pinned to the ETag of the
+        first response (or `etag`).
+        """
+        if start < 0:
+            raise RuntimeError(f'Provided "start" must not be negative. (Received {start})')
+
+        offset = start
+        attempt = 0
+
+        while end is None or offset < end:
+            kwargs = {
+                'Bucket' : bucket,
+                'Key'    : key,
+                'Range'  : f'bytes={offset}-' if end is None else f'bytes={offset}-{end - 1}',
+            }
+            if etag is not None:
+                kwargs['IfMatch'] = etag
+
+            try:
+                response = self.__s3_client.get_object(**kwargs)
+
+            except botocore.exceptions.ClientError as exception:
+                code = exception.response['Error']['Code']
+
+                # the range starts at or past the end of the object -- nothing (more) to read
+                if code in ('InvalidRange', '416'):
+                    return
+
+                if code in ('PreconditionFailed', '412'):
+                    self.__invalidate_metadata(bucket, key)
+                    raise RuntimeError(f'"s3://{bucket}/{key}" changed while it was being read.')
+
+                if attempt == max_retries:
+                    raise exception
+
+                attempt += 1
+                time.sleep(0.1 * 2 ** attempt)
+                continue
+
+            etag = response['ETag']
+            body = response['Body']
+
+            try:
+                while True:
+                    chunk = body.read(chunk_size)
+                    if not chunk:
+                        return
+
+                    offset += len(chunk)
+                    yield chunk
+
+            except botocore.exceptions.BotoCoreError as exception:
+                # connection dropped mid-body -- request the rest
+                if attempt == max_retries:
+                    raise exception
+
+                attempt += 1
+                time.sleep(0.1 * 2 ** attempt)
+
+            finally:
+                body.close()
+
+
+    ### sync ###
+    def sync(
+        self,
+        source: str,
+        target: str,
+        use_multiprocessing=False,
+        use_threading=False,
+        max_workers=None,
+        dryrun=True,
+        verbose=True,
+        hash_index=None,
+        hash_while_uploading=False,
+        use_checksums=False,
+        use_etags=False,
+        etag_part_size=None,
+        metrics=None,
+        journal=None,
+        pack=False,
+        shard_size=None,
+    ) -> list[str]:
+        index, owns_index = self.__open_hash_index(hash_index, source, target)
+
+        if pack:
+            try:
+                return self.__sync_packed(source, target, index, shard_size, max_workers, dryrun, verbose, metrics)
+
+            finally:
+                if owns_index:
+                    index.close()
+
+        journal, owns_journal = self.__open_journal(journal)
+
+        try:
+            plan, output_files, journal_keys = self.__plan_sync(
+                source=source,
+                target=target,
+                hash_index=index,
+                use_checksums=use_checksums,
+                use_etags=use_etags,
+                etag_part_size=etag_part_size,
+                journal=journal,
+            )
+
+            payloads = [
+                {**p, 'dryrun' : dryrun, 'verbose' : verbose, 'hash-while-uploading' : hash_while_uploading}
+                for p in plan
+            ]
+
+            if journal is not None:
+                # targets found to be up to date are complete as well -- a restart need not compare them again
+                planned_targets = {self.__get_sync_target(entry) for entry in plan}
+                if not dryrun:
+                    for target_id, journal_key in journal_keys.items():
+                        if target_id not in planned_targets:
+                            journal.record(journal_key)
+
+                journal_keys = [journal_keys[self.__get_sync_target(entry)] for entry in plan]
+
+            # uploads are hashed here, through the index, and the workers get the digests -- the
+            # index is never shared with worker processes, which would contend for its write lock
+            if index is not None and not hash_while_uploading and not dryrun:
+                upload_payloads = [payload for payload in payloads if payload['sync-type'] == 'local-to-s3']
+                local_file_hashes = self.__get_local_file_hashes([payload['source-filepath'] for payload in upload_payloads], index)
+                index.flush()
+
+                for payload in upload_payloads:
+                    payload['source-hash'] = local_file_hashes[payload['source-filepath']]
+
+            self.__map_payloads(
+                function=self.__sync_item,
+                payloads=payloads,
+                use_multiprocessing=use_multiprocessing,
+                use_threading=use_threading,
+                max_workers=max_workers,
+                metrics=metrics,
+                journal=journal,
+                journal_keys=journal_keys,
+            )
+
+        finally:
+            if owns_index:
+                index.close()
+            if owns_journal:
+                journal.close()
+
+        return output_files
+
+
+    def plan_sync(
+        self,
+        source: str,
+        target: str,
+        hash_index=None,
+        use_checksums=False,
+        use_etags=False,
+        etag_part_size=None,
+        journal=None,
+    ) -> list[dict]:
+        index, owns_index = self.__open_hash_index(hash_index, source, target)
+        journal, owns_journal = self.__open_journal(journal)
+
+        try:
+            plan, _, _ = self.__plan_sync(
+                source=source,
+                target=target,
+                hash_index=index,
+                use_checksums=use_checksums,
+                use_etags=use_etags,
+                etag_part_size=etag_part_size,
+                journal=journal,
+            )
+
+        finally:
+            if owns_index:
+                index.close()
+            if owns_journal:
+                journal.close()
+
+        return plan
+
+
+    def __sync_packed(
+        self,
+        source: str,
+        target: str,
+        hash_index=None,
+        shard_size=None,
+        max_workers=None,
+        dryrun=True,
+        verbose=True,
+        metrics=None,
+    ) -> list[str]:
+        """
+        Syncs a local directory with a packed prefix (see pack_objects), comparing files with the
+        size and MD5 the index holds for each member. Uploads pack new and changed files into new
+        shards, and return every member name; downloads extract them, and return every filepath.
+        """
+        sync_type = self.__get_sync_type(source, target)
+        if sync_type not in ('local-to-s3', 's3-to-local'):
+            raise RuntimeError(f'Packed sync needs one local and one S3 side. (Received "{source}", "{target}")')
+
+        bucket, prefix = self.get_bucket_and_key_from_uri(target if sync_type == 'local-to-s3' else source)
+        packed_index = self.get_packed_index(bucket=bucket, prefix=prefix)
+        members = packed_index['members']
+
+        if sync_type == 'local-to-s3':
+            filepaths = boto_plus.helpers.get_filepaths_in_directory(local_directory=source, recursive=True)
+
+            if hash_index is not None:
+                index_filepath = os.path.abspath(hash_index.get_index_filepath())
+                filepaths = [f for f in filepaths if not os.path.abspath(f).startswith(index_filepath)]
+
+            names = {
+                filepath : boto_plus.helpers.convert_filepath_to_posix(filepath[len(source):]).lstrip('/')
+                for filepath in filepaths
+            }
+
+        else:
+            names = {
+                os.path.join(target, *name.split('/')) : name
+                for name in members
+            }
+
+        # only files as large as their member are hashed
+        candidates = [
+            filepath
+            for filepath, name in names.items()
+            if name in members and os.path.isfile(filepath) and os.path.getsize(filepath) == members[name][2]
+        ]
+        local_file_hashes = self.__get_local_file_hashes(candidates, hash_index)
+
+        changed = [
+            (filepath, name)
+            for filepath, name in names.items()
+            if filepath not in local_file_hashes or local_file_hashes[filepath] != members[name][3]
+        ]
+
+        if sync_type == 'local-to-s3':
+            if len(changed) > 0:
+                self.pack_objects(
+                    payloads=[{'filepath' : filepath, 'name' : name} for filepath, name in changed],
+                    target=target,
+                    shard_size=shard_size,
+                    max_workers=max_workers,
+                    dryrun=dryrun,
+                    verbose=verbose,
+                    metrics=metrics,
+                )
+
+            return sorted(names.values())
+
+        if len(changed) > 0:
+            self.download_packed_objects(
+                bucket=bucket,
+                prefix=prefix,
+                target_directory=target,
+                names=[name for _, name in changed],
+                index=packed_index,
+                max_workers=max_workers,
+                dryrun=dryrun,
+                verbose=verbose,
+                metrics=metrics,
+            )
+
+        return list(names)
+
+
+    def __open_hash_index(
+        self,
+        hash_index,
+        source: str,
+        target: str,
+    ) -> tuple:
+        """
+        `hash_index` may be a LocalHashIndex, a filepath for one, or True to keep the index in
+        the local side of the sync. Returns the index and whether this call opened it.
+        """
+        if hash_index is None or hash_index is False:
+            return None, False
+
+        if isinstance(hash_index, boto_plus.helpers.LocalHashIndex):
+            return hash_index, False
+
+        if hash_index is True:
+            local_directory = target if source.startswith('s3://') else source
+            hash_index = os.path.join(local_directory, self.__hash_index_filename)
+
+        return boto_plus.helpers.LocalHashIndex(hash_index), True
+
+
+    def __open_journal(
+        self,
+        journal,
+    ) -> tuple:
+        """ `journal` may be a TransferJournal or a filepath for one. Returns the journal and whether this call opened it. """
+        if journal is None:
+            return None, False
+
+        if isinstance(journal, boto_plus.helpers.TransferJournal):
+            return journal, False
+
+        return boto_plus.helpers.TransferJournal(journal), True
+
+
+    def __plan_sync(
+        self,
+        source: str,
+        target: str,
+        hash_index=None,
+        use_checksums=False,
+        use_etags=False,
+        etag_part_size=None,
+        journal=None,
+    ) -> tuple:
+        """
+        Lists the source and target once each and diffs them in memory. Objects are compared on
+        size first, then ETag (or local MD5); only when those disagree for equal-sized objects is
+        the stored object hash fetched. With `use_checksums`, equal-sized objects that carry a
+        full-object native S3 checksum are compared on it instead, so they need no MD5 at all. With
+        `use_etags`, local files are compared against multipart ETags by recomputing them locally.
+        With a `journal`, transfers an earlier run completed are skipped without being compared --
+        their keys include the source's size and ETag (or modification time), so a changed source
+        is transferred again. Returns the transfers that are needed, every target, and the journal
+        key of every target that was compared.
+        """
+        if not source.startswith('s3://') and not target.startswith('s3://'):
+            raise RuntimeError(f'At least one of "source", "target" must be an S3 URI. (Received "{source}", "{target}")')
+
+        sync_type = self.__get_sync_type(source, target)
+
+        plan = list()
+        output_files = list()
+
+        # journal key per target, for transfers the journal does not hold yet
+        journal_keys = dict()
+
+        if sync_type == 's3-to-s3':
+            source_bucket, source_prefix = self.get_bucket_and_key_from_uri(source)
+            target_bucket, target_prefix = self.get_bucket_and_key_from_uri(target)
+
+            target_records = {
+                record.key : record
+                for record in self.iter_objects(bucket=target_bucket, prefix=target_prefix)
+            }
+
+            for source_record in self.iter_objects(bucket=source_bucket, prefix=source_prefix):
+                partial_target_key = source_record.key[len(source_prefix):].lstrip('/')
+                target_key = posixpath.join(target_prefix, partial_target_key)
+
+                output_files.append(f's3://{target_bucket}/{target_key}')
+
+                entry = {
+                    'sync-type'     : sync_type,
+                    'source-bucket' : source_bucket,
+                    'source-key'    : source_record.key,
+                    'target-bucket' : target_bucket,
+                    'target-key'    : target_key,
+                }
+
+                if journal is not None:
+                    journal_key = journal.get_item_key([entry, source_record.size, source_record.etag])
+                    if journal.is_completed(journal_key):
+                        continue
+                    journal_keys[target_key] = journal_key
+
+                target_record = target_records.get(target_key)
+                if target_record is None or not self.__are_objects_equal(source_bucket, source_record, target_bucket, target_record, use_checksums):
+                    plan.append(entry)
+
+        elif sync_type == 'local-to-s3':
+            target_bucket, target_prefix = self.get_bucket_and_key_from_uri(target)
+            source_filepaths = boto_plus.helpers.get_filepaths_in_directory(
+                local_directory=source,
+                recursive=True,
+            )
+
+            target_records = {
+                record.key : record
+                for record in self.iter_objects(bucket=target_bucket, prefix=target_prefix)
+            }
+
+            if hash_index is not None:
+                # never sync the index itself (or its SQLite journal files)
+                index_filepath = os.path.abspath(hash_index.get_index_filepath())
+                source_filepaths = [f for f in source_filepaths if not os.path.abspath(f).startswith(index_filepath)]
+
+            if journal is not None:
+                journal_filepath = os.path.abspath(journal.get_journal_filepath())
+                source_filepaths = [f for f in source_filepaths if os.path.abspath(f) != journal_filepath]
+
+            pairs = list()
+            for source_filepath in source_filepaths:
+                filepath_no_prefix = source_filepath[len(source):].lstrip('/')
+                partial_key = boto_plus.helpers.convert_filepath_to_posix(filepath_no_prefix).lstrip('/')
+                target_key  = posixpath.join(target_prefix, partial_key)
+
+                output_files.append(f's3://{target_bucket}/{target_key}')
+
+                entry = {
+                    'sync-type'       : sync_type,
+                    'source-filepath' : source_filepath,
+                    'target-bucket'   : target_bucket,
+                    'target-key'      : target_key,
+                }
+
+                if journal is not None:
+                    stat = os.stat(source_filepath)
+                    journal_key = journal.get_item_key([entry, stat.st_size, stat.st_mtime_ns])
+                    if journal.is_completed(journal_key):
+                        continue
+                    journal_keys[target_key] = journal_key
+
+                pairs.append((source_filepath, target_records.get(target_key), entry))
+
+            plan = self.__diff_files_and_objects(pairs, target_bucket, hash_index, use_checksums, use_etags, etag_part_size)
+
+        elif sync_type == 's3-to-local':
+            os.makedirs(target, exist_ok=True)
+            source_bucket, source_prefix = self.get_bucket_and_key_from_uri(source)
+
+            pairs = list()
+            for source_record in self.iter_objects(bucket=source_bucket, prefix=source_prefix):
+                partial_target_filepath = source_record.key[len(source_prefix):].lstrip('/')
+
+                if boto_plus.helpers.is_windows_filepath(target):
+                    partial_target_filepath = boto_plus.helpers.convert_filepath_to_windows(partial_target_filepath)
+                    target_filepath = os.path.join(target, partial_target_filepath)
+
+                else:
+                    partial_target_filepath = boto_plus.helpers.convert_filepath_to_posix(partial_target_filepath)
+                    target_filepath = posixpath.join(target, partial_target_filepath)
+
+                output_files.append(target_filepath)
+
+                entry = {
+                    'sync-type'       : sync_type,
+                    'source-bucket'   : source_bucket,
+                    'source-key'      : source_record.key,
+                    'target-filepath' : target_filepath,
+                }
+
+                if journal is not None:
+                    journal_key = journal.get_item_key([entry, source_record.size, source_record.etag])
+                    if journal.is_completed(journal_key):
+                        continue
+                    journal_keys[target_filepath] = journal_key
+
+                pairs.append((target_filepath, source_record, entry))
+
+            plan = self.__diff_files_and_objects(pairs, source_bucket, hash_index, use_checksums, use_etags, etag_part_size)
+
+        return plan, output_files, journal_keys
+
+
+    def __are_objects_equal(
+        self,
+        source_bucket: str,
+        source_record: S3ObjectRecord,
+        target_bucket: str,
+        target_record: S3ObjectRecord,
+        use_checksums=False,
+    ) -> bool:
+        if source_record.size != target_record.size:
+            return False
+
+        if source_record.etag == target_record.etag:
+            return True
+
+        if use_checksums:
+            source_checksum = self.get_object_checksum(bucket=source_bucket, key=source_record.key)
+            target_checksum = self.get_object_checksum(bucket=target_bucket, key=target_record.key)
 
-    def download_objects(
-        self,
-        payloads: list[dict],
-        use_multiprocessing=False,
-        dryrun=True,
-        verbose=True,
-    ):
-            if use_multiprocessing:
-                for p in payloads:
-                    p['dryrun']  = dryrun
-                    p['verbose'] = verbose
+            comparable = (
+                source_checksum is not None and target_checksum is not None
+                and source_checksum['type'] == target_checksum['type'] == 'FULL_OBJECT'
+                and source_checksum['algorithm'] == target_checksum['algorithm']
+            )
 
-                with mp.Pool() as pool:
-                    pool.map(self.__download_object_mp_unpack, payloads)
+            if comparable:
+                return source_checksum['checksum'] == target_checksum['checksum']
 
-            else:
-                for payload in payloads:
-                    self.download_object(**payload, verbose=verbose, dryrun=dryrun)
+        # equal sizes but different ETags (e.g. different multipart layouts) -- fall back to the stored hashes
+        source_hash = self.get_object_metadata(bucket=source_bucket, key=source_record.key).get(self.__s3_object_hash_field)
+        target_hash = self.get_object_metadata(bucket=target_bucket, key=target_record.key).get(self.__s3_object_hash_field)
 
+        return source_hash is not None and source_hash == target_hash
 
-    ### sync ###
-    def sync(
+
+    def __diff_files_and_objects(
         self,
-        source: str,
-        target: str,
-        use_multiprocessing=False,
-        dryrun=True,
-        verbose=True,
-    ) -> list[str]:
-        if not source.startswith('s3://') and not target.startswith('s3://'):
-            raise RuntimeError(f'At least one of "source", "target" must be an S3 URI. (Received "{source}", "{target}")')
+        pairs: list[tuple],
+        bucket: str,
+        hash_index=None,
+        use_checksums=False,
+        use_etags=False,
+        etag_part_size=None,
+    ) -> list[dict]:
+        """
+        `pairs` holds (local filepath, S3ObjectRecord or None, plan entry) tuples. Only files whose
+        size matches their object are hashed, all in one concurrent batch; returns the plan entries
+        of the pairs that differ.
+        """
+        candidates = {
+            filepath : record
+            for filepath, record, _ in pairs
+            if record is not None and os.path.isfile(filepath) and os.path.getsize(filepath) == record.size
+        }
 
-        sync_type = self.__get_sync_type(source, target)
+        if use_checksums:
+            is_equal = self.__compare_files_to_checksums(candidates, bucket)
+        else:
+            is_equal = dict()
 
-        # run in parallel with multiprocessing
-        if use_multiprocessing:
-            if sync_type == 's3-to-s3':
-                source_bucket, source_prefix = self.get_bucket_and_key_from_uri(source)
-                target_bucket, target_prefix = self.get_bucket_and_key_from_uri(target)
-                source_keys = self.list_objects(bucket=source_bucket, prefix=source_prefix)
-                payloads = [
-                    {
-                        'source-bucket' : source_bucket,
-                        'source-prefix' : source_prefix,
-                        'source-key'    : key,
-                        'target-bucket' : target_bucket,
-                        'target-prefix' : target_prefix,
-                        'sync-type'     : sync_type,
-                        'dryrun'        : dryrun,
-                        'verbose'       : verbose,
-                    }
-                    for key in source_keys
-                ]
-
-            elif sync_type == 'local-to-s3':
-                source_filepaths = boto_plus.helpers.get_filepaths_in_directory(
-                    local_directory=source,
-                    recursive=True,
-                )
+        if use_etags:
+            multipart_candidates = {
+                filepath : record
+                for filepath, record in candidates.items()
+                if filepath not in is_equal and '-' in record.etag
+            }
 
-                target_bucket, target_prefix = self.get_bucket_and_key_from_uri(target)
-                payloads = [
-                    {
-                        'source-directory' : source,
-                        'source-filepath'  : filepath,
-                        'target-bucket'    : target_bucket,
-                        'target-prefix'    : target_prefix, 
-                        'sync-type'        : sync_type,
-                        'dryrun'           : dryrun,
-                        'verbose'          : verbose,
-                    }
-                    for filepath in source_filepaths
-                ]
-
-            elif sync_type == 's3-to-local':
-                os.makedirs(target, exist_ok=True)
-                source_bucket, source_prefix = self.get_bucket_and_key_from_uri(source)
-                source_keys = self.list_objects(bucket=source_bucket, prefix=source_prefix)
-                payloads = [
-                    {
-                        'source-bucket'    : source_bucket,
-                        'source-prefix'    : source_prefix,
-                        'source-key'       : key,
-                        'target-directory' : target,
-                        'sync-type'        : sync_type,
-                        'dryrun'           : dryrun,
-                        'verbose'          : verbose,
-                    }
-                    for key in source_keys
-                ]
-
-            with mp.Pool() as pool:
-                output_files = pool.map(self.__sync_item, payloads)
-
-        # run sequentially
+            etags_equal, local_file_hashes = self.__compare_files_to_etags(multipart_candidates, etag_part_size)
+            is_equal.update(etags_equal)
         else:
-            output_files = list()
-
-            if sync_type == 's3-to-s3':
-                source_bucket, source_prefix = self.get_bucket_and_key_from_uri(source)
-                target_bucket, target_prefix = self.get_bucket_and_key_from_uri(target)
-                source_keys = self.list_objects(bucket=source_bucket, prefix=source_prefix)
-
-                for source_key in source_keys:
-                    uri = self.__sync_item({
-                        'sync-type'     : sync_type,
-                        'source-bucket' : source_bucket,
-                        'source-prefix' : source_prefix,
-                        'source-key'    : source_key,
-                        'target-bucket' : target_bucket,
-                        'target-prefix' : target_prefix,
-                        'dryrun'        : dryrun,
-                        'verbose'       : verbose,
-                    })
+            local_file_hashes = dict()
+
+        # whatever could not be compared on a native checksum falls back to MD5 -- files read for their ETags already have one
+        remaining = [filepath for filepath in candidates if filepath not in is_equal]
+        unhashed = [filepath for filepath in remaining if filepath not in local_file_hashes]
+        local_file_hashes.update(self.__get_local_file_hashes(unhashed, hash_index))
+
+        for filepath in remaining:
+            is_equal[filepath] = self.__is_hash_equal_to_object(local_file_hashes[filepath], bucket, candidates[filepath])
+
+        plan = [
+            entry
+            for filepath, record, entry in pairs
+            if not is_equal.get(filepath, False)
+        ]
 
-                    output_files.append(uri)
+        return plan
 
-            elif sync_type == 'local-to-s3':
-                target_bucket, target_prefix = self.get_bucket_and_key_from_uri(target)
-                source_filepaths = boto_plus.helpers.get_filepaths_in_directory(
-                    local_directory=source,
-                    recursive=True,
+
+    def __compare_files_to_etags(
+        self,
+        candidates: dict,
+        part_size=None,
+    ) -> tuple[dict, dict]:
+        """
+        Recomputes the multipart ETag of each local file -- with `part_size`, or with each part size
+        that gives the listed number of parts -- and compares it to the listed ETag, so no HEAD is
+        needed. Every candidate part size and the file's MD5 come from one read of the file.
+        Returns the matches, and the MD5s of the files that did not match for the MD5 comparison.
+        """
+        def compare_etag(filepath):
+            record = candidates[filepath]
+            n_parts = int(record.etag.split('-')[-1])
+
+            if part_size is not None:
+                part_sizes = [part_size]
+            else:
+                part_sizes = boto_plus.helpers.get_multipart_part_size_candidates(
+                    file_size=record.size,
+                    n_parts=n_parts,
+                    preferred_part_sizes=[self.get_transfer_config(object_size=record.size).multipart_chunksize],
                 )
 
-                for source_filepath in source_filepaths:
-                    uri = self.__sync_item({
-                        'sync-type'        : sync_type,
-                        'source-directory' : source,
-                        'source-filepath'  : source_filepath,
-                        'target-bucket'    : target_bucket,
-                        'target-prefix'    : target_prefix,
-                        'dryrun'           : dryrun,
-                        'verbose'          : verbose,
-                    })
+            local_etags, local_file_hash = boto_plus.helpers.get_local_file_multipart_hashes(
+                filepath=filepath,
+                part_sizes=part_sizes,
+            )
 
-                    output_files.append(uri)
-
-            elif sync_type == 's3-to-local':
-                os.makedirs(target, exist_ok=True)
-                source_bucket, source_prefix = self.get_bucket_and_key_from_uri(source)
-                source_keys = self.list_objects(bucket=source_bucket, prefix=source_prefix)
-                for source_key in source_keys:
-                    filepath = self.__sync_item({
-                        'sync-type'        : sync_type,
-                        'source-bucket'    : source_bucket,
-                        'source-prefix'    : source_prefix,
-                        'source-key'       : source_key,
-                        'target-directory' : target,
-                        'dryrun'           : dryrun,
-                        'verbose'          : verbose,
-                    })
+            return record.etag in local_etags.values(), local_file_hash
 
-                    output_files.append(filepath)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            results = dict(zip(candidates, executor.map(compare_etag, candidates)))
 
-        return output_files
+        is_equal = {filepath : True for filepath, (is_etag_equal, _) in results.items() if is_etag_equal}
+        local_file_hashes = {filepath : file_hash for filepath, (is_etag_equal, file_hash) in results.items() if not is_etag_equal}
 
+        return is_equal, local_file_hashes
 
-    def __sync_item(
+
+    def __compare_files_to_checksums(
         self,
-        payload: dict,
-    ) -> str:
-        sync_type = payload['sync-type']
-        dryrun    = payload['dryrun']
-        verbose   = payload['verbose']
+        candidates: dict,
+        bucket: str,
+    ) -> dict:
+        """
+        Fetches the native checksums of the `candidates` objects concurrently and compares each
+        against the same checksum computed locally. Objects without a full-object checksum (or
+        with an algorithm that is unavailable here) are left out of the result.
+        """
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            checksums = executor.map(
+                lambda record: self.get_object_checksum(bucket=bucket, key=record.key),
+                candidates.values(),
+            )
+            checksums = dict(zip(candidates, checksums))
+
+        filepaths_by_algorithm = collections.defaultdict(list)
+        for filepath, checksum in checksums.items():
+            if checksum is not None and checksum['type'] == 'FULL_OBJECT' and boto_plus.helpers.is_checksum_algorithm_available(checksum['algorithm']):
+                filepaths_by_algorithm[checksum['algorithm']].append(filepath)
+
+        is_equal = dict()
+        for algorithm, filepaths in filepaths_by_algorithm.items():
+            local_checksums = boto_plus.helpers.get_local_file_checksums(
+                filepaths=filepaths,
+                algorithm=algorithm,
+                max_workers=self.__max_workers,
+            )
 
-        if sync_type == 's3-to-s3':
-            source_bucket = payload['source-bucket']
-            source_prefix = payload['source-prefix']
-            source_key    = payload['source-key']
-            target_bucket = payload['target-bucket']
-            target_prefix = payload['target-prefix']
+            for filepath in filepaths:
+                is_equal[filepath] = local_checksums[filepath] == checksums[filepath]['checksum']
 
-            partial_target_key = source_key.replace(source_prefix, '').lstrip('/')
-            target_key = posixpath.join(target_prefix, partial_target_key)
+        return is_equal
 
-            if self.does_object_exist(bucket=source_bucket, key=source_key):
-                source_remote_file_hash = self.get_object_hash(bucket=source_bucket, key=source_key)
-            else:
-                uri = f's3://{source_bucket}/{source_key}'
-                raise RuntimeError(f'The provided S3 object does not exist: "{uri}"')
 
-            if self.does_object_exist(bucket=target_bucket, key=target_key):
-                target_object_hash = self.get_object_hash(bucket=target_bucket, key=target_key)
-            else:
-                target_object_hash = None
+    def __is_hash_equal_to_object(
+        self,
+        local_file_hash: str,
+        bucket: str,
+        record: S3ObjectRecord,
+    ) -> bool:
+        if local_file_hash == record.etag:
+            return True
 
-            if source_remote_file_hash != target_object_hash:
-                self.copy_object(
-                    source_bucket=source_bucket,
-                    source_key=source_key,
-                    target_bucket=target_bucket,
-                    target_key=target_key,
-                    dryrun=dryrun,
-                    verbose=verbose,
-                )
+        # the ETag is not a plain MD5 for multipart or KMS-encrypted objects -- fall back to the stored hash
+        object_hash = self.get_object_metadata(bucket=bucket, key=record.key).get(self.__s3_object_hash_field)
 
-            output_file = f's3://{target_bucket}/{target_key}'
+        return local_file_hash == object_hash
 
-        elif sync_type == 'local-to-s3':
-            source_directory = payload['source-directory']
-            source_filepath  = payload['source-filepath']
-            target_bucket    = payload['target-bucket']
-            target_prefix    = payload['target-prefix']
 
-            filepath_no_prefix = source_filepath.replace(source_directory, '').lstrip('/')
-            partial_key = boto_plus.helpers.convert_filepath_to_posix(filepath_no_prefix)
-            target_key  = posixpath.join(target_prefix, partial_key)
+    def __get_local_file_hash(
+        self,
+        filepath: str,
+        hash_index=None,
+    ) -> str:
+        if hash_index is not None:
+            return hash_index.get_file_hash(filepath)
 
-            if os.path.isfile(source_filepath):
-                source_local_file_hash = boto_plus.helpers.get_local_file_hash(source_filepath)
-            else:
-                raise RuntimeError(f'The provided file does not exist: "{source_filepath}"')
+        return boto_plus.helpers.get_local_file_hash(filepath)
 
-            if self.does_object_exist(bucket=target_bucket, key=target_key):
-                target_object_hash = self.get_object_hash(bucket=target_bucket, key=target_key)
-            else:
-                target_object_hash = None
 
-            if source_local_file_hash != target_object_hash:
-                self.upload_object(
-                    filepath=source_filepath,
-                    bucket=target_bucket,
-                    key=target_key,
-                    dryrun=dryrun,
-                    verbose=verbose,
-                )
+    def __get_local_file_hashes(
+        self,
+        filepaths: list[str],
+        hash_index=None,
+    ) -> dict:
+        if hash_index is not None:
+            return hash_index.get_file_hashes(filepaths, max_workers=self.__max_workers)
 
-            output_file = f's3://{target_bucket}/{target_key}'
+        return boto_plus.helpers.get_local_file_hashes(filepaths, max_workers=self.__max_workers)
 
-        elif sync_type == 's3-to-local':
-            source_bucket = payload['source-bucket']
-            source_prefix = payload['source-prefix']
-            source_key    = payload['source-key']
-            target_directory = payload['target-directory']
 
-            partial_target_filepath = source_key.replace(source_prefix, '').lstrip('/')
+    def __sync_item(
+        self,
+        payload: dict,
+    ) -> tuple:
+        sync_type = payload['sync-type']
+        dryrun    = payload['dryrun']
+        verbose   = payload['verbose']
+
+        if sync_type == 's3-to-s3':
+            output_file, operation, n_bytes = self.__copy_object_mp_unpack({
+                'source_bucket' : payload['source-bucket'],
+                'source_key'    : payload['source-key'],
+                'target_bucket' : payload['target-bucket'],
+                'target_key'    : payload['target-key'],
+                'dryrun'        : dryrun,
+                'verbose'       : verbose,
+            })
+
+        elif sync_type == 'local-to-s3' and 'source-hash' in payload:
+            output_file = self.__upload_file(
+                filepath=payload['source-filepath'],
+                bucket=payload['target-bucket'],
+                key=payload['target-key'],
+                filepath_hash=payload['source-hash'],
+                dryrun=dryrun,
+                verbose=verbose,
+            )
 
-            if boto_plus.helpers.is_windows_filepath(target_directory):
-                partial_target_filepath = boto_plus.helpers.convert_filepath_to_windows(partial_target_filepath)
-                target_filepath = os.join(target_directory, partial_target_filepath)
+            operation = 'upload_object'
+            n_bytes = os.path.getsize(payload['source-filepath']) if not dryrun else 0
 
-            else:
-                partial_target_filepath = boto_plus.helpers.convert_filepath_to_posix(partial_target_filepath)
-                target_filepath = posixpath.join(target_directory, partial_target_filepath)
+        elif sync_type == 'local-to-s3':
+            output_file, operation, n_bytes = self.__upload_object_mp_unpack({
+                'filepath'             : payload['source-filepath'],
+                'bucket'               : payload['target-bucket'],
+                'key'                  : payload['target-key'],
+                'hash_while_uploading' : payload.get('hash-while-uploading', False),
+                'dryrun'               : dryrun,
+                'verbose'              : verbose,
+            })
 
-            if self.does_object_exist(bucket=source_bucket, key=source_key):
-                source_remote_file_hash = self.get_object_hash(bucket=source_bucket, key=source_key)
-            else:
-                uri = f's3://{source_bucket}/{source_key}'
-                raise RuntimeError(f'The provided S3 object does not exist: "{uri}"')
+        elif sync_type == 's3-to-local':
+            _, operation, n_bytes = self.__download_object_mp_unpack({
+                'bucket'   : payload['source-bucket'],
+                'key'      : payload['source-key'],
+                'filepath' : payload['target-filepath'],
+                'dryrun'   : dryrun,
+                'verbose'  : verbose,
+            })
 
-            if os.path.isfile(target_filepath):
-                target_local_file_hash = boto_plus.helpers.get_local_file_hash(target_filepath)
-            else:
-                target_local_file_hash = None
+            output_file = payload['target-filepath']
 
-            if source_remote_file_hash != target_local_file_hash:
-                self.download_object(
-                    bucket=source_bucket,
-                    key=source_key,
-                    filepath=target_filepath,
-                    dryrun=dryrun,
-                    verbose=verbose,
-                )
+        return output_file, operation, n_bytes
 
-            output_file = target_filepath
 
-        return output_file
+    def __get_sync_target(
+        self,
+        entry: dict,
+    ) -> str:
+        return entry.get('target-key', entry.get('target-filepath'))
 
 
     def __get_sync_type(
@@ -716,18 +3264,21 @@ class S3Plus:
         bucket: str,
         key: str,
     ) -> bool:
-        try:
-            self.__s3_resource.meta.client.head_object(Bucket=bucket, Key=key)
-            return True
+        return self.__head_object(bucket=bucket, key=key) is not None
 
-        except botocore.exceptions.ClientError as exception:
-            # S3 object not found
-            if exception.response['Error']['Code'] == '404':
-                return False
 
-            else:
-                # Something else has gone wrong -- raise error
-                raise exception
+    def get_object_info(
+        self,
+        bucket: str,
+        key: str,
+    ) -> dict:
+        info = self.__head_object(bucket=bucket, key=key)
+
+        if info is None:
+            raise RuntimeError(f'Provided S3 object "s3://{bucket}/{key}" does not exist.')
+
+        # copies, so callers cannot modify the cached entry
+        return {**info, 'metadata' : dict(info['metadata'])}
 
 
     def get_object_size(
@@ -735,18 +3286,8 @@ class S3Plus:
         bucket: str,
         key: str,
     ) -> int:
-        size_in_bytes = None
-
-        if self.does_object_exist(bucket=bucket, key=key):
-            response = self.__s3_resource.meta.client.head_object(
-                Bucket=bucket,
-                Key=key,
-            )
-
-            size_in_bytes = response['ContentLength']
-
-        else:
-            raise RuntimeError(f'Provided S3 object "s3://{bucket}/{key}" does not exist...')
+        info = self.get_object_info(bucket=bucket, key=key)
+        size_in_bytes = info['size']
 
         return size_in_bytes
 
@@ -756,14 +3297,8 @@ class S3Plus:
         bucket: str,
         key: str,
     ) -> str:
-        creation_datetime = None
-
-        if self.does_object_exist(bucket=bucket, key=key):
-            s3_object = self.__s3_resource.Object(bucket, key)
-            creation_datetime = s3_object.last_modified.strftime('%Y-%m-%d %H:%M:%S')
-
-        else:
-            raise RuntimeError(f'Provided S3 object "s3://{bucket}/{key}" does not exist...')
+        info = self.get_object_info(bucket=bucket, key=key)
+        creation_datetime = info['last_modified'].strftime('%Y-%m-%d %H:%M:%S')
 
         return creation_datetime
 
@@ -790,13 +3325,124 @@ class S3Plus:
         bucket: str,
         key: str,
     ) -> dict:
-        if self.does_object_exist(bucket=bucket, key=key):
-            s3_object = self.__s3_resource.Object(bucket_name=bucket, key=key)
-            return s3_object.metadata
+        info = self.get_object_info(bucket=bucket, key=key)
+        return info['metadata']
 
-        else:
+
+    def get_object_checksum(
+        self,
+        bucket: str,
+        key: str,
+    ) -> typing.Optional[dict]:
+        """
+        Returns the object's native S3 checksum as {'algorithm', 'checksum', 'type'}, where `type` is
+        "FULL_OBJECT" or "COMPOSITE" (a checksum of part checksums) -- or None if S3 stores none.
+        """
+        info = self.__head_object(bucket=bucket, key=key, checksum_mode=True)
+
+        if info is None:
             raise RuntimeError(f'Provided S3 object "s3://{bucket}/{key}" does not exist.')
 
+        return dict(info['checksum']) if info['checksum'] is not None else None
+
+
+    def get_metadata_cache_stats(
+        self,
+    ) -> dict:
+        return self.__metadata_cache.get_stats()
+
+
+    def clear_metadata_cache(
+        self,
+    ):
+        self.__metadata_cache.clear()
+
+
+    def __head_object(
+        self,
+        bucket: str,
+        key: str,
+        checksum_mode=False,
+    ) -> typing.Optional[dict]:
+        """
+        Sends at most one HEAD per key -- responses are kept in the metadata cache. Returns None if the
+        object does not exist. With `checksum_mode`, S3 also returns the native checksum (which needs
+        kms:Decrypt on KMS-encrypted objects), so those responses are cached separately.
+        """
+        cache_key = (bucket, key, 'checksum') if checksum_mode else (bucket, key)
+
+        info = self.__metadata_cache.get(cache_key)
+        if info is not None:
+            return info
+
+        checksum_args = {'ChecksumMode' : 'ENABLED'} if checksum_mode else dict()
+
+        try:
+            response = self.__s3_client.head_object(Bucket=bucket, Key=key, **checksum_args)
+
+        except botocore.exceptions.ClientError as exception:
+            # S3 object not found
+            if exception.response['Error']['Code'] == '404':
+                return None
+
+            else:
+                # Something else has gone wrong -- raise error
+                raise exception
+
+        info = {
+            'size'                : response['ContentLength'],
+            'etag'                : response['ETag'].strip('"'),
+            'last_modified'       : response['LastModified'],
+            'content_type'        : response.get('ContentType'),
+            'cache_control'       : response.get('CacheControl'),
+            'content_disposition' : response.get('ContentDisposition'),
+            'content_encoding'    : response.get('ContentEncoding'),
+            'content_language'    : response.get('ContentLanguage'),
+            'storage_class'       : response.get('StorageClass', 'STANDARD'),
+            'version_id'          : response.get('VersionId'),
+            'metadata'            : response.get('Metadata', dict()),
+        }
+
+        if checksum_mode:
+            info['checksum'] = self.__get_checksum_from_response(response)
+
+        self.__metadata_cache.put(cache_key, info)
+        return info
+
+
+    def __get_checksum_from_response(
+        self,
+        response: dict,
+    ) -> typing.Optional[dict]:
+        for algorithm in self.__checksum_algorithms:
+            checksum = response.get(f'Checksum{algorithm}')
+            if checksum is None:
+                continue
+
+            # multipart uploads may store a checksum of the part checksums, suffixed with "-<number of parts>" --
+            # without an explicit ChecksumType, any multipart object is assumed to have one
+            checksum_type = response.get('ChecksumType')
+            if checksum_type is None:
+                is_multipart = '-' in checksum or '-' in response['ETag']
+                checksum_type = 'COMPOSITE' if is_multipart else 'FULL_OBJECT'
+
+            return {
+                'algorithm' : algorithm,
+                'checksum'  : checksum,
+                'type'      : checksum_type,
+            }
+
+        return None
+
+
+    def __invalidate_metadata(
+        self,
+        bucket: str,
+        key: str,
+    ):
+        self.__metadata_cache.invalidate((bucket, key))
+        self.__metadata_cache.invalidate((bucket, key, 'checksum'))
+
 
     def get_bucket_and_key_from_uri(
         self,
@@ -816,40 +3462,324 @@ class S3Plus:
         return prefix
 
 
-    ### helpers to unpack dictionary-records for multiprocessing ###
+    ### transfer tuning ###
+    def get_transfer_config(
+        self,
+        object_size=None,
+        transfer_config=None,
+        target_parts=None,
+    ) -> boto3.s3.transfer.TransferConfig:
+        """
+        Returns `transfer_config` (or this instance's config). When `object_size` is provided, the
+        part size is raised as far as needed to fit the object in `target_parts` parts -- by
+        default S3's 10,000-part limit.
+        """
+        config = transfer_config if transfer_config is not None else self.__transfer_config
+
+        if object_size is None:
+            return config
+
+        if target_parts is None:
+            target_parts = self.__max_multipart_parts
+
+        part_size = max(
+            config.multipart_chunksize,
+            math.ceil(object_size / target_parts),
+        )
+
+        # whole MiB parts, within S3's 5 MiB - 5 GiB part size limits
+        mib = 1024 ** 2
+        part_size = math.ceil(part_size / mib) * mib
+        part_size = min(max(part_size, 5 * mib), 5 * 1024 ** 3)
+
+        if part_size == config.multipart_chunksize:
+            return config
+
+        adaptive_config = copy.copy(config)
+        adaptive_config.multipart_chunksize = part_size
+
+        return adaptive_config
+
+
+    ### parallel execution ###
+    def get_max_workers(
+        self,
+    ) -> int:
+        return self.__max_workers
+
+
+    def get_rate_limiter(
+        self,
+    ):
+        return self.__rate_limiter
+
+
+    def __map_payloads(
+        self,
+        function,
+        payloads: list[dict],
+        use_multiprocessing=False,
+        use_threading=False,
+        max_workers=None,
+        metrics=None,
+        journal=None,
+        journal_keys=None,
+    ) -> list:
+        """
+        Runs `function` -- one of the unpack helpers, returning (result, operation, bytes) -- on every
+        payload, serially, on a thread pool or on a process pool. Each call is timed in the worker
+        and recorded into `metrics` as it completes. Payloads already in `journal` are not run --
+        their recorded result is used -- and the rest are added to it as they complete (unless
+        dryrun). `journal_keys` defaults to a digest of each payload. Returns the results in
+        payload order.
+        """
+        if use_multiprocessing and use_threading:
+            raise RuntimeError('Only one of "use_multiprocessing", "use_threading" may be set.')
+
+        # process pools default to one process per CPU, thread pools to this instance's workers
+        processes = max_workers
+
+        if max_workers is None:
+            max_workers = self.__max_workers
+
+        # bound methods with name-mangled names cannot be pickled -- workers look them up by name
+        method_name = function.__name__
+        if method_name.startswith('__'):
+            method_name = f'_{type(self).__name__}{method_name}'
+
+        calls = [(index, method_name, payload) for index, payload in enumerate(payloads)]
+        results = [None] * len(calls)
+
+        journal, owns_journal = self.__open_journal(journal)
+
+        try:
+            if journal is not None:
+                if journal_keys is None:
+                    journal_keys = [
+                        journal.get_item_key([method_name, {k : v for k, v in payload.items() if k not in ('dryrun', 'verbose')}])
+                        for payload in payloads
+                    ]
+
+                pending = list()
+                for call, journal_key in zip(calls, journal_keys):
+                    if journal.is_completed(journal_key):
+                        results[call[0]] = journal.get_result(journal_key)
+                    else:
+                        pending.append(call)
+
+                calls = pending
+
+            def record(index, result):
+                if journal is not None and not payloads[index].get('dryrun', False):
+                    journal.record(journal_keys[index], result)
+
+            if use_multiprocessing:
+                # each worker process unpickles this instance (and builds its session and client) once -- tasks only carry the payload
+                with mp.Pool(processes=processes, initializer=_initialize_worker, initargs=(pickle.dumps(self),)) as pool:
+                    # worker processes get fresh copies of the rate limiter -- pace the dispatch of items here as well
+                    tasks = (('_S3Plus__measure_call', call) for call in self.__pace_calls(calls))
+                    measurements = pool.imap_unordered(_call_method, tasks)
+                    self.__collect_measurements(measurements, results, metrics, record)
+
+            elif use_threading:
+                # threads share this instance's client (and its connection pool) -- nothing is pickled
+                self.__reserve_connections(max_workers)
+                with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    measurements = self.__iter_measurements(executor, calls, max_in_flight=2 * max_workers)
+                    self.__collect_measurements(measurements, results, metrics, record)
+
+            else:
+                measurements = (self.__measure_call(call) for call in calls)
+                self.__collect_measurements(measurements, results, metrics, record, stop_on_error=True)
+
+        finally:
+            # whatever completed is on disk before an error propagates
+            if owns_journal:
+                journal.close()
+            elif journal is not None:
+                journal.flush()
+
+        return results
+
+
+    def __iter_measurements(
+        self,
+        executor: concurrent.futures.Executor,
+        calls: list[tuple],
+        max_in_flight: int,
+    ):
+        """ Runs `calls` on `executor` with at most `max_in_flight` submitted at once, yielding measurements as they complete. """
+        in_flight = set()
+
+        for call in calls:
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+            in_flight.add(executor.submit(self.__measure_call, call))
+
+        for future in concurrent.futures.as_completed(in_flight):
+            yield future.result()
+
+
+    def __pace_calls(
+        self,
+        calls: list[tuple],
+    ) -> typing.Iterator[tuple]:
+        for call in calls:
+            _, method_name, payload = call
+
+            if self.__rate_limiter is not None:
+                bucket = payload.get('target_bucket', payload.get('bucket'))
+                key = payload.get('target_key', payload.get('key', ''))
+                is_write = method_name != '_S3Plus__download_object_mp_unpack'
+                self.__rate_limiter.acquire(bucket=bucket, key=key, is_write=is_write)
+
+            yield call
+
+
+    def __measure_call(
+        self,
+        call: tuple,
+    ) -> tuple:
+        index, method_name, payload = call
+
+        start = time.perf_counter()
+        try:
+            result, operation, n_bytes = getattr(self, method_name)(payload)
+            error = None
+
+        except Exception as exception:
+            result, operation, n_bytes, error = None, None, 0, exception
+
+        return index, result, operation, n_bytes, time.perf_counter() - start, error
+
+
+    def __collect_measurements(
+        self,
+        measurements: typing.Iterator[tuple],
+        results: list,
+        metrics=None,
+        on_success=None,
+        stop_on_error=False,
+    ):
+        """ Fills `results` in as measurements arrive, calling `on_success(index, result)` for each success. """
+        errors = list()
+
+        for index, result, operation, n_bytes, latency, error in measurements:
+            if metrics is not None:
+                metrics.record(
+                    operation=operation if operation is not None else 'failed',
+                    n_bytes=n_bytes,
+                    latency=latency,
+                    success=error is None,
+                )
+
+            if error is not None:
+                errors.append(error)
+                if stop_on_error:
+                    break
+
+                # failed items are left out of the journal, so a rerun retries them
+                continue
+
+            results[index] = result
+            if on_success is not None:
+                on_success(index, result)
+
+        if metrics is not None:
+            metrics.report()
+
+        if len(errors) > 0:
+            raise errors[0]
+
+
+    ### helpers to unpack dictionary-records for parallel execution ###
+    # each returns (result, operation, bytes transferred) for __map_payloads to record
     def __download_object_mp_unpack(
         self,
         payload: dict,
-    ):
-        return self.download_object(**payload)
+    ) -> tuple:
+        self.download_object(**payload)
+
+        dryrun = payload.get('dryrun', True)
+        n_bytes = os.path.getsize(payload['filepath']) if not dryrun else 0
+
+        return None, 'download_object', n_bytes
 
 
     def __copy_object_mp_unpack(
         self, 
         payload: dict,
-    ):
-        return self.copy_object(**payload)
+    ) -> tuple:
+        uri, n_bytes = self.__copy_counting_bytes(self.copy_object, payload)
+        return uri, 'copy_object', n_bytes
 
 
     def __move_object_mp_unpack(
         self,
         payload: dict,
-    ):
-        return self.move_object(**payload)
+    ) -> tuple:
+        uri, n_bytes = self.__copy_counting_bytes(self.move_object, payload)
+        return uri, 'move_object', n_bytes
+
+
+    def __copy_counting_bytes(
+        self,
+        function,
+        payload: dict,
+    ) -> tuple:
+        # copies happen server-side -- the progress callback is the only place their size shows up
+        copied = [0]
+        progress_callback = payload.get('progress_callback')
+
+        def count_bytes(n_bytes):
+            copied[0] += n_bytes
+            if progress_callback is not None:
+                progress_callback(n_bytes)
+
+        uri = function(**{**payload, 'progress_callback' : count_bytes})
+
+        return uri, copied[0]
 
 
     def __delete_object_mp_unpack(
         self, 
         payload: dict,
-    ):
-        return self.delete_object(**payload)
+    ) -> tuple:
+        return self.delete_object(**payload), 'delete_object', 0
 
 
     def __upload_object_mp_unpack(
         self,
         payload: dict,
-    ):
-        return self.upload_object(**payload)
+    ) -> tuple:
+        uri = self.upload_object(**payload)
+
+        dryrun = payload.get('dryrun', True)
+        n_bytes = os.path.getsize(payload['filepath']) if not dryrun else 0
+
+        return uri, 'upload_object', n_bytes
+
+
+# the S3Plus instance of a worker process, set once by _initialize_worker
+_worker_instance = None
+
+
+def _initialize_worker(
+    pickled_instance: bytes,
+):
+    # unpickled explicitly, so forked workers rebuild the client rather than inherit the parent's connections
+    global _worker_instance
+    _worker_instance = pickle.loads(pickled_instance)
+
+
+def _call_method(
+    args: tuple,
+):
+    method_name, payload = args
+    return getattr(_worker_instance, method_name)(payload)
 
 
 if __name__ == '__main__':
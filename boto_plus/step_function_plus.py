@@ -1,6 +1,5 @@
 import json
 import uuid
-import boto3
 
 import boto_plus
 
@@ -12,13 +11,17 @@ class StepFunctionPlus:
         boto_config,
         boto_session=None,
     ):
-        if boto_session is not None:
-            self.__sfn_client = boto_session.client('stepfunctions', config=boto_config)
-            sts = boto_session.client('sts', config=boto_config)
-
-        else:
-            self.__sfn_client = boto3.client('stepfunctions', config=boto_config)
-            sts = boto3.client('sts', config=boto_config)
+        client_factory = boto_plus.helpers.get_client_factory()
+        self.__sfn_client = client_factory.get_client(
+            service_name='stepfunctions',
+            boto_config=boto_config,
+            boto_session=boto_session,
+        )
+        sts = client_factory.get_client(
+            service_name='sts',
+            boto_config=boto_config,
+            boto_session=boto_session,
+        )
 
         self.__region_name = boto_config.region_name
         self.__account_id = sts.get_caller_identity()['Account']
@@ -0,0 +1,163 @@
+import os
+import time
+import asyncio
+import threading
+import boto3
+import botocore
+import moto
+import unittest
+import unittest.mock
+import shutil
+
+import boto_plus
+
+
+class TestAsyncS3Plus(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.region = 'us-east-1'
+        self.boto_config = botocore.config.Config(region_name=self.region)
+        self.boto_session = boto3.session.Session()
+
+        self.data_directory = 'data'
+        if os.path.isdir(self.data_directory):
+            shutil.rmtree(self.data_directory)
+        os.makedirs(self.data_directory, exist_ok=False)
+
+        self.mock_aws = moto.mock_aws()
+        self.mock_aws.start()
+
+
+    def tearDown(self):
+        self.mock_aws.stop()
+
+
+    async def test_object_operations(self):
+        # setup
+        dryrun = False
+        verbose = False
+        s3 = boto3.client('s3')
+        mock_bucket = 'test-bucket'
+        s3.create_bucket(Bucket=mock_bucket)
+
+        async with boto_plus.AsyncS3Plus(boto_config=self.boto_config, boto_session=self.boto_session, max_concurrency=8) as s3_plus:
+            # test 1 -- put, head, copy, move and delete
+            await s3_plus.upload_object_from_bytes(contents=b'content', bucket=mock_bucket, key='source.txt', dryrun=dryrun, verbose=verbose)
+            self.assertTrue(await s3_plus.does_object_exist(bucket=mock_bucket, key='source.txt'))
+            self.assertEqual((await s3_plus.get_object_info(bucket=mock_bucket, key='source.txt'))['size'], 7)
+
+            await s3_plus.copy_object(mock_bucket, 'source.txt', mock_bucket, 'copy.txt', dryrun=dryrun, verbose=verbose)
+            await s3_plus.move_object(mock_bucket, 'copy.txt', mock_bucket, 'moved.txt', dryrun=dryrun, verbose=verbose)
+            self.assertFalse(await s3_plus.does_object_exist(bucket=mock_bucket, key='copy.txt'))
+
+            await s3_plus.delete_object(bucket=mock_bucket, key='moved.txt', dryrun=dryrun, verbose=verbose)
+            self.assertFalse(await s3_plus.does_object_exist(bucket=mock_bucket, key='moved.txt'))
+
+            # test 2 -- dryrun changes nothing
+            await s3_plus.delete_object(bucket=mock_bucket, key='source.txt', dryrun=True, verbose=verbose)
+            self.assertTrue(await s3_plus.does_object_exist(bucket=mock_bucket, key='source.txt'))
+
+            # test 3 -- bulk copies run concurrently, and listings are async generators
+            payloads = [
+                {
+                    'source_bucket' : mock_bucket,
+                    'source_key'    : 'source.txt',
+                    'target_bucket' : mock_bucket,
+                    'target_key'    : f'copies/{i}.txt',
+                }
+                for i in range(120)
+            ]
+            await s3_plus.copy_objects(payloads=payloads, dryrun=dryrun, verbose=verbose)
+
+            records = [record async for record in s3_plus.iter_objects(bucket=mock_bucket, prefix='copies/', page_size=50)]
+            self.assertEqual(len(records), 120)
+            self.assertEqual(len(await s3_plus.list_objects(bucket=mock_bucket, prefix='copies/')), 120)
+
+            # test 4 -- download and sync
+            await s3_plus.download_object(bucket=mock_bucket, key='source.txt', filepath='data/source.txt', dryrun=dryrun, verbose=verbose)
+            with open('data/source.txt', 'rb') as in_file:
+                self.assertEqual(in_file.read(), b'content')
+
+            output_files = await s3_plus.sync(source=f's3://{mock_bucket}/copies/', target='data/copies/', dryrun=dryrun, verbose=verbose)
+            self.assertEqual(len(output_files), 120)
+            self.assertEqual(await s3_plus.plan_sync(source=f's3://{mock_bucket}/copies/', target='data/copies/'), list())
+
+            # test 5 -- batched prefix delete
+            result = await s3_plus.delete_objects_at_prefix(bucket=mock_bucket, prefix='copies/', dryrun=dryrun, verbose=verbose)
+            self.assertEqual(len(result['deleted']), 120)
+            self.assertEqual(await s3_plus.list_objects(bucket=mock_bucket, prefix='copies/'), list())
+
+            # test 6 -- ranged reads and lines
+            await s3_plus.upload_object_from_bytes(contents=b'a\nbb\nccc\n', bucket=mock_bucket, key='lines.txt', dryrun=dryrun, verbose=verbose)
+            self.assertEqual(await s3_plus.read_object_range(bucket=mock_bucket, key='lines.txt', start=2, end=4), b'bb')
+            lines = [line async for line in s3_plus.iter_object_lines(bucket=mock_bucket, key='lines.txt', lines_per_call=2)]
+            self.assertEqual(lines, ['a', 'bb', 'ccc'])
+
+
+    async def test_concurrency_limit_and_cancellation(self):
+        s3_plus = boto_plus.AsyncS3Plus(boto_config=self.boto_config, boto_session=self.boto_session, max_concurrency=2)
+
+        # calls are routed through the private runner, so exercise it with a blocking function
+        run = s3_plus._AsyncS3Plus__run
+
+        calls = 0
+        running = 0
+        max_running = 0
+        release = threading.Event()
+        lock = threading.Lock()
+
+        def block():
+            nonlocal calls, running, max_running
+            with lock:
+                calls += 1
+                running += 1
+                max_running = max(max_running, running)
+            release.wait(timeout=5)
+            with lock:
+                running -= 1
+
+        # test 1 -- at most max_concurrency calls run at once
+        tasks = [asyncio.ensure_future(run(block)) for _ in range(6)]
+        await asyncio.sleep(0.2)
+        self.assertEqual(max_running, 2)
+
+        # test 2 -- cancelled calls that are still waiting never run
+        for task in tasks[2:]:
+            task.cancel()
+        release.set()
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        self.assertEqual(sum(isinstance(result, asyncio.CancelledError) for result in results), 4)
+        self.assertEqual(calls, 2)
+
+        # test 3 -- cancelling a line consumer mid-pull closes the generator once the pull is done
+        pulling = threading.Event()
+        closed = threading.Event()
+
+        def slow_lines(**kwargs):
+            try:
+                for i in range(3):
+                    pulling.set()
+                    time.sleep(0.2)
+                    yield f'line {i}'
+
+            finally:
+                closed.set()
+
+        async def consume():
+            return [line async for line in s3_plus.iter_object_lines(bucket='bucket', key='key', lines_per_call=3)]
+
+        with unittest.mock.patch.object(s3_plus.get_s3_plus(), 'iter_object_lines', side_effect=slow_lines):
+            task = asyncio.ensure_future(consume())
+            await asyncio.get_running_loop().run_in_executor(None, pulling.wait, 5)
+            task.cancel()
+
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            self.assertTrue(closed.is_set())
+
+        await s3_plus.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
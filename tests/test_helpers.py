@@ -0,0 +1,340 @@
+import os
+import time
+import pickle
+import hashlib
+import unittest
+import unittest.mock
+import shutil
+import boto3
+import botocore
+
+import boto_plus.helpers as helpers
+
+
+class TestHelpers(unittest.TestCase):
+
+    def setUp(self):
+        self.data_directory = 'data'
+        if os.path.isdir(self.data_directory):
+            shutil.rmtree(self.data_directory)
+        os.makedirs(self.data_directory, exist_ok=False)
+
+
+    def tearDown(self):
+        #shutil.rmtree(self.data_directory)
+        pass
+
+
+    def test_get_local_file_hashes(self):
+        # setup
+        os.makedirs('data/hashing/', exist_ok=False)
+        contents = {f'data/hashing/{i}.bin' : os.urandom(1000 * i + 1) for i in range(50)}
+        for filepath, content in contents.items():
+            with open(filepath, 'wb') as out_file:
+                out_file.write(content)
+
+        # test 1 -- buffered and memory-mapped reads give the same hash
+        for filepath, content in contents.items():
+            self.assertEqual(helpers.get_local_file_hash(filepath, chunk_size=4096), helpers.get_contents_hash(content))
+            self.assertEqual(helpers.get_local_file_hash(filepath, mmap_threshold=0), helpers.get_contents_hash(content))
+
+        # test 2 -- the batch API maps every path to its hash
+        hashes = helpers.get_local_file_hashes(list(contents), max_workers=4)
+        self.assertEqual(hashes, {filepath : helpers.get_contents_hash(content) for filepath, content in contents.items()})
+
+        # test 3 -- missing files raise
+        self.assertRaises(RuntimeError, helpers.get_local_file_hashes, ['data/hashing/missing.bin'])
+
+        shutil.rmtree('data/hashing/')
+
+
+    def test_get_local_file_multipart_hash(self):
+        # setup
+        os.makedirs('data/multipart-hash/', exist_ok=False)
+        filepath = 'data/multipart-hash/file.bin'
+        content = os.urandom(2500)
+        with open(filepath, 'wb') as out_file:
+            out_file.write(content)
+
+        # test 1 -- MD5 of the part MD5s, with the part count
+        part_digests = [hashlib.md5(content[i:i+1000]).digest() for i in range(0, 2500, 1000)]
+        expected = f'{hashlib.md5(b"".join(part_digests)).hexdigest()}-3'
+        self.assertEqual(helpers.get_local_file_multipart_hash(filepath, part_size=1000, max_workers=3), expected)
+
+        # test 2 -- a single part still uses the multipart format
+        expected = f'{hashlib.md5(hashlib.md5(content).digest()).hexdigest()}-1'
+        self.assertEqual(helpers.get_local_file_multipart_hash(filepath, part_size=4096), expected)
+
+        # test 3 -- several part sizes and the MD5 from one read, with parts ending inside read chunks
+        multipart_hashes, file_hash = helpers.get_local_file_multipart_hashes(filepath, part_sizes=[1000, 700, 4096], chunk_size=256)
+        self.assertEqual(multipart_hashes, {part_size : helpers.get_local_file_multipart_hash(filepath, part_size=part_size) for part_size in [1000, 700, 4096]})
+        self.assertEqual(file_hash, hashlib.md5(content).hexdigest())
+
+        helpers.create_textfile(content='', filepath='data/multipart-hash/empty.bin')
+        self.assertEqual(helpers.get_local_file_multipart_hashes('data/multipart-hash/empty.bin', part_sizes=[1000])[0][1000], helpers.get_local_file_multipart_hash('data/multipart-hash/empty.bin', part_size=1000))
+
+        shutil.rmtree('data/multipart-hash/')
+
+
+    def test_get_multipart_part_size_candidates(self):
+        mib = 1024 * 1024
+
+        # test 1 -- the common 8 MiB default comes first, every candidate gives the requested part count
+        candidates = helpers.get_multipart_part_size_candidates(file_size=20 * mib, n_parts=3)
+        self.assertEqual(candidates[0], 8 * mib)
+        self.assertTrue(all(-(-20 * mib // part_size) == 3 for part_size in candidates))
+
+        # test 2 -- preferred part sizes come first, and unusual sizes are found as whole MiB
+        self.assertEqual(helpers.get_multipart_part_size_candidates(file_size=20 * mib, n_parts=3, preferred_part_sizes=[7 * mib])[0], 7 * mib)
+        self.assertIn(6 * mib, helpers.get_multipart_part_size_candidates(file_size=11 * mib, n_parts=2))
+
+        # test 3 -- default part sizes are doubled to stay within 10,000 parts
+        self.assertEqual(helpers.get_multipart_part_size_candidates(file_size=100_000 * mib, n_parts=6250)[0], 16 * mib)
+
+        # test 4 -- a single part fits any part size
+        self.assertEqual(helpers.get_multipart_part_size_candidates(file_size=100, n_parts=1), [100])
+
+
+    def test_local_hash_index(self):
+        # setup
+        filepath = 'data/hash-index/file.txt'
+        index_filepath = 'data/hash-index/index.sqlite'
+        os.makedirs('data/hash-index/', exist_ok=False)
+        helpers.create_textfile(content='first version', filepath=filepath)
+
+        index = helpers.LocalHashIndex(index_filepath)
+
+        # test 1 -- first lookup hashes the file, second lookup is served from the index
+        self.assertEqual(index.get_file_hash(filepath), helpers.get_local_file_hash(filepath))
+        self.assertEqual(index.get_file_hash(filepath), helpers.get_local_file_hash(filepath))
+        self.assertEqual(index.get_stats(), {'entries' : 1, 'hits' : 1, 'misses' : 1})
+
+        # test 2 -- a modified file is rehashed
+        helpers.create_textfile(content='second version', filepath=filepath)
+        stat = os.stat(filepath)
+        os.utime(filepath, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        self.assertEqual(index.get_file_hash(filepath), helpers.get_contents_hash(b'second version'))
+        self.assertEqual(index.get_stats()['misses'], 2)
+
+        # test 3 -- the index persists across instances
+        index.close()
+        index = helpers.LocalHashIndex(index_filepath)
+        self.assertEqual(index.get_file_hash(filepath), helpers.get_contents_hash(b'second version'))
+        self.assertEqual(index.get_stats(), {'entries' : 1, 'hits' : 1, 'misses' : 0})
+
+        # test 4 -- the index can be pickled for worker processes
+        unpickled = pickle.loads(pickle.dumps(index))
+        self.assertEqual(unpickled.get_file_hash(filepath), helpers.get_contents_hash(b'second version'))
+        unpickled.close()
+
+        # test 5 -- prune drops deleted files, rebuild drops everything
+        helpers.create_textfile(content='other', filepath='data/hash-index/other.txt')
+        index.get_file_hash('data/hash-index/other.txt')
+        os.remove('data/hash-index/other.txt')
+        self.assertEqual(index.prune(), 1)
+        self.assertEqual(index.get_stats()['entries'], 1)
+
+        index.rebuild()
+        self.assertEqual(index.get_stats()['entries'], 0)
+        index.close()
+
+        # test 6 -- missing files raise
+        with helpers.LocalHashIndex(index_filepath) as index:
+            self.assertRaises(RuntimeError, index.get_file_hash, 'data/hash-index/missing.txt')
+
+        shutil.rmtree('data/hash-index/')
+
+
+    def test_transfer_metrics(self):
+        summaries = list()
+        metrics = helpers.TransferMetrics(callback=summaries.append, callback_interval=0)
+
+        # test 1 -- totals and per-operation counters
+        for latency in [0.002, 0.02, 0.02, 0.2, 3.0]:
+            metrics.record(operation='upload_object', n_bytes=1024 ** 2, latency=latency)
+        metrics.record(operation='upload_object', latency=0.5, success=False)
+        metrics.record(operation='delete_objects', latency=0.1, n_objects=1000)
+
+        summary = metrics.get_summary()
+        self.assertEqual(summary['objects'], 1005)
+        self.assertEqual(summary['bytes'], 5 * 1024 ** 2)
+        self.assertEqual(summary['failures'], 1)
+        self.assertGreater(summary['rolling_mib_per_second'], 0)
+        self.assertGreater(summary['rolling_ops_per_second'], 0)
+
+        # test 2 -- latency percentiles come from the histogram, capped at the slowest call
+        latency = summary['operations']['upload_object']['latency']
+        self.assertEqual(latency['count'], 6)
+        self.assertEqual(latency['p50'], 0.025)
+        self.assertEqual(latency['p99'], 3.0)
+        self.assertEqual(latency['max'], 3.0)
+        self.assertEqual(sum(count for _, count in summary['operations']['upload_object']['histogram']), 6)
+
+        # test 3 -- the callback receives summaries, and reset starts over
+        self.assertEqual(len(summaries), 7)
+        self.assertIn('MiB/s', helpers.format_transfer_summary(summaries[-1]))
+
+        metrics.reset()
+        self.assertEqual(metrics.get_summary()['objects'], 0)
+
+
+    def test_client_factory(self):
+        factory = helpers.ClientFactory()
+        boto_config = botocore.config.Config(region_name='us-east-1')
+        session = boto3.session.Session(aws_access_key_id='key', aws_secret_access_key='secret')
+
+        # test 1 -- matching session, service, region and config share one client
+        client = factory.get_client(service_name='s3', boto_config=boto_config, boto_session=session)
+        self.assertIs(factory.get_client(service_name='s3', boto_config=botocore.config.Config(region_name='us-east-1'), boto_session=session), client)
+        self.assertEqual(client.meta.config.max_pool_connections, 10)
+
+        # test 2 -- any difference gets its own client
+        self.assertIsNot(factory.get_client(service_name='s3', boto_config=botocore.config.Config(region_name='us-west-2'), boto_session=session), client)
+        self.assertIsNot(factory.get_client(service_name='s3', boto_config=botocore.config.Config(region_name='us-east-1', read_timeout=5), boto_session=session), client)
+        self.assertIsNot(factory.get_client(service_name='sts', boto_config=boto_config, boto_session=session), client)
+
+        # sessions carry their own event handlers -- clients are never shared between them
+        other_session = boto3.session.Session(aws_access_key_id='key', aws_secret_access_key='secret')
+        self.assertIsNot(factory.get_client(service_name='s3', boto_config=boto_config, boto_session=other_session), client)
+        self.assertEqual(factory.get_stats(), {'clients' : 5, 'hits' : 1, 'misses' : 5})
+
+        # credentials are left to the client to refresh -- cache hits never resolve them
+        with unittest.mock.patch.object(session, 'get_credentials', side_effect=AssertionError):
+            self.assertIs(factory.get_client(service_name='s3', boto_config=boto_config, boto_session=session), client)
+
+        # test 3 -- a larger pool rebuilds the client, smaller ones reuse it
+        larger_client = factory.get_client(service_name='s3', boto_config=boto_config, boto_session=session, max_pool_connections=32)
+        self.assertEqual(larger_client.meta.config.max_pool_connections, 32)
+        self.assertIs(factory.get_client(service_name='s3', boto_config=boto_config, boto_session=session, max_pool_connections=16), larger_client)
+
+        # test 4 -- resources are new objects wrapping the shared client
+        resource = factory.get_resource(service_name='s3', boto_config=boto_config, boto_session=session)
+        self.assertIs(resource.meta.client, larger_client)
+        self.assertIs(helpers.get_client_factory(), helpers.get_client_factory())
+
+
+    def test_transfer_journal(self):
+        journal_filepath = 'data/transfer.journal'
+
+        # test 1 -- completed items and their results survive reopening
+        with helpers.TransferJournal(journal_filepath) as journal:
+            keys = [journal.get_item_key({'key' : f'{i}.txt'}) for i in range(3)]
+            self.assertEqual(len(set(keys)), 3)
+            self.assertEqual(keys[0], journal.get_item_key({'key' : '0.txt'}))
+
+            journal.record(keys[0], 's3://bucket/0.txt')
+            journal.record(keys[1])
+
+        with helpers.TransferJournal(journal_filepath) as journal:
+            self.assertTrue(journal.is_completed(keys[0]))
+            self.assertTrue(journal.is_completed(keys[1]))
+            self.assertFalse(journal.is_completed(keys[2]))
+            self.assertEqual(journal.get_result(keys[0]), 's3://bucket/0.txt')
+
+        # test 2 -- a line torn by a crash is dropped, and appending continues after the last intact one
+        with open(journal_filepath, 'ab') as out_file:
+            out_file.write(keys[2][:10].encode('utf-8'))
+
+        with helpers.TransferJournal(journal_filepath) as journal:
+            self.assertFalse(journal.is_completed(keys[2]))
+            journal.record(keys[2], 's3://bucket/2.txt')
+
+        with helpers.TransferJournal(journal_filepath) as journal:
+            self.assertEqual(journal.get_stats()['completed'], 3)
+            self.assertEqual(journal.get_result(keys[2]), 's3://bucket/2.txt')
+
+        # test 3 -- records are buffered until the flush interval passes
+        with helpers.TransferJournal(journal_filepath, flush_interval=60) as journal:
+            journal.record(journal.get_item_key('buffered'))
+            self.assertEqual(journal.get_stats()['pending'], 1)
+            journal.flush()
+            self.assertEqual(journal.get_stats()['pending'], 0)
+
+        # test 4 -- other files are refused
+        helpers.create_textfile(content='not a journal', filepath='data/other.txt')
+        self.assertRaises(RuntimeError, helpers.TransferJournal, 'data/other.txt')
+
+
+    def test_request_rate_limiter(self):
+        limiter = helpers.RequestRateLimiter(
+            read_rate=1000,
+            write_rate=20,
+            burst_seconds=0.1,
+            slowdown_step=15,
+            recovery_step=1000,
+        )
+
+        # test 1 -- keys are paced per bucket, partition prefix and read or write
+        self.assertEqual(limiter.get_partition_prefix('a/b/c.txt'), 'a/')
+        self.assertEqual(limiter.get_partition_prefix('c.txt'), '')
+
+        start = time.monotonic()
+        for i in range(6):
+            limiter.acquire(bucket='bucket', key=f'a/{i}.txt', is_write=True)
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+
+        start = time.monotonic()
+        limiter.acquire(bucket='bucket', key='b/0.txt', is_write=True)
+        limiter.acquire(bucket='bucket', key='a/0.txt', is_write=False)
+        self.assertLess(time.monotonic() - start, 0.05)
+
+        # test 2 -- throttles lower the rate additively, down to the minimum
+        limiter.record_throttle(bucket='bucket', key='a/0.txt', is_write=True)
+        self.assertEqual(limiter.get_rate(bucket='bucket', key='a/0.txt', is_write=True), 10)
+        self.assertEqual(limiter.get_rate(bucket='bucket', key='b/0.txt', is_write=True), 20)
+
+        stats = limiter.get_stats()
+        self.assertEqual(stats[('bucket', 'a/', 'write')]['throttles'], 1)
+        self.assertGreater(stats[('bucket', 'a/', 'write')]['wait_seconds'], 0)
+
+        # test 3 -- the rate recovers once the prefix stops being throttled
+        time.sleep(1.1)
+        self.assertEqual(limiter.get_rate(bucket='bucket', key='a/0.txt', is_write=True), 20)
+
+
+
+    def test_s3_object_reader(self):
+        contents = os.urandom(100 * 1000)
+        ranges = list()
+
+        def read_range(start, end):
+            ranges.append((start, end))
+            return contents[start:end]
+
+        # test 1 -- a random read only fetches the blocks it touches, and repeats hit the cache
+        with helpers.S3ObjectReader(read_range=read_range, size=len(contents), block_size=1000, cache_blocks=8, read_ahead=4) as reader:
+            reader.seek(-10, os.SEEK_END)
+            self.assertEqual(reader.read(), contents[-10:])
+            self.assertEqual(ranges, [(99000, 100000)])
+
+            reader.seek(1500)
+            self.assertEqual(reader.read(1000), contents[1500:2500])
+            reader.seek(-10, os.SEEK_END)
+            self.assertEqual(reader.read(100), contents[-10:])
+            self.assertEqual(len(ranges), 3)
+            self.assertEqual(reader.read(), b'')
+
+            # test 2 -- sequential reads prefetch the following blocks
+            reader.seek(10000)
+            chunks = [reader.read(700) for i in range(40)]
+            self.assertEqual(b''.join(chunks), contents[10000:38000])
+            self.assertGreater(reader.get_stats()['prefetched'], 0)
+            self.assertLessEqual(max(start for start, end in ranges[3:]), 42000)
+
+            # test 3 -- readinto and readline work on top of the blocks
+            buffer = bytearray(5)
+            reader.seek(3)
+            self.assertEqual(reader.readinto(buffer), 5)
+            self.assertEqual(bytes(buffer), contents[3:8])
+
+        self.assertTrue(reader.closed)
+        self.assertRaises(ValueError, reader.read)
+
+        text = b'first line\nsecond line\n' * 100
+        with helpers.S3ObjectReader(read_range=lambda start, end: text[start:end], size=len(text), block_size=64) as reader:
+            self.assertEqual(reader.readline(), b'first line\n')
+            self.assertEqual(len(reader.readlines()), 199)
+
+
+if __name__ == "__main__":
+    unittest.main()
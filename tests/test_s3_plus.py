@@ -1,9 +1,17 @@
+import io
 import os
+import time
 import boto3
 import botocore
 import moto
+import multiprocessing
+import concurrent.futures
 import unittest
+import unittest.mock
 import shutil
+import tarfile
+import threading
+import zipfile
 
 import boto_plus
 import boto_plus.helpers as helpers
@@ -54,6 +62,84 @@ class TestS3Plus(unittest.TestCase):
         self.assertNotIn('path/to/another/file.txt', objects)
 
 
+    @moto.mock_aws
+    def test_iter_objects(self):
+        # setup
+        s3 = boto3.client('s3')
+        mock_bucket = 'test-bucket'
+        s3.create_bucket(Bucket=mock_bucket)
+        for i in range(25):
+            s3.put_object(Bucket=mock_bucket, Key=f'path/{i:02d}.txt', Body='x' * i)
+        s3.put_object(Bucket=mock_bucket, Key='other/file.txt', Body='test-content')
+
+        s3_plus = boto_plus.S3Plus(
+            boto_config=self.boto_config,
+            boto_session=self.boto_session,
+        )
+
+        # test 1 -- records are yielded lazily, across pages
+        iterator = s3_plus.iter_objects(bucket=mock_bucket, prefix='path/', page_size=10)
+        first = next(iterator)
+        self.assertEqual(first.key, 'path/00.txt')
+        records = [first] + list(iterator)
+        self.assertEqual([r.key for r in records], [f'path/{i:02d}.txt' for i in range(25)])
+
+        # test 2 -- listing metadata is kept
+        record = records[5]
+        self.assertIsInstance(record, boto_plus.S3ObjectRecord)
+        self.assertEqual(record.size, 5)
+        self.assertEqual(record.etag, helpers.get_contents_hash(b'xxxxx'))
+        self.assertEqual(record.storage_class, 'STANDARD')
+        self.assertIsNotNone(record.last_modified)
+
+        # test 3 -- filter and start_after
+        records = list(s3_plus.iter_objects(bucket=mock_bucket, prefix='path/', filter='1', start_after='path/10.txt'))
+        self.assertEqual([r.key for r in records], ['path/11.txt', 'path/12.txt', 'path/13.txt', 'path/14.txt', 'path/15.txt', 'path/16.txt', 'path/17.txt', 'path/18.txt', 'path/19.txt', 'path/21.txt'])
+
+
+    @moto.mock_aws
+    def test_list_objects_parallel(self):
+        # setup
+        s3 = boto3.client('s3')
+        mock_bucket = 'test-bucket'
+        s3.create_bucket(Bucket=mock_bucket)
+
+        keys = ['root.txt', 'data/top.txt']
+        for group in ['a', 'b', 'c']:
+            for sub in ['x', 'y']:
+                for i in range(5):
+                    keys.append(f'data/{group}/{sub}/{i}.csv')
+        for key in keys:
+            s3.put_object(Bucket=mock_bucket, Key=key, Body=key)
+
+        s3_plus = boto_plus.S3Plus(
+            boto_config=self.boto_config,
+            boto_session=self.boto_session,
+            max_workers=4,
+        )
+
+        expected = s3_plus.list_objects(bucket=mock_bucket, prefix='')
+
+        # test 1 -- delimiter partitions, merged in sorted order
+        objects = s3_plus.list_objects_parallel(bucket=mock_bucket, prefix='', depth=3, sort=True)
+        self.assertEqual(objects, sorted(keys))
+        self.assertEqual(objects, expected)
+
+        # test 2 -- caller-provided split points
+        objects = s3_plus.list_objects_parallel(
+            bucket=mock_bucket,
+            prefix='data/',
+            split_points=['data/a/y/4.csv', 'data/b/', 'data/c/x/0.csv'],
+            sort=True,
+        )
+        self.assertEqual(objects, sorted(k for k in keys if k.startswith('data/')))
+
+        # test 3 -- filter and metadata records
+        records = s3_plus.list_objects_parallel(bucket=mock_bucket, prefix='data/', filter='/y/', include_metadata=True)
+        self.assertEqual(sorted(r.key for r in records), sorted(k for k in keys if '/y/' in k))
+        self.assertEqual(records[0].size, len(records[0].key))
+
+
     @moto.mock_aws
     def test_upload_object(self):
         # setup
@@ -138,6 +224,313 @@ class TestS3Plus(unittest.TestCase):
         self.assertEqual(s3_object.metadata['x-amz-meta-object-hash'], 'abc123')
 
 
+    @moto.mock_aws
+    def test_copy_objects_with_threading(self):
+        # setup
+        dryrun = False
+        verbose = False
+        s3 = boto3.resource('s3')
+        mock_bucket = 'test-bucket'
+        s3.meta.client.create_bucket(Bucket=mock_bucket)
+
+        payloads = list()
+        for i in range(20):
+            s3.meta.client.put_object(Bucket=mock_bucket, Key=f'source/{i}.txt', Body=f'content-{i}')
+            payloads.append({
+                'source_bucket' : mock_bucket,
+                'source_key'    : f'source/{i}.txt',
+                'target_bucket' : mock_bucket,
+                'target_key'    : f'target/{i}.txt',
+            })
+
+        s3_plus = boto_plus.S3Plus(
+            boto_config=self.boto_config,
+            boto_session=self.boto_session,
+            max_workers=4,
+        )
+
+        uris = s3_plus.copy_objects(
+            payloads=payloads,
+            use_threading=True,
+            dryrun=dryrun,
+            verbose=verbose,
+        )
+
+        # results are returned in payload order
+        self.assertEqual(uris, [f's3://{mock_bucket}/target/{i}.txt' for i in range(20)])
+
+        for i in range(20):
+            s3_object = s3.Object(bucket_name=mock_bucket, key=f'target/{i}.txt')
+            content   = s3_object.get()['Body'].read().decode('utf-8')
+            self.assertEqual(content, f'content-{i}')
+
+        # the caller's payloads are not modified
+        self.assertNotIn('dryrun', payloads[0])
+
+        # more workers than the instance's get a connection pool to match
+        s3_plus.copy_objects(payloads=payloads, use_threading=True, max_workers=16, dryrun=dryrun, verbose=verbose)
+        self.assertEqual(s3_plus._S3Plus__s3_client.meta.config.max_pool_connections, 16)
+
+        # calls growing the pool at the same time never leave it smaller than the larger one needs --
+        # a rate-limited instance builds its own, uncached clients, so the slower call would win
+        s3_plus = boto_plus.S3Plus(
+            boto_config=self.boto_config,
+            boto_session=self.boto_session,
+            rate_limiter=helpers.RequestRateLimiter(),
+        )
+        factory = helpers.get_client_factory()
+        get_client = factory.get_client
+
+        def slow_get_client(*args, **kwargs):
+            if kwargs['max_pool_connections'] == 24:
+                time.sleep(0.2)
+            return get_client(*args, **kwargs)
+
+        with unittest.mock.patch.object(factory, 'get_client', side_effect=slow_get_client):
+            threads = [threading.Thread(target=s3_plus._S3Plus__reserve_connections, args=(24,))]
+            threads[0].start()
+            time.sleep(0.05)
+            threads.append(threading.Thread(target=s3_plus._S3Plus__reserve_connections, args=(32,)))
+            threads[1].start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(s3_plus._S3Plus__s3_client.meta.config.max_pool_connections, 32)
+
+        # choosing both execution modes is an error
+        self.assertRaises(
+            RuntimeError,
+            s3_plus.copy_objects,
+            payloads=payloads,
+            use_threading=True,
+            use_multiprocessing=True,
+        )
+
+
+    @moto.mock_aws
+    def test_copy_object_with_multipart_copy(self):
+        # setup
+        dryrun = False
+        verbose = False
+        s3 = boto3.client('s3')
+        mock_bucket = 'test-bucket'
+        s3.create_bucket(Bucket=mock_bucket)
+
+        mib = 1024 ** 2
+        content = os.urandom(12 * mib)
+        s3.put_object(
+            Bucket=mock_bucket,
+            Key='source.bin',
+            Body=content,
+            ContentType='application/octet-stream',
+            CacheControl='max-age=60',
+            Metadata={'x-amz-meta-object-hash' : helpers.get_contents_hash(content), 'owner' : 'team'},
+        )
+
+        part_copies = list()
+        self.boto_session.events.register(
+            'before-parameter-build.s3.UploadPartCopy',
+            lambda **kwargs: part_copies.append(kwargs['params']),
+        )
+
+        s3_plus = boto_plus.S3Plus(
+            boto_config=self.boto_config,
+            boto_session=self.boto_session,
+        )
+
+        # test 1 -- parts are copied server-side, with progress per part and metadata preserved
+        progress = list()
+        s3_plus.copy_object(
+            source_bucket=mock_bucket,
+            source_key='source.bin',
+            target_bucket=mock_bucket,
+            target_key='copy.bin',
+            use_multipart_copy=True,
+            part_size=5 * mib,
+            max_concurrency=3,
+            progress_callback=progress.append,
+            dryrun=dryrun,
+            verbose=verbose,
+        )
+
+        self.assertEqual(len(part_copies), 3)
+        self.assertEqual(sorted(progress), [2 * mib, 5 * mib, 5 * mib])
+        self.assertEqual(s3.get_object(Bucket=mock_bucket, Key='copy.bin')['Body'].read(), content)
+
+        info = s3_plus.get_object_info(bucket=mock_bucket, key='copy.bin')
+        self.assertTrue(info['etag'].endswith('-3'))
+        self.assertEqual(info['content_type'], 'application/octet-stream')
+        self.assertEqual(info['cache_control'], 'max-age=60')
+        self.assertEqual(info['metadata'], {'x-amz-meta-object-hash' : helpers.get_contents_hash(content), 'owner' : 'team'})
+
+        # test 2 -- identical targets are skipped, even though their ETags differ
+        part_copies.clear()
+        s3_plus.copy_object(mock_bucket, 'source.bin', mock_bucket, 'copy.bin', use_multipart_copy=True, skip_identical=True, dryrun=dryrun, verbose=verbose)
+        self.assertEqual(len(part_copies), 0)
+
+        # test 3 -- moves use the same path and remove the source
+        s3_plus.move_object(mock_bucket, 'copy.bin', mock_bucket, 'moved.bin', use_multipart_copy=True, part_size=8 * mib, dryrun=dryrun, verbose=verbose)
+        self.assertEqual(len(part_copies), 2)
+        self.assertFalse(s3_plus.does_object_exist(bucket=mock_bucket, key='copy.bin'))
+        self.assertEqual(s3.get_object(Bucket=mock_bucket, Key='moved.bin')['Body'].read(), content)
+
+        # test 4 -- empty objects, invalid part sizes and moving an object onto itself
+        s3.put_object(Bucket=mock_bucket, Key='empty.bin', Body=b'')
+        s3_plus.copy_object(mock_bucket, 'empty.bin', mock_bucket, 'empty-copy.bin', use_multipart_copy=True, dryrun=dryrun, verbose=verbose)
+        self.assertEqual(s3_plus.get_object_size(bucket=mock_bucket, key='empty-copy.bin'), 0)
+
+        self.assertRaises(RuntimeError, s3_plus.copy_object, mock_bucket, 'moved.bin', mock_bucket, 'other.bin', use_multipart_copy=True, part_size=mib, dryrun=dryrun, verbose=verbose)
+        self.assertRaises(RuntimeError, s3_plus.move_object, mock_bucket, 'moved.bin', mock_bucket, 'moved.bin', dryrun=dryrun, verbose=verbose)
+
+
+    @moto.mock_aws
+    def test_bulk_operations_with_metrics(self):
+        # setup
+        dryrun = False
+        verbose = False
+        s3 = boto3.client('s3')
+        mock_bucket = 'test-bucket'
+        s3.create_bucket(Bucket=mock_bucket)
+        for i in range(20):
+            s3.put_object(Bucket=mock_bucket, Key=f'source/{i}.txt', Body=b'x' * 1000)
+
+        s3_plus = boto_plus.S3Plus(
+            boto_config=self.boto_config,
+            boto_session=self.boto_session,
+        )
+
+        payloads = [
+            {
+                'source_bucket' : mock_bucket,
+                'source_key'    : f'source/{i}.txt',
+                'target_bucket' : mock_bucket,
+                'target_key'    : f'target/{i}.txt',
+            }
+            for i in range(20)
+        ]
+
+        # test 1 -- copies on threads and processes record objects, bytes and latencies
+        summaries = list()
+        metrics = helpers.TransferMetrics(callback=summaries.append)
+        uris = s3_plus.copy_objects(payloads=payloads[:15], use_threading=True, metrics=metrics, dryrun=dryrun, verbose=verbose)
+        with unittest.mock.patch.object(boto_plus.S3Plus, '__getstate__', autospec=True, side_effect=boto_plus.S3Plus.__getstate__) as getstate:
+            s3_plus.copy_objects(payloads=payloads[15:], use_multiprocessing=True, max_workers=2, metrics=metrics, dryrun=dryrun, verbose=verbose)
+
+        # the instance is pickled once for the pool, not once per payload
+        self.assertEqual(getstate.call_count, 1)
+
+        self.assertEqual(uris, [f's3://{mock_bucket}/target/{i}.txt' for i in range(15)])
+        summary = metrics.get_summary()
+        self.assertEqual(summary['objects'], 20)
+        self.assertEqual(summary['bytes'], 20 * 1000)
+        self.assertEqual(summary['operations']['copy_object']['latency']['count'], 20)
+        self.assertEqual(summaries[-1]['objects'], 20)
+
+        # thread pools are handed at most two items per worker at a time
+        submitted = list()
+        completed = list()
+        measure_call = s3_plus._S3Plus__measure_call
+        submit = concurrent.futures.ThreadPoolExecutor.submit
+
+        def slow_measure_call(call):
+            time.sleep(0.01)
+            measurement = measure_call(call)
+            completed.append(call)
+            return measurement
+
+        def counting_submit(executor, fn, *args, **kwargs):
+            if fn is slow_measure_call:
+                submitted.append(len(submitted) - len(completed))
+            return submit(executor, fn, *args, **kwargs)
+
+        with unittest.mock.patch.object(s3_plus, '_S3Plus__measure_call', slow_measure_call), \
+                unittest.mock.patch.object(concurrent.futures.ThreadPoolExecutor, 'submit', autospec=True, side_effect=counting_submit):
+            uris = s3_plus.copy_objects(payloads=payloads, use_threading=True, max_workers=2, dryrun=dryrun, verbose=verbose)
+
+        self.assertEqual(len(uris), 20)
+        self.assertEqual(len(submitted), 20)
+        self.assertLessEqual(max(submitted), 4)
+
+        # process pools keep one process per CPU unless max_workers is given
+        with unittest.mock.patch('multiprocessing.Pool', wraps=multiprocessing.Pool) as pool:
+            s3_plus.copy_objects(payloads=payloads[:2], use_multiprocessing=True, dryrun=dryrun, verbose=verbose)
+        self.assertIsNone(pool.call_args.kwargs['processes'])
+
+        # test 2 -- failures are counted, and the error is still raised
+        bad_payloads = payloads[:2] + [{**payloads[0], 'source_key' : 'source/missing.txt'}]
+        self.assertRaises(botocore.exceptions.ClientError, s3_plus.copy_objects, payloads=bad_payloads, use_threading=True, metrics=metrics, dryrun=dryrun, verbose=verbose)
+        self.assertEqual(metrics.get_summary()['failures'], 1)
+        self.assertEqual(metrics.get_summary()['objects'], 22)
+
+        # test 3 -- batched deletes record one latency per batch and one object per key
+        metrics.reset()
+        s3_plus.delete_objects_at_prefix(bucket=mock_bucket, prefix='source/', use_batch_delete=True, metrics=metrics, dryrun=dryrun, verbose=verbose)
+        summary = metrics.get_summary()
+        self.assertEqual(summary['operations']['delete_objects']['objects'], 20)
+        self.assertEqual(summary['operations']['delete_objects']['latency']['count'], 1)
+
+        # test 4 -- uploads and downloads count the bytes on disk
+        metrics.reset()
+        helpers.create_textfile(content='y' * 500, filepath='data/upload.txt')
+        s3_plus.upload_objects(payloads=[{'filepath' : 'data/upload.txt', 'bucket' : mock_bucket, 'key' : 'upload.txt'}], metrics=metrics, dryrun=dryrun, verbose=verbose)
+        s3_plus.download_objects(payloads=[{'bucket' : mock_bucket, 'key' : 'upload.txt', 'filepath' : 'data/download.txt'}], metrics=metrics, dryrun=dryrun, verbose=verbose)
+        summary = metrics.get_summary()
+        self.assertEqual(summary['operations']['upload_object']['bytes'], 500)
+        self.assertEqual(summary['operations']['download_object']['bytes'], 500)
+
+
+    @moto.mock_aws
+    def test_copy_objects_with_rate_limiter(self):
+        # setup
+        dryrun = False
+        verbose = False
+        s3 = boto3.client('s3')
+        mock_bucket = 'test-bucket'
+        s3.create_bucket(Bucket=mock_bucket)
+        s3.put_object(Bucket=mock_bucket, Key='source.txt', Body=b'content')
+
+        rate_limiter = helpers.RequestRateLimiter(write_rate=50, burst_seconds=0.1, slowdown_step=10, recovery_step=0)
+        s3_plus = boto_plus.S3Plus(
+            boto_config=self.boto_config,
+            boto_session=self.boto_session,
+            rate_limiter=rate_limiter,
+        )
+
+        # the first two copies are answered with SlowDown, which botocore retries
+        slowdowns = [2]
+        def slow_down(**kwargs):
+            if slowdowns[0] > 0:
+                slowdowns[0] -= 1
+                raw = unittest.mock.Mock()
+                raw.stream.return_value = [b'<Error><Code>SlowDown</Code><Message>Please reduce your request rate.</Message></Error>']
+                return botocore.awsrequest.AWSResponse(url='', status_code=503, headers={}, raw=raw)
+        s3_plus._S3Plus__s3_client.meta.events.register_first('before-send.s3.CopyObject', slow_down)
+
+        payloads = [
+            {
+                'source_bucket' : mock_bucket,
+                'source_key'    : 'source.txt',
+                'target_bucket' : mock_bucket,
+                'target_key'    : f'target/{i}.txt',
+            }
+            for i in range(20)
+        ]
+
+        # test 1 -- every copy succeeds, and each throttle slowed the target prefix down
+        start = time.monotonic()
+        uris = s3_plus.copy_objects(payloads=payloads, use_threading=True, dryrun=dryrun, verbose=verbose)
+        self.assertEqual(len(uris), 20)
+        self.assertEqual(rate_limiter.get_rate(bucket=mock_bucket, key='target/0.txt', is_write=True), 30)
+        self.assertEqual(rate_limiter.get_stats()[(mock_bucket, 'target/', 'write')]['throttles'], 2)
+
+        # test 2 -- the requests were paced -- 22 writes at no more than 50 per second
+        self.assertGreater(time.monotonic() - start, 0.3)
+
+        # test 3 -- reads are paced separately, and the limiter survives pickling for worker processes
+        self.assertEqual(rate_limiter.get_rate(bucket=mock_bucket, key='target/0.txt', is_write=False), 5500)
+        s3_plus.delete_objects_at_prefix(bucket=mock_bucket, prefix='target/', use_multiprocessing=True, max_workers=2, dryrun=dryrun, verbose=verbose)
+
+
     @moto.mock_aws
     def test_move_object(self):
         # setup
@@ -211,6 +604,137 @@ class TestS3Plus(unittest.TestCase):
         )
 
 
+    @moto.mock_aws
+    def test_delete_objects_at_prefix_with_batch_delete(self):
+        # setup
+        dryrun = False
+        verbose = False
+        s3 = boto3.resource('s3')
+        mock_bucket = 'test-bucket'
+        s3.meta.client.create_bucket(Bucket=mock_bucket)
+
+        n_objects = 1100
+        for i in range(n_objects):
+            s3.meta.client.put_object(Bucket=mock_bucket, Key=f'to-delete/{i}.txt', Body='x')
+        s3.meta.client.put_object(Bucket=mock_bucket, Key='to-keep/file.txt', Body='x')
+
+        delete_calls = list()
+        first_delete = threading.Event()
+        watch_listing = threading.Event()
+        deleting_while_listing = list()
+
+        def on_delete(params, **kwargs):
+            delete_calls.append(len(params['Delete']['Objects']))
+            first_delete.set()
+
+        def on_list(params, **kwargs):
+            # the second page is only requested once the first batch is being deleted
+            if watch_listing.is_set() and params.get('ContinuationToken') is not None:
+                deleting_while_listing.append(first_delete.wait(timeout=5))
+
+        self.boto_session.events.register('before-parameter-build.s3.DeleteObjects', on_delete)
+        self.boto_session.events.register('before-parameter-build.s3.ListObjectsV2', on_list)
+
+        s3_plus = boto_plus.S3Plus(
+            boto_config=self.boto_config,
+            boto_session=self.boto_session,
+        )
+
+        # test 1 -- dryrun reports every key without deleting anything
+        result = s3_plus.delete_objects_at_prefix(
+            bucket=mock_bucket,
+            prefix='to-delete/',
+            use_batch_delete=True,
+            dryrun=True,
+            verbose=verbose,
+        )
+        self.assertEqual(len(result['deleted']), n_objects)
+        self.assertEqual(len(delete_calls), 0)
+
+        # test 2 -- keys are deleted with one request per 1000 keys, starting before the listing is done
+        watch_listing.set()
+        result = s3_plus.delete_objects_at_prefix(
+            bucket=mock_bucket,
+            prefix='to-delete/',
+            use_batch_delete=True,
+            dryrun=dryrun,
+            verbose=verbose,
+        )
+        self.assertEqual(sorted(delete_calls), [100, 1000])
+        self.assertEqual(deleting_while_listing, [True])
+        self.assertEqual(len(result['deleted']), n_objects)
+        self.assertEqual(result['failed'], [])
+        self.assertIn(f's3://{mock_bucket}/to-delete/0.txt', result['deleted'])
+
+        self.assertEqual(s3_plus.list_objects(bucket=mock_bucket, prefix='to-delete/'), [])
+        self.assertEqual(s3_plus.list_objects(bucket=mock_bucket, prefix='to-keep/'), ['to-keep/file.txt'])
+
+        # test 3 -- payload-based deletion groups keys into batches as well
+        s3.meta.client.put_object(Bucket=mock_bucket, Key='a.txt', Body='x')
+        s3.meta.client.put_object(Bucket=mock_bucket, Key='b.txt', Body='x')
+        result = s3_plus.delete_objects(
+            payloads=[
+                {'bucket' : mock_bucket, 'key' : 'a.txt'},
+                {'bucket' : mock_bucket, 'key' : 'b.txt'},
+            ],
+            use_batch_delete=True,
+            dryrun=dryrun,
+            verbose=verbose,
+        )
+        self.assertEqual(sorted(result['deleted']), [f's3://{mock_bucket}/a.txt', f's3://{mock_bucket}/b.txt'])
+        self.assertEqual(len(delete_calls), 3)
+
+
+    @moto.mock_aws
+    def test_delete_all_versions(self):
+        # setup
+        dryrun = False
+        verbose = False
+        s3 = boto3.client('s3')
+        mock_bucket = 'test-bucket'
+        s3.create_bucket(Bucket=mock_bucket)
+        s3.put_bucket_versioning(Bucket=mock_bucket, VersioningConfiguration={'Status' : 'Enabled'})
+
+        for i in range(3):
+            s3.put_object(Bucket=mock_bucket, Key='path/file.txt', Body=f'version-{i}')
+        s3.delete_object(Bucket=mock_bucket, Key='path/file.txt')
+
+        for i in range(2):
+            s3.put_object(Bucket=mock_bucket, Key='path/file.txt.bak', Body=f'version-{i}')
+            s3.put_object(Bucket=mock_bucket, Key='path/other.txt', Body=f'version-{i}')
+        s3.put_object(Bucket=mock_bucket, Key='elsewhere.txt', Body='content')
+
+        s3_plus = boto_plus.S3Plus(
+            boto_config=self.boto_config,
+            boto_session=self.boto_session,
+        )
+
+        # test 1 -- versions and delete markers are streamed page by page, in key order
+        records = list(s3_plus.iter_object_versions(bucket=mock_bucket, prefix='path/', page_size=2))
+        self.assertEqual(len(records), 8)
+        self.assertEqual(sum(record.is_delete_marker for record in records), 1)
+        self.assertEqual([record.key for record in records], sorted(record.key for record in records))
+        self.assertEqual(len(s3_plus.list_all_versions_of_object(bucket=mock_bucket, key='path/file.txt')), 4)
+
+        # test 2 -- dryrun only counts
+        result = s3_plus.delete_all_versions_of_object(bucket=mock_bucket, key='path/file.txt', dryrun=True, verbose=verbose)
+        self.assertEqual(result, {'deleted' : {'path/file.txt' : 4}, 'failed' : list()})
+        self.assertEqual(len(s3_plus.list_all_versions_of_object(bucket=mock_bucket, key='path/file.txt')), 4)
+
+        # test 3 -- a single key, leaving keys that merely share its prefix alone
+        result = s3_plus.delete_all_versions_of_object(bucket=mock_bucket, key='path/file.txt', dryrun=dryrun, verbose=verbose)
+        self.assertEqual(result, {'deleted' : {'path/file.txt' : 4}, 'failed' : list()})
+        self.assertEqual(s3_plus.list_all_versions_of_object(bucket=mock_bucket, key='path/file.txt'), list())
+        self.assertEqual(len(s3_plus.list_all_versions_of_object(bucket=mock_bucket, key='path/file.txt.bak')), 2)
+
+        # test 4 -- a whole prefix, in several concurrent batches
+        s3_plus._S3Plus__delete_batch_size = 3
+        result = s3_plus.delete_all_versions_of_all_objects_at_prefix(bucket=mock_bucket, prefix='path/', max_workers=2, dryrun=dryrun, verbose=verbose)
+        self.assertEqual(result, {'deleted' : {'path/file.txt.bak' : 2, 'path/other.txt' : 2}, 'failed' : list()})
+        self.assertEqual(list(s3_plus.iter_object_versions(bucket=mock_bucket, prefix='path/')), list())
+        self.assertEqual(len(list(s3_plus.iter_object_versions(bucket=mock_bucket, prefix=''))), 1)
+
+
     @moto.mock_aws
     def test_sync_s3_to_s3(self):
         ### test 1 -- s3-to-s3 sync ###
@@ -358,5 +882,967 @@ class TestS3Plus(unittest.TestCase):
         shutil.rmtree('data/local-to-s3/')
 
 
+    @moto.mock_aws
+    def test_resume_with_journal(self):
+        # setup
+        dryrun = False
+        verbose = False
+        s3 = boto3.client('s3')
+        mock_bucket = 'test-bucket'
+        s3.create_bucket(Bucket=mock_bucket)
+        for i in range(5):
+            s3.put_object(Bucket=mock_bucket, Key=f'source/{i}.txt', Body=f'content {i}'.encode('utf-8'))
+
+        requests = list()
+        for operation in ['CopyObject', 'PutObject', 'HeadObject']:
+            self.boto_session.events.register(f'before-parameter-build.s3.{operation}', lambda model, **kwargs: requests.append(model.name))
+
+        s3_plus = boto_plus.S3Plus(
+            boto_config=self.boto_config,
+            boto_session=self.boto_session,
+        )
+
+        payloads = [
+            {
+                'source_bucket' : mock_bucket,
+                'source_key'    : f'source/{i}.txt',
+                'target_bucket' : mock_bucket,
+                'target_key'    : f'target/{i}.txt',
+            }
+            for i in range(5)
+        ]
+
+        # test 1 -- a run that dies partway leaves its completed copies in the journal
+        journal_filepath = 'data/copy.journal'
+        failing_payloads = payloads[:3] + [{**payloads[3], 'source_key' : 'source/missing.txt'}] + payloads[4:]
+        self.assertRaises(botocore.exceptions.ClientError, s3_plus.copy_objects, payloads=failing_payloads, journal=journal_filepath, dryrun=dryrun, verbose=verbose)
+
+        # test 2 -- the restarted run only copies what is left, and still returns every uri
+        requests.clear()
+        uris = s3_plus.copy_objects(payloads=payloads, journal=journal_filepath, dryrun=dryrun, verbose=verbose)
+        self.assertEqual(uris, [f's3://{mock_bucket}/target/{i}.txt' for i in range(5)])
+        self.assertEqual(requests.count('CopyObject'), 2)
+
+        # test 3 -- a finished sync is not compared or transferred again, but a changed file is
+        os.makedirs('data/sync-inputs/', exist_ok=False)
+        for i in range(3):
+            helpers.create_textfile(content=f'file {i}', filepath=f'data/sync-inputs/{i}.txt')
+
+        with helpers.TransferJournal('data/sync-inputs/.sync.journal') as journal:
+            s3_plus.sync(source='data/sync-inputs/', target=f's3://{mock_bucket}/sync/', journal=journal, dryrun=dryrun, verbose=verbose)
+
+        with helpers.TransferJournal('data/sync-inputs/.sync.journal') as journal:
+            requests.clear()
+            with unittest.mock.patch.object(helpers, 'get_local_file_hashes', wraps=helpers.get_local_file_hashes) as get_local_file_hashes:
+                output_files = s3_plus.sync(source='data/sync-inputs/', target=f's3://{mock_bucket}/sync/', journal=journal, dryrun=dryrun, verbose=verbose)
+
+            self.assertTrue(all(len(call.args[0]) == 0 for call in get_local_file_hashes.call_args_list))
+            self.assertEqual(requests, list())
+            self.assertEqual(len(output_files), 3)
+            self.assertEqual(journal.get_stats()['completed'], 3)
+
+            helpers.create_textfile(content='file 1 -- edited', filepath='data/sync-inputs/1.txt')
+            os.utime('data/sync-inputs/1.txt', ns=(0, 10 ** 18))
+            s3_plus.sync(source='data/sync-inputs/', target=f's3://{mock_bucket}/sync/', journal=journal, dryrun=dryrun, verbose=verbose)
+            self.assertEqual(requests.count('PutObject'), 1)
+
+        # the journal itself is never synced
+        self.assertEqual(len(s3_plus.list_objects(bucket=mock_bucket, prefix='sync/')), 3)
+
+        # test 4 -- with threads and processes, a failed item is left out of the journal and retried by the rerun
+        failing_payloads = payloads[:3] + [{**payloads[3], 'source_key' : 'source/late.txt'}] + payloads[4:]
+        for mode in ['use_threading', 'use_multiprocessing']:
+            journal_filepath = f'data/{mode}.journal'
+            self.assertRaises(botocore.exceptions.ClientError, s3_plus.copy_objects, payloads=failing_payloads, journal=journal_filepath, dryrun=dryrun, verbose=verbose, **{mode : True})
+
+            with helpers.TransferJournal(journal_filepath) as journal:
+                self.assertEqual(journal.get_stats()['completed'], 4)
+
+        s3.put_object(Bucket=mock_bucket, Key='source/late.txt', Body=b'late content')
+        requests.clear()
+        uris = s3_plus.copy_objects(payloads=failing_payloads, journal='data/use_threading.journal', use_threading=True, dryrun=dryrun, verbose=verbose)
+        self.assertEqual(uris[3], f's3://{mock_bucket}/target/3.txt')
+        self.assertEqual(requests.count('CopyObject'), 1)
+        self.assertEqual(s3.get_object(Bucket=mock_bucket, Key='target/3.txt')['Body'].read(), b'late content')
+
+
+    @moto.mock_aws
+    def test_pack_objects(self):
+        # setup
+        dryrun = False
+        verbose = False
+        s3 = boto3.client('s3')
+        mock_bucket = 'test-bucket'
+        s3.create_bucket(Bucket=mock_bucket)
+
+        requests = list()
+        for operation in ['PutObject', 'UploadPart', 'GetObject', 'CopyObject', 'UploadPartCopy']:
+            self.boto_session.events.register(f'before-parameter-build.s3.{operation}', lambda model, **kwargs: requests.append(model.name))
+
+        s3_plus = boto_plus.S3Plus(
+            boto_config=self.boto_config,
+            boto_session=self.boto_session,
+        )
+
+        os.makedirs('data/samples/nested/', exist_ok=False)
+        contents = dict()
+        for i in range(40):
+            name = f'nested/{i}.txt' if i % 2 == 0 else f'{i}.txt'
+            contents[name] = f'sample {i} '.encode('utf-8') * (i + 1)
+            with open(f'data/samples/{name}', 'wb') as out_file:
+                out_file.write(contents[name])
+
+        # test 1 -- dryrun writes nothing
+        payloads = [{'filepath' : f'data/samples/{name}', 'bucket' : mock_bucket, 'key' : name} for name in contents]
+        s3_plus.upload_objects(payloads=payloads, pack_to=f's3://{mock_bucket}/packed/', shard_size=16384, dryrun=True, verbose=verbose)
+        self.assertEqual(s3_plus.list_objects(bucket=mock_bucket, prefix='packed/'), list())
+
+        # test 2 -- forty files become a few shards and an index
+        uris = s3_plus.upload_objects(payloads=payloads, pack_to=f's3://{mock_bucket}/packed/', shard_size=16384, dryrun=dryrun, verbose=verbose)
+        self.assertLess(len(uris), 10)
+        self.assertEqual(requests.count('PutObject'), len(uris))
+        self.assertEqual(s3_plus.list_packed_objects(bucket=mock_bucket, prefix='packed/'), sorted(contents))
+
+        # shards are plain tar files
+        shard_key = s3_plus.get_bucket_and_key_from_uri(uris[0])[1]
+        shard = io.BytesIO(s3.get_object(Bucket=mock_bucket, Key=shard_key)['Body'].read())
+        with tarfile.open(fileobj=shard) as tar:
+            member = tar.getmembers()[0]
+            self.assertEqual(tar.extractfile(member).read(), contents[member.name])
+
+        # test 3 -- single members are read with one ranged GET each
+        index = s3_plus.get_packed_index(bucket=mock_bucket, prefix='packed/')
+        requests.clear()
+        for name in ['nested/0.txt', '39.txt']:
+            self.assertEqual(s3_plus.read_packed_object(bucket=mock_bucket, prefix='packed/', name=name, index=index), contents[name])
+        self.assertEqual(requests, ['GetObject', 'GetObject'])
+        self.assertRaises(RuntimeError, s3_plus.read_packed_object, bucket=mock_bucket, prefix='packed/', name='missing.txt', index=index)
+
+        # test 4 -- unpacking reads each shard once
+        requests.clear()
+        filepaths = s3_plus.download_packed_objects(bucket=mock_bucket, prefix='packed/', target_directory='data/unpacked/', dryrun=dryrun, verbose=verbose)
+        self.assertEqual(len(filepaths), 40)
+        self.assertEqual(len(requests), 1 + len(index['shards']))
+        for name, content in contents.items():
+            with open(os.path.join('data/unpacked/', name), 'rb') as in_file:
+                self.assertEqual(in_file.read(), content)
+
+        # test 5 -- packed syncs only pack and extract what changed
+        s3_plus.sync(source='data/samples/', target=f's3://{mock_bucket}/synced/', pack=True, shard_size=16384, dryrun=dryrun, verbose=verbose)
+        with open('data/samples/nested/0.txt', 'wb') as out_file:
+            out_file.write(b'edited')
+
+        requests.clear()
+        names = s3_plus.sync(source='data/samples/', target=f's3://{mock_bucket}/synced/', pack=True, dryrun=dryrun, verbose=verbose)
+        self.assertEqual(names, sorted(contents))
+        self.assertEqual(requests.count('PutObject'), 2)
+        self.assertEqual(s3_plus.read_packed_object(bucket=mock_bucket, prefix='synced/', name='nested/0.txt'), b'edited')
+
+        shutil.copyfile('data/samples/nested/0.txt', 'data/unpacked/nested/0.txt')
+        with open('data/unpacked/1.txt', 'wb') as out_file:
+            out_file.write(b'stale')
+
+        requests.clear()
+        filepaths = s3_plus.sync(source=f's3://{mock_bucket}/synced/', target='data/unpacked/', pack=True, dryrun=dryrun, verbose=verbose)
+        self.assertEqual(len(filepaths), 40)
+        self.assertEqual(requests, ['GetObject', 'GetObject'])
+        with open('data/unpacked/1.txt', 'rb') as in_file:
+            self.assertEqual(in_file.read(), contents['1.txt'])
+
+        # test 6 -- long names take PAX headers, and no shard grows past the shard size
+        os.makedirs('data/long-names/', exist_ok=False)
+        long_payloads = list()
+        for i in range(20):
+            filepath = f'data/long-names/{i}.txt'
+            with open(filepath, 'wb') as out_file:
+                out_file.write(b'x' * 100)
+            long_payloads.append({'filepath' : filepath, 'name' : f'{"long-directory-name/" * 10}{i}.txt'})
+
+        uris = s3_plus.pack_objects(payloads=long_payloads, target=f's3://{mock_bucket}/long-names/', shard_size=16384, dryrun=dryrun, verbose=verbose)
+        for uri in uris[:-1]:
+            shard_key = s3_plus.get_bucket_and_key_from_uri(uri)[1]
+            self.assertLessEqual(s3.head_object(Bucket=mock_bucket, Key=shard_key)['ContentLength'], 16384)
+
+        # test 7 -- multipart shards are not copied onto themselves to write a hash
+        large_content = os.urandom(9 * 1024 ** 2)
+        with open('data/long-names/large.bin', 'wb') as out_file:
+            out_file.write(large_content)
+
+        requests.clear()
+        uris = s3_plus.pack_objects(payloads=[{'filepath' : 'data/long-names/large.bin', 'name' : 'large.bin'}], target=f's3://{mock_bucket}/large/', dryrun=dryrun, verbose=verbose)
+        self.assertGreater(requests.count('UploadPart'), 1)
+        self.assertEqual(requests.count('CopyObject') + requests.count('UploadPartCopy'), 0)
+        self.assertEqual(s3_plus.read_packed_object(bucket=mock_bucket, prefix='large/', name='large.bin'), large_content)
+
+
+    @moto.mock_aws
+    def test_plan_sync(self):
+        # setup
+        dryrun = False
+        verbose = False
+        s3 = boto3.resource('s3')
+        mock_bucket = 'test-bucket'
+        s3.meta.client.create_bucket(Bucket=mock_bucket)
+
+        head_calls = list()
+        self.boto_session.events.register(
+            'before-call.s3.HeadObject',
+            lambda **kwargs: head_calls.append(kwargs),
+        )
+
+        s3_plus = boto_plus.S3Plus(
+            boto_config=self.boto_config,
+            boto_session=self.boto_session,
+        )
+
+        os.makedirs('data/plan-sync/local-inputs/nested/', exist_ok=False)
+        helpers.create_textfile(content='first file', filepath='data/plan-sync/local-inputs/first.txt')
+        helpers.create_textfile(content='second file', filepath='data/plan-sync/local-inputs/nested/second.txt')
+
+        source = 'data/plan-sync/local-inputs/'
+        target = f's3://{mock_bucket}/plan-sync/outputs/'
+
+        # test 1 -- everything is planned when the target is empty
+        plan = s3_plus.plan_sync(source=source, target=target)
+        self.assertEqual(sorted(p['target-key'] for p in plan), ['plan-sync/outputs/first.txt', 'plan-sync/outputs/nested/second.txt'])
+        self.assertTrue(all(p['sync-type'] == 'local-to-s3' for p in plan))
+
+        s3_plus.sync(source=source, target=target, dryrun=dryrun, verbose=verbose)
+
+        # test 2 -- nothing is planned once synced, and no per-key HEAD requests are made
+        head_calls.clear()
+        self.assertEqual(s3_plus.plan_sync(source=source, target=target), [])
+        self.assertEqual(s3_plus.plan_sync(source=target, target=f's3://{mock_bucket}/plan-sync/copy/'), [
+            {
+                'sync-type'     : 's3-to-s3',
+                'source-bucket' : mock_bucket,
+                'source-key'    : 'plan-sync/outputs/first.txt',
+                'target-bucket' : mock_bucket,
+                'target-key'    : 'plan-sync/copy/first.txt',
+            },
+            {
+                'sync-type'     : 's3-to-s3',
+                'source-bucket' : mock_bucket,
+                'source-key'    : 'plan-sync/outputs/nested/second.txt',
+                'target-bucket' : mock_bucket,
+                'target-key'    : 'plan-sync/copy/nested/second.txt',
+            },
+        ])
+        self.assertEqual(head_calls, [])
+
+        # test 3 -- only the changed file is planned
+        helpers.create_textfile(content='second file, changed', filepath='data/plan-sync/local-inputs/nested/second.txt')
+        plan = s3_plus.plan_sync(source=source, target=target)
+        self.assertEqual([p['target-key'] for p in plan], ['plan-sync/outputs/nested/second.txt'])
+
+        shutil.rmtree('data/plan-sync/')
+
+
+    @moto.mock_aws
+    def test_sync_local_to_s3_with_hash_index(self):
+        # setup
+        dryrun = False
+        verbose = False
+        s3 = boto3.resource('s3')
+        mock_bucket = 'test-bucket'
+        s3.meta.client.create_bucket(Bucket=mock_bucket)
+
+        s3_plus = boto_plus.S3Plus(
+            boto_config=self.boto_config,
+            boto_session=self.boto_session,
+        )
+
+        os.makedirs('data/hash-index-sync/local-inputs/', exist_ok=False)
+        helpers.create_textfile(content='indexed file', filepath='data/hash-index-sync/local-inputs/file.txt')
+
+        source = 'data/hash-index-sync/local-inputs/'
+        target = f's3://{mock_bucket}/hash-index-sync/outputs/'
+
+        uris = s3_plus.sync(source=source, target=target, hash_index=True, dryrun=dryrun, verbose=verbose)
+
+        # test 1 -- the index lives in the source directory but is not synced
+        self.assertTrue(os.path.isfile('data/hash-index-sync/local-inputs/.boto-plus-hash-index.sqlite'))
+        self.assertEqual(uris, [f's3://{mock_bucket}/hash-index-sync/outputs/file.txt'])
+        self.assertEqual(s3_plus.list_objects(bucket=mock_bucket, prefix='hash-index-sync/'), ['hash-index-sync/outputs/file.txt'])
+
+        # test 2 -- a later run is served from the index
+        with helpers.LocalHashIndex('data/hash-index-sync/local-inputs/.boto-plus-hash-index.sqlite') as index:
+            self.assertEqual(s3_plus.plan_sync(source=source, target=target, hash_index=index), [])
+            self.assertEqual(index.get_stats()['hits'], 1)
+            self.assertEqual(index.get_stats()['misses'], 0)
+
+        # test 3 -- worker processes get the hashes, not the index, so they never wait on its write lock
+        helpers.create_textfile(content='indexed FILE', filepath='data/hash-index-sync/local-inputs/file.txt')
+        for i in range(4):
+            helpers.create_textfile(content=f'new file {i}', filepath=f'data/hash-index-sync/local-inputs/new-{i}.txt')
+
+        start = time.monotonic()
+        uris = s3_plus.sync(source=source, target=target, hash_index=True, use_multiprocessing=True, max_workers=2, dryrun=dryrun, verbose=verbose)
+        self.assertEqual(len(uris), 5)
+        self.assertLess(time.monotonic() - start, 20)
+
+        with helpers.LocalHashIndex('data/hash-index-sync/local-inputs/.boto-plus-hash-index.sqlite') as index:
+            self.assertEqual(index.get_stats()['entries'], 5)
+
+        shutil.rmtree('data/hash-index-sync/')
+
+
+    @moto.mock_aws
+    def test_get_object_info_with_metadata_cache(self):
+        # setup
+        dryrun = False
+        verbose = False
+        s3 = boto3.resource('s3')
+        mock_bucket = 'test-bucket'
+        mock_key = 'fake/key.txt'
+        s3.meta.client.create_bucket(Bucket=mock_bucket)
+        s3.meta.client.put_object(Bucket=mock_bucket, Key=mock_key, Body='mock content', Metadata={'x-amz-meta-object-hash' : 'abc123'})
+
+        head_calls = list()
+        self.boto_session.events.register(
+            'before-call.s3.HeadObject',
+            lambda **kwargs: head_calls.append(kwargs),
+        )
+
+        s3_plus = boto_plus.S3Plus(
+            boto_config=self.boto_config,
+            boto_session=self.boto_session,
+            metadata_cache_size=100,
+            metadata_cache_ttl=60,
+        )
+
+        # test 1 -- every attribute is available from one call
+        info = s3_plus.get_object_info(bucket=mock_bucket, key=mock_key)
+        self.assertEqual(info['size'], len('mock content'))
+        self.assertEqual(info['etag'], helpers.get_contents_hash(b'mock content'))
+        self.assertEqual(info['metadata'], {'x-amz-meta-object-hash' : 'abc123'})
+
+        # test 2 -- the getters are served by the cached HEAD
+        self.assertTrue(s3_plus.does_object_exist(bucket=mock_bucket, key=mock_key))
+        self.assertEqual(s3_plus.get_object_size(bucket=mock_bucket, key=mock_key), len('mock content'))
+        self.assertEqual(s3_plus.get_object_hash(bucket=mock_bucket, key=mock_key), 'abc123')
+        s3_plus.get_object_creation_datetime(bucket=mock_bucket, key=mock_key)
+        self.assertEqual(len(head_calls), 1)
+        self.assertEqual(s3_plus.get_metadata_cache_stats(), {'entries' : 1, 'hits' : 4, 'misses' : 1, 'evictions' : 0})
+
+        # test 3 -- writes through S3Plus invalidate the entry
+        s3_plus.delete_object(bucket=mock_bucket, key=mock_key, dryrun=dryrun, verbose=verbose)
+        self.assertFalse(s3_plus.does_object_exist(bucket=mock_bucket, key=mock_key))
+        self.assertRaises(RuntimeError, s3_plus.get_object_size, bucket=mock_bucket, key=mock_key)
+
+        # test 4 -- without a cache, each getter sends a single HEAD
+        s3.meta.client.put_object(Bucket=mock_bucket, Key=mock_key, Body='mock content', Metadata={'x-amz-meta-object-hash' : 'abc123'})
+        s3_plus = boto_plus.S3Plus(
+            boto_config=self.boto_config,
+            boto_session=self.boto_session,
+        )
+        head_calls.clear()
+        self.assertEqual(s3_plus.get_object_hash(bucket=mock_bucket, key=mock_key), 'abc123')
+        self.assertEqual(len(head_calls), 1)
+
+
+    @moto.mock_aws
+    def test_transfer_config(self):
+        # setup
+        dryrun = False
+        verbose = False
+        s3 = boto3.resource('s3')
+        mock_bucket = 'test-bucket'
+        s3.meta.client.create_bucket(Bucket=mock_bucket)
+
+        mib = 1024 ** 2
+        instance_config = boto3.s3.transfer.TransferConfig(multipart_chunksize=16 * mib, max_concurrency=4)
+        s3_plus = boto_plus.S3Plus(
+            boto_config=self.boto_config,
+            boto_session=self.boto_session,
+            transfer_config=instance_config,
+        )
+
+        # test 1 -- the instance config is used unless the object needs more than 10,000 parts
+        self.assertIs(s3_plus.get_transfer_config(), instance_config)
+        self.assertIs(s3_plus.get_transfer_config(object_size=100 * 1024 ** 3), instance_config)
+
+        adaptive_config = s3_plus.get_transfer_config(object_size=500 * 1024 ** 3)
+        self.assertEqual(adaptive_config.multipart_chunksize, 52 * mib)
+        self.assertEqual(adaptive_config.max_concurrency, 4)
+        self.assertEqual(instance_config.multipart_chunksize, 16 * mib)
+
+        # test 2 -- per-call settings are used for the transfer
+        local_filepath = 'data/transfer-config.bin'
+        with open(local_filepath, 'wb') as out_file:
+            out_file.write(os.urandom(12 * mib))
+
+        s3_plus.upload_object(
+            filepath=local_filepath,
+            bucket=mock_bucket,
+            key='multipart.bin',
+            transfer_config=boto3.s3.transfer.TransferConfig(multipart_threshold=5 * mib, multipart_chunksize=5 * mib),
+            dryrun=dryrun,
+            verbose=verbose,
+        )
+        etag = s3_plus.get_object_info(bucket=mock_bucket, key='multipart.bin')['etag']
+        self.assertTrue(etag.endswith('-3'))
+        self.assertEqual(etag, helpers.get_local_file_multipart_hash(local_filepath, part_size=5 * mib))
+
+        s3_plus.download_object(
+            bucket=mock_bucket,
+            key='multipart.bin',
+            filepath='data/transfer-config-download.bin',
+            adaptive_part_size=True,
+            dryrun=dryrun,
+            verbose=verbose,
+        )
+        self.assertEqual(helpers.get_local_file_hash('data/transfer-config-download.bin'), helpers.get_local_file_hash(local_filepath))
+
+        # test 3 -- adaptive downloads aim for a few parts per worker, not 10,000
+        with unittest.mock.patch.object(s3_plus, 'get_object_size', return_value=10 * 1024 ** 3), \
+                unittest.mock.patch.object(s3_plus._S3Plus__s3_client, 'download_file') as download_file:
+            s3_plus.download_object(bucket=mock_bucket, key='multipart.bin', filepath='data/adaptive.bin', adaptive_part_size=True, dryrun=dryrun, verbose=verbose)
+            s3_plus.download_object(bucket=mock_bucket, key='multipart.bin', filepath='data/adaptive.bin', dryrun=dryrun, verbose=verbose)
+
+        self.assertEqual(download_file.call_args_list[0].kwargs['Config'].multipart_chunksize, 640 * mib)
+        self.assertIs(download_file.call_args_list[1].kwargs['Config'], instance_config)
+
+        os.remove(local_filepath)
+        os.remove('data/transfer-config-download.bin')
+
+
+    @moto.mock_aws
+    def test_download_object_with_ranged_get(self):
+        # setup
+        dryrun = False
+        verbose = False
+        s3 = boto3.resource('s3')
+        mock_bucket = 'test-bucket'
+        s3.meta.client.create_bucket(Bucket=mock_bucket)
+
+        mib = 1024 ** 2
+        content = os.urandom(13 * mib + 17)
+        s3.meta.client.put_object(Bucket=mock_bucket, Key='large.bin', Body=content, Metadata={'x-amz-meta-object-hash' : helpers.get_contents_hash(content)})
+        s3.meta.client.put_object(Bucket=mock_bucket, Key='bad-hash.bin', Body=content, Metadata={'x-amz-meta-object-hash' : 'abc123'})
+        s3.meta.client.put_object(Bucket=mock_bucket, Key='empty.bin', Body=b'')
+
+        range_calls = list()
+        self.boto_session.events.register(
+            'before-parameter-build.s3.GetObject',
+            lambda **kwargs: range_calls.append(kwargs['params'].get('Range')),
+        )
+
+        s3_plus = boto_plus.S3Plus(
+            boto_config=self.boto_config,
+            boto_session=self.boto_session,
+        )
+
+        transfer_config = boto3.s3.transfer.TransferConfig(multipart_chunksize=5 * mib, max_concurrency=3)
+
+        # test 1 -- the object is assembled from concurrent ranged GETs
+        s3_plus.download_object(
+            bucket=mock_bucket,
+            key='large.bin',
+            filepath='data/ranged/large.bin',
+            use_ranged_get=True,
+            transfer_config=transfer_config,
+            dryrun=dryrun,
+            verbose=verbose,
+        )
+        with open('data/ranged/large.bin', 'rb') as in_file:
+            self.assertEqual(in_file.read(), content)
+        self.assertEqual(sorted(range_calls), [f'bytes=0-{5 * mib - 1}', f'bytes={10 * mib}-{13 * mib + 16}', f'bytes={5 * mib}-{10 * mib - 1}'])
+
+        # test 2 -- a hash mismatch raises and leaves no file behind
+        self.assertRaises(
+            RuntimeError,
+            s3_plus.download_object,
+            bucket=mock_bucket,
+            key='bad-hash.bin',
+            filepath='data/ranged/bad-hash.bin',
+            use_ranged_get=True,
+            transfer_config=transfer_config,
+            dryrun=dryrun,
+            verbose=verbose,
+        )
+        self.assertFalse(os.path.exists('data/ranged/bad-hash.bin'))
+
+        # test 3 -- empty objects
+        s3_plus.download_object(bucket=mock_bucket, key='empty.bin', filepath='data/ranged/empty.bin', use_ranged_get=True, dryrun=dryrun, verbose=verbose)
+        self.assertEqual(os.path.getsize('data/ranged/empty.bin'), 0)
+
+        # test 4 -- a range that keeps failing raises its own error, not one from closing the mapping
+        def readinto(body, buffer):
+            raise botocore.exceptions.ReadTimeoutError(endpoint_url=f's3://{mock_bucket}/large.bin')
+
+        with unittest.mock.patch.object(botocore.response.StreamingBody, 'readinto', readinto):
+            self.assertRaises(
+                botocore.exceptions.ReadTimeoutError,
+                s3_plus.download_object,
+                bucket=mock_bucket,
+                key='large.bin',
+                filepath='data/ranged/timeout.bin',
+                use_ranged_get=True,
+                transfer_config=transfer_config,
+                max_retries=1,
+                dryrun=dryrun,
+                verbose=verbose,
+            )
+        self.assertFalse(os.path.exists('data/ranged/timeout.bin'))
+
+        # test 5 -- a range that fails for good stops the others instead of waiting for them
+        def deny_first_range(request, **kwargs):
+            if request.headers.get('Range') == b'bytes=0-' + str(5 * mib - 1).encode('utf-8'):
+                raw = unittest.mock.Mock()
+                raw.stream.return_value = [b'<Error><Code>AccessDenied</Code><Message>Access Denied</Message></Error>']
+                return botocore.awsrequest.AWSResponse(url='', status_code=403, headers={}, raw=raw)
+
+        bytes_read = list()
+        original_readinto = botocore.response.StreamingBody.readinto
+        def slow_readinto(body, buffer):
+            time.sleep(0.2)
+            amount_read = original_readinto(body, buffer)
+            bytes_read.append(amount_read)
+            return amount_read
+
+        events = s3_plus._S3Plus__s3_client.meta.events
+        events.register_first('before-send.s3.GetObject', deny_first_range)
+        try:
+            with unittest.mock.patch.object(botocore.response.StreamingBody, 'readinto', slow_readinto):
+                self.assertRaises(
+                    botocore.exceptions.ClientError,
+                    s3_plus.download_object,
+                    bucket=mock_bucket,
+                    key='large.bin',
+                    filepath='data/ranged/denied.bin',
+                    use_ranged_get=True,
+                    transfer_config=transfer_config,
+                    max_retries=0,
+                    dryrun=dryrun,
+                    verbose=verbose,
+                )
+
+        finally:
+            events.unregister('before-send.s3.GetObject', deny_first_range)
+
+        self.assertLess(sum(bytes_read), 4 * mib)
+        self.assertFalse(os.path.exists('data/ranged/denied.bin'))
+
+        shutil.rmtree('data/ranged/')
+
+
+    @moto.mock_aws
+    def test_read_object_range_and_iterators(self):
+        # setup
+        s3 = boto3.client('s3')
+        mock_bucket = 'test-bucket'
+        s3.create_bucket(Bucket=mock_bucket)
+
+        lines = [f'line {i} ' + 'x' * (i % 37) for i in range(2000)]
+        contents = '\r\n'.join(lines).encode('utf-8') + b'\r\n'
+        s3.put_object(Bucket=mock_bucket, Key='log.txt', Body=contents)
+        s3.put_object(Bucket=mock_bucket, Key='empty.txt', Body=b'')
+
+        requests = list()
+        self.boto_session.events.register('before-parameter-build.s3.GetObject', lambda params, **kwargs: requests.append(params.get('Range')))
+
+        s3_plus = boto_plus.S3Plus(
+            boto_config=self.boto_config,
+            boto_session=self.boto_session,
+        )
+
+        # test 1 -- ranges are read with one GET and cut short at the end of the object
+        self.assertEqual(s3_plus.read_object_range(bucket=mock_bucket, key='log.txt', start=10, end=1000), contents[10:1000])
+        self.assertEqual(requests, ['bytes=10-999'])
+        self.assertEqual(s3_plus.read_object_range(bucket=mock_bucket, key='log.txt', start=len(contents) - 5), contents[-5:])
+        self.assertEqual(s3_plus.read_object_range(bucket=mock_bucket, key='log.txt', start=len(contents) - 5, end=len(contents) + 100), contents[-5:])
+        self.assertEqual(s3_plus.read_object_range(bucket=mock_bucket, key='log.txt', start=len(contents) + 10), b'')
+        self.assertEqual(s3_plus.read_object_range(bucket=mock_bucket, key='log.txt', start=5, end=5), b'')
+        self.assertEqual(s3_plus.read_object_range(bucket=mock_bucket, key='empty.txt', start=0), b'')
+
+        # test 2 -- chunks come from one streamed GET, or from concurrent ranged GETs with read-ahead
+        requests.clear()
+        chunks = list(s3_plus.iter_object_chunks(bucket=mock_bucket, key='log.txt', chunk_size=4096))
+        self.assertEqual(b''.join(chunks), contents)
+        self.assertTrue(all(len(chunk) == 4096 for chunk in chunks[:-1]))
+        self.assertEqual(len(requests), 1)
+
+        requests.clear()
+        chunks = list(s3_plus.iter_object_chunks(bucket=mock_bucket, key='log.txt', chunk_size=4096, start=100, read_ahead=3))
+        self.assertEqual(b''.join(chunks), contents[100:])
+        self.assertEqual(len(requests), len(chunks))
+        self.assertEqual(list(s3_plus.iter_object_chunks(bucket=mock_bucket, key='empty.txt', read_ahead=2)), list())
+
+        # test 3 -- lines are split across chunk boundaries and decoded
+        self.assertEqual(list(s3_plus.iter_object_lines(bucket=mock_bucket, key='log.txt', chunk_size=1000)), lines)
+        self.assertEqual(list(s3_plus.iter_object_lines(bucket=mock_bucket, key='log.txt', chunk_size=1000, read_ahead=2)), lines)
+        self.assertEqual(next(s3_plus.iter_object_lines(bucket=mock_bucket, key='log.txt', encoding=None, keepends=True)), b'line 0 \r\n')
+
+        # test 4 -- stopping early leaves the rest unread
+        requests.clear()
+        iterator = s3_plus.iter_object_chunks(bucket=mock_bucket, key='log.txt', chunk_size=1024, read_ahead=2)
+        next(iterator)
+        iterator.close()
+        self.assertLessEqual(len(requests), 4)
+
+        # test 5 -- an object that changes mid-read raises instead of mixing versions
+        iterator = s3_plus.iter_object_chunks(bucket=mock_bucket, key='log.txt', chunk_size=1024, read_ahead=1)
+        next(iterator)
+        s3.put_object(Bucket=mock_bucket, Key='log.txt', Body=b'replaced' * 1000)
+        self.assertRaises(RuntimeError, list, iterator)
+
+
+    @moto.mock_aws
+    def test_open(self):
+        # setup
+        s3 = boto3.client('s3')
+        mock_bucket = 'test-bucket'
+        s3.create_bucket(Bucket=mock_bucket)
+
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w') as zip_file:
+            for i in range(8):
+                zip_file.writestr(f'member_{i}.bin', os.urandom(512 * 1024))
+        contents = archive.getvalue()
+        s3.put_object(Bucket=mock_bucket, Key='archive.zip', Body=contents)
+
+        requests = list()
+        self.boto_session.events.register('before-parameter-build.s3.GetObject', lambda params, **kwargs: requests.append(params['Range']))
+
+        s3_plus = boto_plus.S3Plus(
+            boto_config=self.boto_config,
+            boto_session=self.boto_session,
+        )
+
+        # test 1 -- zipfile reads the central directory and one member, touching only their blocks
+        # (no read-ahead, so no fetch is still running when the stats are compared)
+        with s3_plus.open(bucket=mock_bucket, key='archive.zip', block_size=64 * 1024, read_ahead=0) as reader:
+            self.assertEqual(reader.get_size(), len(contents))
+
+            with zipfile.ZipFile(reader) as zip_file:
+                self.assertEqual(len(zip_file.namelist()), 8)
+                with zipfile.ZipFile(io.BytesIO(contents)) as expected_file:
+                    self.assertEqual(zip_file.read('member_5.bin'), expected_file.read('member_5.bin'))
+
+            stats = reader.get_stats()
+            self.assertEqual(stats['requests'], len(requests))
+            self.assertLess(stats['bytes_fetched'], 1024 * 1024)
+
+        # test 2 -- sequential reads prefetch, and return the whole object
+        with s3_plus.open(bucket=mock_bucket, key='archive.zip', block_size=256 * 1024, read_ahead=2) as reader:
+            chunks = iter(lambda: reader.read(100 * 1024), b'')
+            self.assertEqual(b''.join(chunks), contents)
+            self.assertGreater(reader.get_stats()['prefetched'], 0)
+
+        # test 3 -- a change to the object surfaces on the next uncached block
+        reader = s3_plus.open(bucket=mock_bucket, key='archive.zip', block_size=64 * 1024, read_ahead=0)
+        self.assertEqual(reader.read(10), contents[:10])
+        s3.put_object(Bucket=mock_bucket, Key='archive.zip', Body=b'replaced')
+        self.assertEqual(reader.read(10), contents[10:20])
+        reader.seek(1024 * 1024)
+        self.assertRaises(RuntimeError, reader.read, 10)
+        reader.close()
+
+        self.assertRaises(RuntimeError, s3_plus.open, bucket=mock_bucket, key='missing.zip')
+
+
+    @moto.mock_aws
+    def test_upload_stream(self):
+        # setup
+        dryrun = False
+        verbose = False
+        s3 = boto3.resource('s3')
+        mock_bucket = 'test-bucket'
+        s3.meta.client.create_bucket(Bucket=mock_bucket)
+
+        part_calls = list()
+        self.boto_session.events.register(
+            'before-parameter-build.s3.UploadPart',
+            lambda **kwargs: part_calls.append(kwargs['params']['PartNumber']),
+        )
+
+        s3_plus = boto_plus.S3Plus(
+            boto_config=self.boto_config,
+            boto_session=self.boto_session,
+        )
+
+        mib = 1024 ** 2
+        lines = [f'{i},value-{i}\n' for i in range(600_000)]
+        expected = ''.join(lines).encode()
+
+        # test 1 -- an iterator of str chunks is uploaded as a multipart upload, with its hash
+        s3_plus.upload_stream(
+            source=iter(lines),
+            bucket=mock_bucket,
+            key='stream.csv',
+            part_size=5 * mib,
+            max_in_flight=2,
+            extra_args={'ContentType' : 'text/csv'},
+            dryrun=dryrun,
+            verbose=verbose,
+        )
+        self.assertEqual(sorted(part_calls), list(range(1, len(expected) // (5 * mib) + 2)))
+
+        s3_object = s3.Object(bucket_name=mock_bucket, key='stream.csv')
+        self.assertEqual(s3_object.get()['Body'].read(), expected)
+        self.assertEqual(s3_object.metadata['x-amz-meta-object-hash'], helpers.get_contents_hash(expected))
+        self.assertEqual(s3_object.content_type, 'text/csv')
+
+        # test 2 -- a file object shorter than one part is sent with a single PUT
+        part_calls.clear()
+        with open('data/stream-small.bin', 'wb') as out_file:
+            out_file.write(b'small payload')
+
+        with open('data/stream-small.bin', 'rb') as in_file:
+            s3_plus.upload_stream(source=in_file, bucket=mock_bucket, key='small.bin', dryrun=dryrun, verbose=verbose)
+
+        self.assertEqual(part_calls, [])
+        self.assertEqual(s3_plus.get_object_hash(bucket=mock_bucket, key='small.bin'), helpers.get_contents_hash(b'small payload'))
+
+        # test 3 -- parts below the S3 minimum are rejected
+        self.assertRaises(RuntimeError, s3_plus.upload_stream, source=[b'x'], bucket=mock_bucket, key='x', part_size=1024, dryrun=dryrun, verbose=verbose)
+
+        os.remove('data/stream-small.bin')
+
+
+    @moto.mock_aws
+    def test_upload_object_hashing_while_uploading(self):
+        # setup
+        dryrun = False
+        verbose = False
+        s3 = boto3.resource('s3')
+        mock_bucket = 'test-bucket'
+        s3.meta.client.create_bucket(Bucket=mock_bucket)
+
+        s3_plus = boto_plus.S3Plus(
+            boto_config=self.boto_config,
+            boto_session=self.boto_session,
+        )
+
+        mib = 1024 ** 2
+        content = os.urandom(11 * mib)
+        local_filepath = 'data/hash-while-uploading.bin'
+        with open(local_filepath, 'wb') as out_file:
+            out_file.write(content)
+
+        # the file is never hashed in a separate pass
+        with unittest.mock.patch('boto_plus.helpers.get_local_file_hash', side_effect=AssertionError):
+            s3_plus.upload_object(
+                filepath=local_filepath,
+                bucket=mock_bucket,
+                key='large.bin',
+                transfer_config=boto3.s3.transfer.TransferConfig(multipart_chunksize=5 * mib),
+                hash_while_uploading=True,
+                dryrun=dryrun,
+                verbose=verbose,
+            )
+
+            s3_plus.upload_object(
+                filepath=local_filepath,
+                bucket=mock_bucket,
+                key='small.bin',
+                hash_while_uploading=True,
+                transfer_config=boto3.s3.transfer.TransferConfig(multipart_chunksize=16 * mib),
+                dryrun=dryrun,
+                verbose=verbose,
+            )
+
+        # the stored hash matches what get_local_file_hash produces, so sync comparisons still work
+        for key in ['large.bin', 'small.bin']:
+            s3_object = s3.Object(bucket_name=mock_bucket, key=key)
+            self.assertEqual(s3_object.get()['Body'].read(), content)
+            self.assertEqual(s3_plus.get_object_hash(bucket=mock_bucket, key=key), helpers.get_local_file_hash(local_filepath))
+
+        # metadata in extra_args is stored alongside the hash, with and without the copy that writes it
+        for hash_while_uploading in [False, True]:
+            s3_plus.upload_object(
+                filepath=local_filepath,
+                bucket=mock_bucket,
+                key='with-metadata.bin',
+                extra_args={'Metadata' : {'owner' : 'team-a'}},
+                transfer_config=boto3.s3.transfer.TransferConfig(multipart_threshold=5 * mib, multipart_chunksize=5 * mib),
+                hash_while_uploading=hash_while_uploading,
+                dryrun=dryrun,
+                verbose=verbose,
+            )
+
+            metadata = s3.meta.client.head_object(Bucket=mock_bucket, Key='with-metadata.bin')['Metadata']
+            self.assertEqual(metadata['owner'], 'team-a')
+            self.assertEqual(s3_plus.get_object_hash(bucket=mock_bucket, key='with-metadata.bin'), helpers.get_local_file_hash(local_filepath))
+
+        # a failed hash write removes the uploaded version, leaving the previous one in place
+        versioned_bucket = 'versioned-bucket'
+        s3.meta.client.create_bucket(Bucket=versioned_bucket)
+        s3.meta.client.put_bucket_versioning(Bucket=versioned_bucket, VersioningConfiguration={'Status' : 'Enabled'})
+        s3.meta.client.put_object(Bucket=versioned_bucket, Key='large.bin', Body=b'previous')
+
+        error = botocore.exceptions.ClientError({'Error' : {'Code' : 'AccessDenied', 'Message' : 'Access Denied'}}, 'CopyObject')
+        with unittest.mock.patch.object(s3_plus, '_S3Plus__replace_object_metadata', side_effect=error):
+            self.assertRaises(
+                RuntimeError,
+                s3_plus.upload_object,
+                filepath=local_filepath,
+                bucket=versioned_bucket,
+                key='large.bin',
+                transfer_config=boto3.s3.transfer.TransferConfig(multipart_chunksize=5 * mib),
+                hash_while_uploading=True,
+                dryrun=dryrun,
+                verbose=verbose,
+            )
+
+        self.assertEqual(s3.Object(bucket_name=versioned_bucket, key='large.bin').get()['Body'].read(), b'previous')
+        self.assertEqual(len(s3.meta.client.list_object_versions(Bucket=versioned_bucket)['Versions']), 1)
+
+        os.remove(local_filepath)
+
+
+    @moto.mock_aws
+    def test_native_checksums(self):
+        # setup
+        dryrun = False
+        verbose = False
+        s3 = boto3.client('s3')
+        mock_bucket = 'test-bucket'
+        s3.create_bucket(Bucket=mock_bucket)
+
+        s3_plus = boto_plus.S3Plus(
+            boto_config=self.boto_config,
+            boto_session=self.boto_session,
+            checksum_algorithm='SHA256',
+        )
+
+        mib = 1024 ** 2
+        os.makedirs('data/checksums/', exist_ok=False)
+        contents = {f'data/checksums/{i}.bin' : os.urandom(6 * mib) for i in range(2)}
+        for filepath, content in contents.items():
+            with open(filepath, 'wb') as out_file:
+                out_file.write(content)
+
+        # test 1 -- uploads store the configured checksum, computed the same way locally
+        s3_plus.upload_object(
+            filepath='data/checksums/0.bin',
+            bucket=mock_bucket,
+            key='uploaded/0.bin',
+            dryrun=dryrun,
+            verbose=verbose,
+        )
+        checksum = s3_plus.get_object_checksum(bucket=mock_bucket, key='uploaded/0.bin')
+        self.assertEqual(checksum['algorithm'], 'SHA256')
+        self.assertEqual(checksum['checksum'], helpers.get_local_file_checksum('data/checksums/0.bin', 'SHA256'))
+        self.assertEqual(helpers.get_local_file_checksum('data/checksums/0.bin', 'CRC32'), helpers.get_local_file_checksums(['data/checksums/0.bin'], 'CRC32')['data/checksums/0.bin'])
+
+        # test 2 -- multipart objects written by another tool (no object-hash metadata) are only recognised through full-object checksums
+        for filepath, content in contents.items():
+            key = f'other-tool/{os.path.basename(filepath)}'
+            upload_id = s3.create_multipart_upload(Bucket=mock_bucket, Key=key, ChecksumAlgorithm='CRC32', ChecksumType='FULL_OBJECT')['UploadId']
+
+            parts = list()
+            for part_number, start in enumerate([0, 5 * mib], start=1):
+                response = s3.upload_part(Bucket=mock_bucket, Key=key, UploadId=upload_id, PartNumber=part_number, Body=content[start:start + 5 * mib], ChecksumAlgorithm='CRC32')
+                parts.append({'PartNumber' : part_number, 'ETag' : response['ETag'], 'ChecksumCRC32' : response['ChecksumCRC32']})
+
+            s3.complete_multipart_upload(
+                Bucket=mock_bucket,
+                Key=key,
+                UploadId=upload_id,
+                ChecksumType='FULL_OBJECT',
+                ChecksumCRC32=helpers.get_local_file_checksum(filepath, 'CRC32'),
+                MultipartUpload={'Parts' : parts},
+            )
+
+        self.assertEqual(len(s3_plus.plan_sync(source='data/checksums/', target=f's3://{mock_bucket}/other-tool/')), 2)
+
+        with unittest.mock.patch('boto_plus.helpers.get_local_file_hash', side_effect=AssertionError):
+            plan = s3_plus.plan_sync(source='data/checksums/', target=f's3://{mock_bucket}/other-tool/', use_checksums=True)
+        self.assertEqual(plan, list())
+
+        # test 3 -- a changed file of the same size is still detected
+        with open('data/checksums/1.bin', 'wb') as out_file:
+            out_file.write(os.urandom(6 * mib))
+
+        plan = s3_plus.plan_sync(source='data/checksums/', target=f's3://{mock_bucket}/other-tool/', use_checksums=True)
+        self.assertEqual([entry['source-filepath'] for entry in plan], ['data/checksums/1.bin'])
+
+        # test 4 -- composite checksums of multipart uploads cannot be compared and fall back to MD5
+        s3.upload_file(
+            Filename='data/checksums/0.bin',
+            Bucket=mock_bucket,
+            Key='composite/0.bin',
+            ExtraArgs={'ChecksumAlgorithm' : 'SHA256'},
+            Config=boto3.s3.transfer.TransferConfig(multipart_threshold=5 * mib, multipart_chunksize=5 * mib),
+        )
+        self.assertEqual(s3_plus.get_object_checksum(bucket=mock_bucket, key='composite/0.bin')['type'], 'COMPOSITE')
+        plan = s3_plus.plan_sync(source='data/checksums/', target=f's3://{mock_bucket}/composite/', use_checksums=True)
+        self.assertIn('data/checksums/0.bin', [entry['source-filepath'] for entry in plan])
+
+        # test 5 -- unknown algorithms are rejected
+        self.assertRaises(RuntimeError, boto_plus.S3Plus, boto_config=self.boto_config, checksum_algorithm='MD4')
+
+        shutil.rmtree('data/checksums/')
+
+
+    @moto.mock_aws
+    def test_plan_sync_with_etags(self):
+        # setup
+        s3 = boto3.client('s3')
+        mock_bucket = 'test-bucket'
+        s3.create_bucket(Bucket=mock_bucket)
+
+        head_calls = list()
+        self.boto_session.events.register(
+            'before-call.s3.HeadObject',
+            lambda **kwargs: head_calls.append(kwargs),
+        )
+
+        s3_plus = boto_plus.S3Plus(
+            boto_config=self.boto_config,
+            boto_session=self.boto_session,
+        )
+
+        # files uploaded by another tool, without object-hash metadata, at different part sizes
+        mib = 1024 ** 2
+        os.makedirs('data/etags/', exist_ok=False)
+        part_sizes = {
+            'data/etags/5-mib-parts.bin' : 5 * mib,
+            'data/etags/6-mib-parts.bin' : 6 * mib,
+            'data/etags/single-part.bin' : 16 * mib,
+        }
+        for filepath, part_size in part_sizes.items():
+            with open(filepath, 'wb') as out_file:
+                out_file.write(os.urandom(11 * mib))
+
+            s3.upload_file(
+                Filename=filepath,
+                Bucket=mock_bucket,
+                Key=f'other-tool/{os.path.basename(filepath)}',
+                Config=boto3.s3.transfer.TransferConfig(multipart_threshold=part_size, multipart_chunksize=part_size),
+            )
+
+        # test 1 -- without ETag recomputation the multipart objects look different
+        plan = s3_plus.plan_sync(source='data/etags/', target=f's3://{mock_bucket}/other-tool/')
+        self.assertEqual(len(plan), 2)
+
+        # test 2 -- inferred part sizes match every object without a single HEAD
+        head_calls.clear()
+        plan = s3_plus.plan_sync(source='data/etags/', target=f's3://{mock_bucket}/other-tool/', use_etags=True)
+        self.assertEqual(plan, list())
+        self.assertEqual(len(head_calls), 0)
+
+        # test 3 -- a given part size is the only one tried
+        plan = s3_plus.plan_sync(source='data/etags/', target=f's3://{mock_bucket}/other-tool/', use_etags=True, etag_part_size=5 * mib)
+        self.assertEqual([entry['source-filepath'] for entry in plan], ['data/etags/6-mib-parts.bin'])
+
+        # test 4 -- a changed file is still detected
+        with open('data/etags/5-mib-parts.bin', 'wb') as out_file:
+            out_file.write(os.urandom(11 * mib))
+
+        with unittest.mock.patch('boto_plus.helpers.get_local_file_multipart_hashes', wraps=helpers.get_local_file_multipart_hashes) as get_multipart_hashes, \
+                unittest.mock.patch('boto_plus.helpers.get_local_file_hashes', wraps=helpers.get_local_file_hashes) as get_file_hashes:
+            plan = s3_plus.plan_sync(source='data/etags/', target=f's3://{mock_bucket}/other-tool/', use_etags=True)
+        self.assertEqual([entry['source-filepath'] for entry in plan], ['data/etags/5-mib-parts.bin'])
+
+        # every part size guess and the MD5 fallback came from one read of each file
+        self.assertEqual(get_multipart_hashes.call_count, 2)
+        self.assertTrue(all('data/etags/5-mib-parts.bin' not in call.args[0] for call in get_file_hashes.call_args_list))
+
+        shutil.rmtree('data/etags/')
+
+
 if __name__ == "__main__":
     unittest.main()